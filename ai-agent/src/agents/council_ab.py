@@ -0,0 +1,151 @@
+"""
+Council Voting Mode A/B
+Replays recorded sentiment snapshots through the council twice - once with
+three agent calls (multi_call) and once with a single panel call
+(single_call) - and compares latency, token cost and vote agreement.
+
+Inputs come from the sentiment time-series store (SENTIMENT_DB_PATH) or a
+JSONL file of sentiment signals. The decision cache is bypassed so every
+input reaches the model in both modes, and both modes of an input see the
+same context snapshot and prompt time. Run with COUNCIL_CONTEXT_MODE=snapshot:
+in tools mode each agent fetches live data itself and the modes can differ.
+
+    python agents/council_ab.py --limit 20 --hours 168 --out council_ab.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.multi_agent_council import MultiAgentCouncil, VOTING_MODES
+from monitoring.resilience import percentile
+
+SIGNAL_FIELDS = ('signal', 'avg_sentiment', 'strength', 'is_trending', 'volume_spike')
+
+
+def load_replay_inputs(limit: int = 20, hours: float = 168, coin_id: str = "crypto-com-chain",
+                       path: str = None) -> List[Dict]:
+    """Most recent sentiment signals, from a JSONL file or the time-series store"""
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            signals = [json.loads(line) for line in f if line.strip()]
+        return signals[-limit:]
+
+    from monitoring.timeseries_store import get_timeseries_store
+    snapshots = get_timeseries_store().query_snapshots(start=time.time() - hours * 3600, coin_id=coin_id)
+    return [
+        {k: snapshot["payload"].get(k) for k in SIGNAL_FIELDS if k in snapshot["payload"]}
+        for snapshot in snapshots[-limit:]
+        if snapshot.get("payload")
+    ]
+
+
+def _mode_summary(results: List[Dict]) -> Dict:
+    seconds = [r['telemetry']['session_seconds'] for r in results]
+    return {
+        "sessions": len(results),
+        "p50_seconds": round(percentile(seconds, 50), 3),
+        "p95_seconds": round(percentile(seconds, 95), 3),
+        "mean_prompt_tokens": round(sum(r['telemetry']['prompt_tokens'] for r in results) / len(results), 1),
+        "mean_response_tokens": round(sum(r['telemetry']['response_tokens'] for r in results) / len(results), 1),
+        "total_cost_usd": round(sum(r['telemetry']['cost_usd'] for r in results), 6),
+        "timed_out_votes": sum(len(r['timed_out_agents']) for r in results),
+    }
+
+
+def compare_voting_modes(inputs: List[Dict], council: MultiAgentCouncil = None) -> Dict:
+    """
+    Vote on every input in both modes.
+    The mode that goes first alternates per input so neither always sees a cold model.
+    The context snapshot (snapshot mode) and prompt time are built once per
+    input and shared by both modes. Caching and early decisions are off so
+    both modes always hear every member.
+    """
+    council = council or MultiAgentCouncil()
+    council.cache_enabled = False
+    council.early_decision = False
+    if council.context_mode != "snapshot":
+        print("⚠️  COUNCIL_CONTEXT_MODE is not snapshot - agents fetch live data, so modes may see different prices")
+
+    results = {mode: [] for mode in VOTING_MODES}
+    consensus_matches = 0
+    vote_matches = vote_pairs = 0
+    for index, signal in enumerate(inputs):
+        market_data = {
+            'signal': signal.get('signal'),
+            'sentiment_score': signal.get('avg_sentiment', 0),
+            'strength': signal.get('strength', 0)
+        }
+        order = VOTING_MODES if index % 2 == 0 else tuple(reversed(VOTING_MODES))
+        context = council.gather_context()[0] if council.context_mode == "snapshot" else None
+        as_of = datetime.now()
+        session = {
+            mode: council.vote_on_trade(market_data, signal, voting_mode=mode, context=context, as_of=as_of)
+            for mode in order
+        }
+        for mode in VOTING_MODES:
+            results[mode].append(session[mode])
+
+        multi, single = session["multi_call"], session["single_call"]
+        consensus_matches += multi['consensus'] == single['consensus']
+        single_votes = {v['agent']: v for v in single['votes'] if not v.get('skipped')}
+        for a in multi['votes']:
+            b = single_votes.get(a['agent'])
+            if b is None or a.get('skipped'):
+                continue
+            vote_pairs += 1
+            vote_matches += a['vote'] == b['vote']
+
+    if not inputs:
+        return {"inputs": 0}
+    return {
+        "inputs": len(inputs),
+        "modes": {mode: _mode_summary(results[mode]) for mode in VOTING_MODES},
+        "consensus_agreement": round(consensus_matches / len(inputs), 3),
+        "per_agent_vote_agreement": round(vote_matches / vote_pairs, 3) if vote_pairs else None,
+        "decisions": [
+            {
+                "signal": signal.get('signal'),
+                "avg_sentiment": signal.get('avg_sentiment'),
+                "multi_call": multi['consensus'],
+                "single_call": single['consensus'],
+            }
+            for signal, multi, single in zip(inputs, results["multi_call"], results["single_call"])
+        ],
+    }
+
+
+def main():
+    """A/B the council voting modes on replayed inputs"""
+    parser = argparse.ArgumentParser(description="Compare multi-call and single-call council voting")
+    parser.add_argument("--limit", type=int, default=20, help="number of recorded inputs to replay")
+    parser.add_argument("--hours", type=float, default=168, help="look-back window in the time-series store")
+    parser.add_argument("--coin", default="crypto-com-chain")
+    parser.add_argument("--inputs", help="JSONL file of sentiment signals instead of the store")
+    parser.add_argument("--out", help="write the full report to this JSON file")
+    args = parser.parse_args()
+
+    inputs = load_replay_inputs(args.limit, args.hours, args.coin, args.inputs)
+    if not inputs:
+        print("❌ No recorded sentiment inputs to replay")
+        return 1
+    print(f"🔬 Replaying {len(inputs)} inputs through both voting modes...")
+
+    report = compare_voting_modes(inputs)
+    print("\n📊 Council voting mode A/B")
+    print(json.dumps({k: v for k, v in report.items() if k != "decisions"}, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""
+Council Telemetry
+Per-agent instrumentation for the multi-agent council:
+- Wall time of every agent call, kept in a rolling window (p50/p95/p99)
+- Prompt / response token estimates and the cost they imply
+- Errors, unparseable replies, timeouts and early-decision skips
+
+The agent client does not report token usage, so tokens are estimated at
+~4 characters per token from the text we send (instructions + prompt) and
+receive. Tool calls made inside an agent turn are not visible here.
+"""
+
+import os
+import sys
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from monitoring.resilience import percentile
+except ImportError:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+    from monitoring.resilience import percentile
+
+CHARS_PER_TOKEN = 4
+
+# model -> (USD per 1M input tokens, USD per 1M output tokens)
+MODEL_PRICING = {
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-pro": (1.25, 10.00),
+    "gemini-2.0-flash": (0.10, 0.40),
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for a piece of text"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN if text else 0
+
+
+def load_pricing() -> Dict[str, Tuple[float, float]]:
+    """MODEL_PRICING with COUNCIL_PRICE_INPUT_PER_M / _OUTPUT_PER_M applied to every model"""
+    input_override = os.getenv("COUNCIL_PRICE_INPUT_PER_M")
+    output_override = os.getenv("COUNCIL_PRICE_OUTPUT_PER_M")
+    return {
+        model: (
+            float(input_override) if input_override else input_price,
+            float(output_override) if output_override else output_price,
+        )
+        for model, (input_price, output_price) in MODEL_PRICING.items()
+    }
+
+
+def estimate_cost(model: str, prompt_tokens: int, response_tokens: int,
+                  pricing: Dict[str, Tuple[float, float]] = None) -> float:
+    """USD cost of one call; unknown models are priced like gemini-2.5-flash"""
+    pricing = pricing or MODEL_PRICING
+    input_price, output_price = pricing.get(model, pricing["gemini-2.5-flash"])
+    return (prompt_tokens * input_price + response_tokens * output_price) / 1_000_000
+
+
+class AgentTelemetry:
+    """Rolling latency/token window and counters for one council agent"""
+
+    def __init__(self, name: str, window: int = 200):
+        self.name = name
+        self.latencies = deque(maxlen=window)
+        self.prompt_tokens = deque(maxlen=window)
+        self.response_tokens = deque(maxlen=window)
+        self.calls = 0
+        self.errors = 0
+        self.parse_failures = 0
+        self.timeouts = 0
+        self.skipped = 0
+        self.total_prompt_tokens = 0
+        self.total_response_tokens = 0
+        self.total_cost_usd = 0.0
+
+    def snapshot(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "parse_failures": self.parse_failures,
+            "timeouts": self.timeouts,
+            "skipped": self.skipped,
+            "p50_seconds": round(percentile(self.latencies, 50), 3),
+            "p95_seconds": round(percentile(self.latencies, 95), 3),
+            "p99_seconds": round(percentile(self.latencies, 99), 3),
+            "p50_prompt_tokens": percentile(self.prompt_tokens, 50),
+            "p95_prompt_tokens": percentile(self.prompt_tokens, 95),
+            "p50_response_tokens": percentile(self.response_tokens, 50),
+            "p95_response_tokens": percentile(self.response_tokens, 95),
+            "total_prompt_tokens": self.total_prompt_tokens,
+            "total_response_tokens": self.total_response_tokens,
+            "total_cost_usd": round(self.total_cost_usd, 6),
+        }
+
+
+class CouncilTelemetry:
+    """Thread-safe telemetry for every agent plus whole voting sessions"""
+
+    def __init__(self, model: str = "gemini-2.5-flash", window: int = None):
+        self.model = model
+        self.window = window or int(os.getenv("COUNCIL_TELEMETRY_WINDOW", "200"))
+        self.pricing = load_pricing()  # env overrides read once, not per call
+        self._agents: Dict[str, AgentTelemetry] = {}
+        self._sessions = deque(maxlen=self.window)
+        self.session_count = 0
+        self._lock = threading.Lock()
+
+    def _agent(self, name: str) -> AgentTelemetry:
+        """Get or create an agent's window (caller holds the lock)"""
+        if name not in self._agents:
+            self._agents[name] = AgentTelemetry(name, self.window)
+        return self._agents[name]
+
+    def record_call(self, agent: str, seconds: float, prompt: str, response: str,
+                    ok: bool = True, parsed: bool = True, model: str = None) -> Dict:
+        """
+        Record one finished agent call (late calls included, so latency is the real one).
+        model is the agent's own model when it differs from the council default.
+        Returns the per-call figures to attach to the vote.
+        """
+        prompt_tokens = estimate_tokens(prompt)
+        response_tokens = estimate_tokens(response)
+        cost = estimate_cost(model or self.model, prompt_tokens, response_tokens, self.pricing)
+        with self._lock:
+            stats = self._agent(agent)
+            stats.calls += 1
+            stats.latencies.append(seconds)
+            stats.prompt_tokens.append(prompt_tokens)
+            stats.response_tokens.append(response_tokens)
+            stats.total_prompt_tokens += prompt_tokens
+            stats.total_response_tokens += response_tokens
+            stats.total_cost_usd += cost
+            if not ok:
+                stats.errors += 1
+            elif not parsed:
+                stats.parse_failures += 1
+        return {
+            "latency_seconds": round(seconds, 3),
+            "prompt_tokens": prompt_tokens,
+            "response_tokens": response_tokens,
+            "cost_usd": round(cost, 6),
+        }
+
+    def record_timeout(self, agent: str):
+        """An agent missed its voting deadline"""
+        with self._lock:
+            self._agent(agent).timeouts += 1
+
+    def record_skip(self, agent: str):
+        """An agent's vote was not waited for (decision already settled)"""
+        with self._lock:
+            self._agent(agent).skipped += 1
+
+    def record_session(self, seconds: float):
+        """Wall time of one full voting session"""
+        with self._lock:
+            self.session_count += 1
+            self._sessions.append(seconds)
+
+    def session_summary(self, votes: List[Dict], seconds: Optional[float], calls: List[Dict] = None) -> Dict:
+        """
+        Compact per-session view for the decision log.
+        Token/cost totals come from calls when given (one call can carry several votes),
+        otherwise from the votes themselves.
+        """
+        calls = votes if calls is None else calls
+        return {
+            "session_seconds": round(seconds, 3) if seconds is not None else None,
+            "calls": sum(1 for c in calls if "prompt_tokens" in c),
+            "prompt_tokens": sum(c.get("prompt_tokens", 0) for c in calls),
+            "response_tokens": sum(c.get("response_tokens", 0) for c in calls),
+            "cost_usd": round(sum(c.get("cost_usd", 0.0) for c in calls), 6),
+            "agents": {
+                v["agent"]: v.get("latency_seconds")
+                for v in votes if "latency_seconds" in v
+            },
+        }
+
+    def get_metrics(self) -> Dict:
+        """Rolling metrics per agent and for whole sessions"""
+        with self._lock:
+            agents = {name: stats.snapshot() for name, stats in self._agents.items()}
+            sessions = list(self._sessions)
+            session_count = self.session_count
+        return {
+            "model": self.model,
+            "sessions": session_count,
+            "session_p50_seconds": round(percentile(sessions, 50), 3),
+            "session_p95_seconds": round(percentile(sessions, 95), 3),
+            "session_p99_seconds": round(percentile(sessions, 99), 3),
+            "total_cost_usd": round(sum(a["total_cost_usd"] for a in agents.values()), 6),
+            "agents": agents,
+        }
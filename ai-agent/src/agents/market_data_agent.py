@@ -4,8 +4,17 @@ Fetches REAL data from Crypto.com Exchange API inside tools
 All tools execute actual API calls instead of providing instructions
 """
 from crypto_com_agent_client import tool
-from crypto_com_developer_platform_client import Exchange, Client
+from crypto_com_developer_platform_client import Client
 import os
+import sys
+
+# Every tool reads tickers through the shared cache, so agents calling tools in
+# the same cycle trigger one exchange request per instrument
+try:
+    from services.ticker_cache import get_ticker_cache
+except ImportError:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+    from services.ticker_cache import get_ticker_cache
 
 # Initialize Client for Exchange API (required)
 try:
@@ -24,8 +33,8 @@ def get_cro_price() -> dict:
         dict: Real-time price data with volume and 24h change
     """
     try:
-        ticker = Exchange.get_ticker_by_instrument('CRO_USDT')
-        data = ticker.get('data', {})
+        ticker = get_ticker_cache().get_ticker('CRO_USDT')
+        data = ticker['data']
         
         return {
             "symbol": "CRO_USDT",
@@ -35,6 +44,7 @@ def get_cro_price() -> dict:
             "low_24h": float(data.get('low', 0)),
             "change_24h_percent": float(data.get('change', 0)),
             "timestamp": data.get('timestamp', ''),
+            "freshness": ticker['freshness'],
             "status": "✅ LIVE DATA"
         }
     except Exception as e:
@@ -59,7 +69,7 @@ def check_price_condition(symbol: str, operator: str, target_price: float) -> di
         symbol = symbol.replace("-", "_").upper()
         
         # FETCH REAL DATA
-        ticker = Exchange.get_ticker_by_instrument(symbol)
+        ticker = get_ticker_cache().get_ticker(symbol)
         current_price = float(ticker['data']['lastPrice'])
         
         # PERFORM ACTUAL COMPARISON
@@ -79,6 +89,7 @@ def check_price_condition(symbol: str, operator: str, target_price: float) -> di
             "operator": operator,
             "condition_met": condition_met,
             "result": f"{'✅ TRUE' if condition_met else '❌ FALSE'}: {current_price} {operator} {target_price}",
+            "freshness": ticker['freshness'],
             "status": "✅ LIVE CHECK"
         }
     except Exception as e:
@@ -106,13 +117,14 @@ def get_market_summary(pairs: str = None) -> dict:
         summary = {}
         total_volume = 0
         
-        for pair in pairs_list:
+        # One snapshot for every pair (a single bulk request, or concurrent lookups);
+        # get_tickers never raises, a failure comes back as that pair's error
+        tickers = get_ticker_cache().get_tickers(pairs_list)
+        for pair, ticker in tickers.items():
             try:
-                # Normalize instrument name
-                pair = pair.replace("-", "_").upper()
-                
-                ticker = Exchange.get_ticker_by_instrument(pair)
-                data = ticker.get('data', {})
+                if 'error' in ticker:
+                    raise RuntimeError(ticker['error'])
+                data = ticker['data']
                 
                 price = float(data.get('lastPrice', 0))
                 volume = float(data.get('volume', 0))
@@ -124,7 +136,8 @@ def get_market_summary(pairs: str = None) -> dict:
                     'high_24h': float(data.get('high', 0)),
                     'low_24h': float(data.get('low', 0)),
                     'change_24h_percent': change,
-                    'trend': '🟢 UP' if change > 0 else '🔴 DOWN' if change < 0 else '🟡 FLAT'
+                    'trend': '🟢 UP' if change > 0 else '🔴 DOWN' if change < 0 else '🟡 FLAT',
+                    'freshness': ticker['freshness']
                 }
                 total_volume += volume
             except Exception as e:
@@ -161,7 +174,7 @@ def calculate_swap_value(amount_in: float, symbol_in: str, symbol_out: str, slip
         pair = f"{symbol_in}_{symbol_out}"
         
         # FETCH REAL PRICE
-        ticker = Exchange.get_ticker_by_instrument(pair)
+        ticker = get_ticker_cache().get_ticker(pair)
         price = float(ticker['data']['lastPrice'])
         amount_out_perfect = amount_in * price
         amount_out_with_slippage = amount_out_perfect * (1 - slippage)
@@ -177,6 +190,7 @@ def calculate_swap_value(amount_in: float, symbol_in: str, symbol_out: str, slip
             "slippage_tolerance_used": slippage,
             "trading_pair": pair,
             "calculation": f"{amount_in} {symbol_in} × ${price} × {(1-slippage)*100:.1f}% = ~{round(amount_out_with_slippage, 4)} {symbol_out}",
+            "freshness": ticker['freshness'],
             "status": "✅ LIVE CALCULATION"
         }
     except Exception as e:
@@ -204,11 +218,10 @@ def analyze_market_conditions(pairs: str = None) -> dict:
         data = {}
         changes = []
         
-        # FETCH REAL DATA FOR ALL PAIRS
-        for pair in pairs_list:
+        # FETCH REAL DATA FOR ALL PAIRS (one snapshot, filtered per pair)
+        for pair, ticker in get_ticker_cache().get_tickers(pairs_list).items():
             try:
-                ticker = Exchange.get_ticker_by_instrument(pair)
-                ticker_data = ticker.get('data', {})
+                ticker_data = ticker['data']
                 
                 price = float(ticker_data.get('lastPrice', 0))
                 change = float(ticker_data.get('change', 0))
@@ -219,7 +232,8 @@ def analyze_market_conditions(pairs: str = None) -> dict:
                     'change_24h': change,
                     'volume': volume,
                     'high': float(ticker_data.get('high', 0)),
-                    'low': float(ticker_data.get('low', 0))
+                    'low': float(ticker_data.get('low', 0)),
+                    'freshness': ticker['freshness']
                 }
                 changes.append(change)
             except:
@@ -1,12 +1,27 @@
 """
 Multi-Agent Trading Council
-Three AI agents vote on trading decisions:
+AI agents vote on trading decisions. By default three built-in personas:
 1. Risk Manager - Conservative, focuses on safety
 2. Market Analyst - Data-driven, focuses on trends
 3. Execution Specialist - Aggressive, focuses on opportunities
+
+A JSON registry (COUNCIL_AGENTS_FILE, see council_agents.example.json) can
+define any number of members, each with its own weight and model. Every
+agent call goes through one process-wide concurrency limit.
+
+COUNCIL_VOTING_MODE=single_call asks one "panel" agent for every vote
+in a single structured reply instead of making one agent call per member.
+The panel runs on COUNCIL_PANEL_MODEL; members' own models apply only to
+multi_call voting.
 """
 import os
-from typing import Dict, List
+import copy
+import re
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, TimeoutError as FutureTimeout
+from typing import Callable, Dict, List
 from datetime import datetime
 from dotenv import load_dotenv
 
@@ -15,6 +30,20 @@ load_dotenv()
 from crypto_com_agent_client import Agent, SQLitePlugin
 from crypto_com_agent_client.lib.enums.provider_enum import Provider
 
+try:
+    from .council_telemetry import CouncilTelemetry
+except ImportError:
+    from council_telemetry import CouncilTelemetry
+
+# Vote -> score used for the confidence-weighted consensus
+VOTE_SCORES = {
+    'strong_sell': 1,
+    'sell': 2,
+    'hold': 3,
+    'buy': 4,
+    'strong_buy': 5
+}
+
 # Agent Personalities
 RISK_MANAGER_PERSONALITY = {
     "name": "Risk Manager",
@@ -109,85 +138,324 @@ Analyze the market data and vote:
 Provide: vote, confidence (0-1), reasoning (1 sentence, action-focused)
 """
 
+DEFAULT_MODEL = "gemini-2.5-flash"
+
+# Built-in persona key -> (personality, instructions, one-word summary)
+BUILTIN_PERSONAS = {
+    'risk_manager': (RISK_MANAGER_PERSONALITY, RISK_MANAGER_INSTRUCTIONS, "Conservative"),
+    'market_analyst': (MARKET_ANALYST_PERSONALITY, MARKET_ANALYST_INSTRUCTIONS, "Data-driven"),
+    'execution_specialist': (EXECUTION_SPECIALIST_PERSONALITY, EXECUTION_SPECIALIST_INSTRUCTIONS, "Aggressive"),
+}
+
+# Single-call mode: one agent voices every member in one structured reply
+PANEL_PERSONALITY = {
+    "name": "Council Panel",
+    "emoji": "🏛️",
+    "tone": "balanced, keeps each member's view separate",
+    "language": "English",
+    "verbosity": "precise",
+}
+
+PANEL_NAME = "🏛️ Council Panel"
+
+VOTING_MODES = ("multi_call", "single_call")
+
+
+def _agent_spec(key: str, personality: Dict, instructions: str, summary: str,
+                weight: float = 1.0, model: str = None) -> Dict:
+    return {
+        'key': key,
+        'name': personality['name'],
+        'emoji': personality.get('emoji', '🤖'),
+        'summary': summary,
+        'personality': personality,
+        'instructions': instructions,
+        'weight': weight,
+        'model': model or DEFAULT_MODEL,
+    }
+
+
+def load_agent_registry(path: str = None) -> Dict[str, Dict]:
+    """
+    Council members, in voting order: key -> spec.
+    Read from COUNCIL_AGENTS_FILE when it exists, else the three built-in personas.
+    An entry either references a built-in ({"persona": "risk_manager", "weight": 1.5})
+    or defines a new member (key, name, emoji, tone, instructions, weight, model).
+    """
+    path = path or os.getenv(
+        "COUNCIL_AGENTS_FILE",
+        os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                     "council_agents.json")
+    )
+    builtins = {
+        key: _agent_spec(key, personality, instructions, summary)
+        for key, (personality, instructions, summary) in BUILTIN_PERSONAS.items()
+    }
+    if not os.path.exists(path):
+        return builtins
+    
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f).get("agents", [])
+    except (OSError, ValueError, AttributeError) as e:
+        print(f"⚠️  Could not read council registry {path} ({e}) - using the built-in personas")
+        return builtins
+    
+    registry = {}
+    for entry in entries:
+        if not entry.get("enabled", True):
+            continue
+        try:
+            weight = float(entry.get("weight", 1.0))
+            if entry.get("persona"):
+                personality, instructions, summary = BUILTIN_PERSONAS[entry["persona"]]
+                key = entry.get("key", entry["persona"])
+            else:
+                key = entry["key"]
+                instructions = entry["instructions"]
+                if isinstance(instructions, list):
+                    instructions = "\n".join(instructions)
+                personality = {
+                    "name": entry["name"],
+                    "emoji": entry.get("emoji", "🤖"),
+                    "tone": entry.get("tone", "analytical"),
+                    "language": "English",
+                    "verbosity": entry.get("verbosity", "precise"),
+                }
+                summary = entry.get("summary", personality["tone"].capitalize())
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"⚠️  Skipping council registry entry {entry}: {e}")
+            continue
+        if key == 'panel' or key in registry or weight <= 0:
+            print(f"⚠️  Skipping council registry entry '{key}' (reserved, duplicate or non-positive weight)")
+            continue
+        registry[key] = _agent_spec(key, personality, instructions, summary, weight, entry.get("model"))
+    
+    if not registry:
+        print(f"⚠️  Council registry {path} has no usable agents - using the built-in personas")
+        return builtins
+    return registry
+
+
+def build_panel_instructions(registry: Dict[str, Dict]) -> str:
+    """Instructions for the single-call panel: every member's framework, kept separate"""
+    sections = [f"=== MEMBER: {key} ===\n{spec['instructions']}" for key, spec in registry.items()]
+    return f"""You speak for all {len(registry)} members of a multi-agent trading council in one reply.
+Each member votes independently, following only its own framework below.
+Do not average the members or let one member's view change another's vote.
+
+""" + "\n".join(sections)
+
+
+# Process-wide cap on concurrent agent calls, shared by every council instance
+_llm_slots = None
+_llm_slots_lock = threading.Lock()
+
+def get_llm_slots() -> threading.BoundedSemaphore:
+    """Get or create the semaphore bounding concurrent agent calls (COUNCIL_MAX_CONCURRENCY)"""
+    global _llm_slots
+    with _llm_slots_lock:
+        if _llm_slots is None:
+            _llm_slots = threading.BoundedSemaphore(int(os.getenv("COUNCIL_MAX_CONCURRENCY", "8")))
+    return _llm_slots
+
 
 class MultiAgentCouncil:
-    """Manages 3 AI agents voting on trading decisions"""
+    """Manages N AI agents voting on trading decisions"""
     
-    def __init__(self, tools: List = None):
+    def __init__(self, tools: List = None, eager: bool = None,
+                 context_sources: Dict[str, Callable[[], object]] = None,
+                 registry: Dict[str, Dict] = None):
+        """
+        Args:
+            tools: tool registry shared by every agent (tools mode)
+            eager: build all agents now instead of on first vote (COUNCIL_EAGER_INIT)
+            context_sources: name -> zero-arg fetcher for the pre-vote snapshot (snapshot mode)
+            registry: council members (defaults to load_agent_registry())
+        """
         print("🤖 Initializing Multi-Agent Trading Council...")
+        started = time.perf_counter()
         
-        self.tools = tools or []
+        # One tool registry and one LLM/blockchain config shared by every agent
+        self.tools = list(dict.fromkeys(tools or []))
         
-        # Create 3 agents with different personalities
-        self.risk_manager = self._create_agent(
-            RISK_MANAGER_PERSONALITY,
-            RISK_MANAGER_INSTRUCTIONS
+        # snapshot: fetch the context once, before voting, and give agents no tools
+        # tools: every agent gets the tool registry and fetches what it wants
+        self.context_sources = dict(context_sources or {})
+        self.context_mode = os.getenv("COUNCIL_CONTEXT_MODE", "tools").lower()
+        if self.context_mode == "snapshot" and not self.context_sources:
+            print("⚠️  COUNCIL_CONTEXT_MODE=snapshot but no context sources given - agents keep their tools")
+            self.context_mode = "tools"
+        self.agent_tools = [] if self.context_mode == "snapshot" else self.tools
+        self.context_timeout = float(os.getenv("COUNCIL_CONTEXT_TIMEOUT", "10"))
+        self._context_executor = ThreadPoolExecutor(
+            max_workers=max(1, len(self.context_sources)),
+            thread_name_prefix="council-context"
         )
+        self.llm_config = {
+            "provider": Provider.GoogleGenAI,
+            "model": DEFAULT_MODEL,
+            "provider-api-key": os.getenv("GEMINI_API_KEY"),
+            "temperature": 0.4,
+        }
+        self.blockchain_config = {
+            "api-key": os.getenv("DEVELOPER_PLATFORM_API_KEY"),
+            "private-key": os.getenv("PRIVATE_KEY"),
+            "timeout": 15,
+        }
+        self.registry = registry or load_agent_registry()
+        self.panel_instructions = build_panel_instructions(self.registry)
+        # One call speaks for every member, so per-member models cannot apply to it
+        self.panel_model = os.getenv("COUNCIL_PANEL_MODEL", DEFAULT_MODEL)
+        self._agents: Dict[str, Agent] = {}
+        self._agent_locks = {key: threading.Lock() for key in [*self.registry, 'panel']}
+        self.agent_build_seconds: Dict[str, float] = {}
+        self.telemetry = CouncilTelemetry(model=self.llm_config["model"])
         
-        self.market_analyst = self._create_agent(
-            MARKET_ANALYST_PERSONALITY,
-            MARKET_ANALYST_INSTRUCTIONS
+        # Agents vote concurrently; each gets its own deadline inside an overall council deadline
+        self.agent_timeout = float(os.getenv("COUNCIL_AGENT_TIMEOUT", "45"))
+        self.council_deadline = float(os.getenv("COUNCIL_DEADLINE", "55"))
+        # One worker per member so nobody queues for a thread; actual agent calls
+        # are bounded process-wide by COUNCIL_MAX_CONCURRENCY (get_llm_slots)
+        self._executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("COUNCIL_MAX_WORKERS", str(max(3, len(self.registry))))),
+            thread_name_prefix="council"
         )
+        # multi_call: one agent call per persona; single_call: one panel call for all votes
+        self.voting_mode = os.getenv("COUNCIL_VOTING_MODE", "multi_call").lower()
+        if self.voting_mode not in VOTING_MODES:
+            print(f"⚠️  Unknown COUNCIL_VOTING_MODE={self.voting_mode} - using multi_call")
+            self.voting_mode = "multi_call"
+        # Stop waiting once the outstanding votes can no longer change the decision
+        self.early_decision = os.getenv("COUNCIL_EARLY_DECISION", "true").lower() == "true"
         
-        self.execution_specialist = self._create_agent(
-            EXECUTION_SPECIALIST_PERSONALITY,
-            EXECUTION_SPECIALIST_INSTRUCTIONS
-        )
+        # Reuse the last decision for (quantized) identical inputs
+        self.cache_enabled = os.getenv("COUNCIL_CACHE_ENABLED", "true").lower() == "true"
+        self.cache_ttl = float(os.getenv("COUNCIL_CACHE_TTL", "1800"))
+        self.cache_quantum = float(os.getenv("COUNCIL_CACHE_QUANTUM", "0.1"))
+        self.cache_drift = float(os.getenv("COUNCIL_CACHE_DRIFT", "0.3"))
+        self._decision_cache: Dict[tuple, Dict] = {}  # fingerprint -> {"result", "stored_at"}
+        self._last_sentiment = None
+        self.cache_hits = 0
+        self.cache_misses = 0
         
-        print("✅ Multi-Agent Council ready!")
-        print(f"   🛡️  Risk Manager: Conservative")
-        print(f"   📊 Market Analyst: Data-driven")
-        print(f"   ⚡ Execution Specialist: Aggressive")
+        # Agents are created on first vote (in parallel, by the voting workers) unless eager
+        if eager is None:
+            eager = os.getenv("COUNCIL_EAGER_INIT", "false").lower() == "true"
+        if eager:
+            self.warm_up()
+        
+        self.startup_seconds = time.perf_counter() - started
+        print(f"✅ Multi-Agent Council ready in {self.startup_seconds * 1000:.0f}ms "
+              f"({'agents built' if eager else 'agents build on first vote'}, "
+              f"{'snapshot context, no tools' if self.context_mode == 'snapshot' else f'{len(self.tools)} shared tools'}, "
+              f"{self.voting_mode.replace('_', '-')} voting)")
+        for spec in self.registry.values():
+            weight = f" (weight {spec['weight']:g})" if spec['weight'] != 1.0 else ""
+            print(f"   {spec['emoji']}  {spec['name']}: {spec['summary']}{weight}")
     
-    def _create_agent(self, personality: Dict, instructions: str) -> Agent:
+    def _create_agent(self, personality: Dict, instructions: str, model: str = None) -> Agent:
         """Create an AI agent with specific personality"""
-        gemini_api_key = os.getenv("GEMINI_API_KEY")
-        
-        llm_config = {
-            "provider": Provider.GoogleGenAI,
-            "model": "gemini-2.5-flash",
-            "provider-api-key": gemini_api_key,
-            "temperature": 0.4,
-        }
-        
+        llm_config = self.llm_config
+        if model and model != llm_config["model"]:
+            llm_config = dict(llm_config, model=model)
         return Agent.init(
             llm_config=llm_config,
-            blockchain_config={
-                "api-key": os.getenv("DEVELOPER_PLATFORM_API_KEY"),
-                "private-key": os.getenv("PRIVATE_KEY"),
-                "timeout": 15,
-            },
+            blockchain_config=self.blockchain_config,
             plugins={
                 "personality": personality,
                 "instructions": instructions,
-                "tools": self.tools,
+                "tools": self.agent_tools,
             }
         )
     
-    def vote_on_trade(self, market_data: Dict, sentiment_signal: Dict) -> Dict:
+    def _get_agent(self, key: str) -> Agent:
+        """Build a member's agent (or the panel agent) the first time it is needed"""
+        agent = self._agents.get(key)
+        if agent is not None:
+            return agent
+        if key not in self._agent_locks:
+            raise KeyError(f"'{key}' is not a council member (registry: {', '.join(self.registry)})")
+        with self._agent_locks[key]:
+            if key not in self._agents:
+                started = time.perf_counter()
+                if key == 'panel':
+                    personality, instructions, model = PANEL_PERSONALITY, self.panel_instructions, self.panel_model
+                else:
+                    spec = self.registry[key]
+                    personality, instructions, model = spec['personality'], spec['instructions'], spec['model']
+                self._agents[key] = self._create_agent(personality, instructions, model)
+                self.agent_build_seconds[key] = time.perf_counter() - started
+                print(f"   🔧 Built {personality['name']} agent in {self.agent_build_seconds[key]:.2f}s")
+        return self._agents[key]
+    
+    def warm_up(self):
+        """Build every agent now, concurrently (e.g. before the first timed vote)"""
+        keys = ['panel'] if self.voting_mode == 'single_call' else list(self.registry)
+        for future in [self._executor.submit(self._get_agent, key) for key in keys]:
+            future.result()
+    
+    def vote_on_trade(self, market_data: Dict, sentiment_signal: Dict, voting_mode: str = None,
+                      context: Dict = None, as_of: datetime = None) -> Dict:
         """
-        All 3 agents vote on trading decision
+        Every council member votes on trading decision
+        voting_mode overrides COUNCIL_VOTING_MODE for this session (multi_call / single_call)
+        context: an already gathered snapshot (name -> value) to use instead of
+            fetching one (snapshot mode), so replays can give several sessions the same data
+        as_of: time shown to the agents (defaults to now)
         Returns: {
-            'votes': [agent1_vote, agent2_vote, agent3_vote],
+            'votes': [one vote per member, in registry order],
             'consensus': final_decision,
-            'confidence': average_confidence
+            'confidence': average_confidence,
+            'timed_out_agents': agents that missed their deadline,
+            'skipped_agents': agents not waited for once the decision was settled
+                (their entries in votes are marked skipped and left out of the consensus)
         }
         """
         print(f"\n{'='*60}")
         print("🗳️  MULTI-AGENT VOTING SESSION")
         print(f"{'='*60}\n")
+        session_started = time.monotonic()
+        # COUNCIL_DEADLINE covers the whole session: context gathering and agent construction included
+        deadline = session_started + self.council_deadline
+        voting_mode = voting_mode or self.voting_mode
+        
+        fingerprint = self._fingerprint(market_data, sentiment_signal, voting_mode)
+        if self.cache_enabled:
+            cached = self._cached_decision(fingerprint, sentiment_signal)
+            if cached:
+                return cached
+        
+        # In snapshot mode the shared context is fetched once, here, instead of by each agent
+        context_block = ""
+        context_seconds = None
+        missing_context = []
+        if self.context_mode == "snapshot":
+            if context is None:
+                context, missing_context, context_seconds = self.gather_context()
+            context_block = self._format_context(context)
         
         # Prepare prompt for all agents
-        prompt = f"""
+        market_block = f"""
 MARKET DATA:
 - Signal: {sentiment_signal.get('signal', 'unknown')}
 - Sentiment Score: {sentiment_signal.get('avg_sentiment', 0):.3f}
 - Strength: {sentiment_signal.get('strength', 0)}/4 sources
 - Trending: {sentiment_signal.get('is_trending', False)}
 - Volume Spike: {sentiment_signal.get('volume_spike', False)}
-
-CURRENT TIME: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
+{context_block}
+CURRENT TIME: {(as_of or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')}
+"""
+        
+        # (persona key, role used in the prompt, display name); agents are resolved in the workers
+        roster = [(key, spec['name'], f"{spec['emoji']} {spec['name']}") for key, spec in self.registry.items()]
+        
+        panel_usage = None
+        if voting_mode == "single_call":
+            votes, timed_out, panel_usage = self._collect_panel_votes(roster, market_block, deadline)
+            skipped = []
+        else:
+            prompt = market_block + f"""
 As the {'{role}'} agent, analyze this data and vote on trading action.
 
 Your response MUST be in this exact format:
@@ -195,35 +463,7 @@ VOTE: [strong_buy/buy/hold/sell/strong_sell]
 CONFIDENCE: [0.0-1.0]
 REASONING: [One clear sentence explaining your vote]
 """
-        
-        votes = []
-        
-        # Get vote from Risk Manager (🛡️ Conservative)
-        print("🛡️  Risk Manager voting...")
-        risk_vote = self._get_agent_vote(
-            self.risk_manager, 
-            prompt.replace('{role}', 'Risk Manager'),
-            "🛡️ Risk Manager"
-        )
-        votes.append(risk_vote)
-        
-        # Get vote from Market Analyst (📊 Data-driven)
-        print("\n📊 Market Analyst voting...")
-        analyst_vote = self._get_agent_vote(
-            self.market_analyst,
-            prompt.replace('{role}', 'Market Analyst'),
-            "📊 Market Analyst"
-        )
-        votes.append(analyst_vote)
-        
-        # Get vote from Execution Specialist (⚡ Aggressive)
-        print("\n⚡ Execution Specialist voting...")
-        exec_vote = self._get_agent_vote(
-            self.execution_specialist,
-            prompt.replace('{role}', 'Execution Specialist'),
-            "⚡ Execution Specialist"
-        )
-        votes.append(exec_vote)
+            votes, timed_out, skipped = self._collect_votes(roster, prompt, deadline)
         
         # Calculate consensus
         consensus = self._calculate_consensus(votes)
@@ -234,42 +474,411 @@ REASONING: [One clear sentence explaining your vote]
         print(f"🗳️  Agreement: {consensus['agreement']}")
         print(f"{'='*60}\n")
         
-        return {
+        session_seconds = time.monotonic() - session_started
+        self.telemetry.record_session(session_seconds)
+        
+        result = {
             'votes': votes,
             'consensus': consensus['decision'],
             'confidence': consensus['confidence'],
             'agreement': consensus['agreement'],
+            'timed_out_agents': timed_out,
+            'skipped_agents': skipped,
+            'cached': False,
+            'context_mode': self.context_mode,
+            'voting_mode': voting_mode,
+            'telemetry': self.telemetry.session_summary(
+                votes, session_seconds, calls=[panel_usage] if panel_usage else None
+            ),
             'timestamp': datetime.now().isoformat()
         }
+        if context_seconds is not None:
+            result['context_seconds'] = round(context_seconds, 3)
+            result['missing_context'] = missing_context
+        
+        # Only complete sessions are reused; a missing or failed agent is worth asking again
+        if self.cache_enabled and not timed_out and all(v['confidence'] > 0 for v in votes if not v.get('skipped')):
+            self._decision_cache[fingerprint] = {"result": copy.deepcopy(result), "stored_at": time.time()}
+        return result
+    
+    def gather_context(self) -> tuple:
+        """
+        Fetch every context source concurrently, bounded by COUNCIL_CONTEXT_TIMEOUT.
+        A source that fails or is late is left out of the snapshot.
+        Returns (name -> value, missing source names, seconds taken).
+        """
+        start = time.monotonic()
+        futures = {
+            self._context_executor.submit(fetch): name
+            for name, fetch in self.context_sources.items()
+        }
+        done, late = wait(futures, timeout=self.context_timeout)
+        
+        context, missing = {}, []
+        for future in done:
+            name = futures[future]
+            try:
+                context[name] = future.result()
+            except Exception as e:
+                print(f"   ⚠️  Context source {name} failed: {e}")
+                missing.append(name)
+        for future in late:
+            future.cancel()
+            print(f"   ⏱️  Context source {futures[future]}: no data within {self.context_timeout:.0f}s")
+            missing.append(futures[future])
+        
+        elapsed = time.monotonic() - start
+        print(f"📋 Context snapshot: {len(context)}/{len(futures)} sources in {elapsed:.2f}s")
+        return context, missing, elapsed
+    
+    def _format_context(self, context: Dict) -> str:
+        """Prompt block for the snapshot, one compact JSON line per source"""
+        if not context:
+            return "\nCONTEXT SNAPSHOT: unavailable this session - vote on the market data alone.\n"
+        lines = [
+            f"- {name}: {json.dumps(value, default=str)[:800]}"
+            for name, value in sorted(context.items())
+        ]
+        return (
+            "\nCONTEXT SNAPSHOT (fetched once for the whole council; you have no tools, use only this data):\n"
+            + "\n".join(lines) + "\n"
+        )
+    
+    def get_metrics(self) -> Dict:
+        """Rolling latency/token/cost telemetry plus cache and startup figures"""
+        metrics = self.telemetry.get_metrics()
+        metrics.update({
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'startup_seconds': round(self.startup_seconds, 3),
+            'agent_build_seconds': {k: round(v, 3) for k, v in self.agent_build_seconds.items()},
+            'context_mode': self.context_mode,
+        })
+        return metrics
     
-    def _get_agent_vote(self, agent: Agent, prompt: str, agent_name: str) -> Dict:
-        """Get vote from a single agent"""
+    def _fingerprint(self, market_data: Dict, sentiment_signal: Dict, voting_mode: str = None) -> tuple:
+        """
+        Quantized view of the voting inputs, plus the voting mode (the two modes
+        may decide differently, so neither may serve the other's cached decision)
+        Sentiment scores snap to COUNCIL_CACHE_QUANTUM; other numbers keep 3 significant digits.
+        """
+        def quantize(key, value):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                return value
+            if key in ('avg_sentiment', 'sentiment_score'):
+                return round(round(value / self.cache_quantum) * self.cache_quantum, 6)
+            return float(f"{value:.3g}")
+        
+        signal_fields = ('signal', 'avg_sentiment', 'strength', 'is_trending', 'volume_spike')
+        return (
+            voting_mode or self.voting_mode,
+            tuple((k, quantize(k, sentiment_signal.get(k))) for k in signal_fields),
+            tuple(sorted(
+                (k, quantize(k, v)) for k, v in market_data.items()
+                if isinstance(v, (str, int, float, bool, type(None)))
+            )),
+        )
+    
+    def _cached_decision(self, fingerprint: tuple, sentiment_signal: Dict) -> Dict:
+        """Previous decision for these inputs, or None (TTL expired / inputs drifted)"""
+        now = time.time()
+        sentiment = sentiment_signal.get('avg_sentiment', 0) or 0
+        
+        # A large move since the last session invalidates every stored decision
+        if self._last_sentiment is not None and abs(sentiment - self._last_sentiment) >= self.cache_drift:
+            if self._decision_cache:
+                print(f"   ♻️  Sentiment moved {sentiment - self._last_sentiment:+.2f} - clearing council cache")
+            self._decision_cache.clear()
+        self._last_sentiment = sentiment
+        
+        self._decision_cache = {
+            key: entry for key, entry in self._decision_cache.items()
+            if now - entry["stored_at"] < self.cache_ttl
+        }
+        entry = self._decision_cache.get(fingerprint)
+        if not entry:
+            self.cache_misses += 1
+            return None
+        
+        self.cache_hits += 1
+        result = copy.deepcopy(entry["result"])
+        for vote in result['votes']:
+            vote['cached'] = True
+        age = now - entry["stored_at"]
+        result.update({
+            'cached': True,
+            'cache_age_seconds': round(age, 1),
+            'telemetry': self.telemetry.session_summary([], None),  # no agent calls this time
+            'timestamp': datetime.now().isoformat()
+        })
+        
+        print(f"♻️  Same inputs as {age / 60:.0f} min ago - reusing council decision (no agent calls)")
+        print(f"📊 CONSENSUS: {result['consensus'].upper()} (cached)")
+        return result
+    
+    def _collect_votes(self, roster: List[tuple], prompt: str, deadline: float) -> tuple:
+        """
+        Ask every agent at once and wait for each up to its deadline
+        (COUNCIL_AGENT_TIMEOUT, cut short by the session deadline, a monotonic time).
+        Agents that miss it count as a zero-confidence HOLD. As soon as the
+        outstanding votes cannot move the decision out of its bucket, the
+        remaining calls are cancelled (or ignored if already running) and
+        those agents get a placeholder vote marked skipped.
+        Returns (votes in roster order, timed-out agent names, skipped agent names).
+        """
+        print(f"🗳️  {len(roster)} agents voting in parallel (max {self.agent_timeout:.0f}s each)...")
+        start = time.monotonic()
+        deadline = min(start + self.agent_timeout, deadline)
+        
+        pending = {
+            self._executor.submit(self._get_agent_vote, agent, prompt.replace('{role}', role), agent_name): agent_name
+            for agent, role, agent_name in roster
+        }
+        
+        weights = {agent_name: self._weight(key) for key, _, agent_name in roster}
+        received = {}
+        skipped = []
+        while pending:
+            done, _ = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                agent_name = pending.pop(future)
+                received[agent_name] = dict(future.result(), weight=weights[agent_name])
+            
+            if self.early_decision and pending:
+                decided = self._decided_early(
+                    list(received.values()),
+                    remaining_weight=sum(weights[agent_name] for agent_name in pending.values())
+                )
+                if decided:
+                    for future, agent_name in pending.items():
+                        # A call already in flight keeps its worker until it returns; the result is ignored
+                        future.cancel()
+                        skipped.append(agent_name)
+                        self.telemetry.record_skip(agent_name)
+                        received[agent_name] = {
+                            'agent': agent_name,
+                            'vote': 'hold',
+                            'confidence': 0.0,
+                            'reasoning': f'Not waited for - decision already settled at {decided.upper()}',
+                            'raw_response': '',
+                            'skipped': True,
+                            'weight': weights[agent_name]
+                        }
+                    print(f"   ✂️  Decision settled at {decided.upper()} - not waiting for {', '.join(skipped)}")
+                    pending = {}
+        
+        timed_out = []
+        for future, agent_name in pending.items():
+            future.cancel()
+            print(f"   ⏱️  {agent_name}: no vote within deadline (counted as HOLD, 0.00)")
+            timed_out.append(agent_name)
+            self.telemetry.record_timeout(agent_name)
+            received[agent_name] = {
+                'agent': agent_name,
+                'vote': 'hold',
+                'confidence': 0.0,
+                'reasoning': 'Timed out before voting',
+                'raw_response': '',
+                'timed_out': True,
+                'weight': weights[agent_name]
+            }
+        
+        votes = [received[agent_name] for _, _, agent_name in roster]
+        print(f"   ⚡ Council voted in {time.monotonic() - start:.1f}s")
+        return votes, timed_out, skipped
+    
+    def _collect_panel_votes(self, roster: List[tuple], market_block: str, deadline: float) -> tuple:
+        """
+        Single-call mode: the panel agent returns every persona's vote in one JSON reply.
+        Personas missing from the reply count as a zero-confidence HOLD; if the call
+        fails or misses its deadline every member counts as timed out.
+        Returns (votes in roster order, timed-out agent names, call usage).
+        """
+        members = ", ".join(f'"{key}"' for key, _, _ in roster)
+        prompt = market_block + f"""
+Give one independent vote per council member ({members}).
+
+Your response MUST be only this JSON object, one entry per member:
+{{"votes": [{{"member": "risk_manager", "vote": "hold", "confidence": 0.6, "reasoning": "One clear sentence"}}]}}
+vote is one of strong_buy/buy/hold/sell/strong_sell, confidence is 0.0-1.0.
+"""
+        print(f"🗳️  {len(roster)} council votes in one panel call (max {self.agent_timeout:.0f}s)...")
+        start = time.monotonic()
+        future = self._executor.submit(self._get_panel_reply, prompt, [key for key, _, _ in roster])
+        failure = 'Timed out before voting'
+        try:
+            replies, usage = future.result(timeout=max(0.0, min(self.agent_timeout, deadline - start)))
+        except FutureTimeout:
+            future.cancel()
+            self.telemetry.record_timeout(PANEL_NAME)
+            print(f"   ⏱️  {PANEL_NAME}: no reply within deadline (every vote counted as HOLD, 0.00)")
+            replies, usage = None, None
+        if replies is None and usage is not None:
+            failure = 'Panel call failed'
+            print(f"   ⚠️  {PANEL_NAME}: call failed (every vote counted as HOLD, 0.00)")
+        
+        votes = []
+        for key, _, agent_name in roster:
+            if replies is None:
+                votes.append({
+                    'agent': agent_name,
+                    'vote': 'hold',
+                    'confidence': 0.0,
+                    'reasoning': failure,
+                    'raw_response': '',
+                    'timed_out': True,
+                    'weight': self._weight(key)
+                })
+                continue
+            
+            vote = replies.get(key) or {
+                'vote': 'hold', 'confidence': 0.0, 'reasoning': 'Missing from panel reply', 'parsed': False
+            }
+            print(f"   {agent_name}: {vote['vote'].upper()} ({vote['confidence']:.2f}) - {vote['reasoning']}")
+            votes.append({
+                'agent': agent_name,
+                'vote': vote['vote'],
+                'confidence': vote['confidence'],
+                'reasoning': vote['reasoning'],
+                'raw_response': vote.get('raw_response', ''),
+                'latency_seconds': usage['latency_seconds'],  # shared by every vote of the call
+                'single_call': True,
+                'weight': self._weight(key)
+            })
+        
+        timed_out = [agent_name for _, _, agent_name in roster] if replies is None else []
+        print(f"   ⚡ Council voted in {time.monotonic() - start:.1f}s")
+        return votes, timed_out, usage
+    
+    def _get_panel_reply(self, prompt: str, members: List[str]) -> tuple:
+        """One panel call; returns (member key -> parsed vote or None if the call failed, call usage)"""
+        sent_text = self.panel_instructions + prompt
+        started = time.monotonic()
+        try:
+            agent = self._get_agent('panel')
+            with get_llm_slots():
+                started = time.monotonic()
+                response = agent.interact(prompt)
+        except Exception as e:
+            usage = self.telemetry.record_call(
+                PANEL_NAME, time.monotonic() - started, sent_text, "", ok=False, model=self.panel_model
+            )
+            print(f"   ❌ {PANEL_NAME} error: {e}")
+            return None, usage
+        
+        replies = self._parse_panel_votes(response)
+        parsed = all(key in replies for key in members)
+        usage = self.telemetry.record_call(
+            PANEL_NAME, time.monotonic() - started, sent_text, response, parsed=parsed, model=self.panel_model
+        )
+        print(f"   {PANEL_NAME}: {len(replies)}/{len(members)} votes "
+              f"[{usage['latency_seconds']:.1f}s, ~{usage['prompt_tokens']}+{usage['response_tokens']} tok]")
+        if not parsed:
+            print(f"   ⚠️  {PANEL_NAME}: reply missing members or not valid JSON")
+        return replies, usage
+    
+    def _parse_panel_votes(self, response: str) -> Dict[str, Dict]:
+        """Member key -> {vote, confidence, reasoning} from the panel's JSON reply"""
+        text = re.sub(r"^```(?:json)?|```$", "", response.strip()).strip()
+        start, end = text.find("{"), text.rfind("}")
+        try:
+            rows = json.loads(text[start:end + 1]).get("votes", [])
+        except (ValueError, AttributeError):
+            return {}
+        
+        replies = {}
+        for row in rows if isinstance(rows, list) else []:
+            try:
+                key = str(row["member"]).strip().lower().replace(" ", "_")
+                vote = str(row["vote"]).strip().lower()
+                confidence = max(0.0, min(1.0, float(row.get("confidence", 0.5))))
+            except (KeyError, TypeError, ValueError):
+                continue
+            if vote not in VOTE_SCORES:
+                continue
+            replies[key] = {
+                'vote': vote,
+                'confidence': confidence,
+                'reasoning': str(row.get("reasoning", "No reasoning provided")),
+                'raw_response': json.dumps(row)[:200]
+            }
+        return replies
+    
+    def _weight(self, key: str) -> float:
+        return self.registry.get(key, {}).get('weight', 1.0)
+    
+    def _decided_early(self, votes: List[Dict], remaining_weight: float) -> str:
+        """
+        Decision bucket if it is already fixed, else None.
+        The weighted score is sum(score * w) / sum(w), w = confidence * agent weight,
+        with each outstanding vote adding w in [0, its agent weight] at a score in
+        [1, 5]. The extremes are "outstanding votes add nothing" and "they all add
+        full weight at 1 (or 5)", so if both ends land in the same bucket the
+        outcome cannot change. remaining_weight is the outstanding agents' total weight.
+        """
+        weight = sum(v['confidence'] * v.get('weight', 1.0) for v in votes)
+        if weight <= 0:
+            return None  # zero-confidence votes fall back to a plain average; nothing to bound
+        total = sum(VOTE_SCORES.get(v['vote'], 3) * v['confidence'] * v.get('weight', 1.0) for v in votes)
+        
+        current = total / weight
+        lowest = min(current, (total + 1 * remaining_weight) / (weight + remaining_weight))
+        highest = max(current, (total + 5 * remaining_weight) / (weight + remaining_weight))
+        
+        decision = self._score_to_decision(lowest)
+        return decision if decision == self._score_to_decision(highest) else None
+    
+    def _get_agent_vote(self, agent, prompt: str, agent_name: str) -> Dict:
+        """Get vote from a single agent (an Agent or a persona key built on demand)"""
+        # Instructions travel with every request, so they count toward the prompt tokens
+        sent_text, model = prompt, None
+        if isinstance(agent, str):
+            sent_text = self.registry[agent]['instructions'] + prompt
+            model = self.registry[agent]['model']
+        started = time.monotonic()
         try:
-            response = agent.interact(prompt)
+            if isinstance(agent, str):
+                agent = self._get_agent(agent)
+            # Building the agent is tracked in agent_build_seconds, waiting for a slot is not model latency
+            with get_llm_slots():
+                started = time.monotonic()
+                response = agent.interact(prompt)
             
             # Parse response
             vote = self._parse_vote(response)
+            usage = self.telemetry.record_call(
+                agent_name, time.monotonic() - started, sent_text, response, parsed=vote['parsed'], model=model
+            )
             
-            print(f"   Vote: {vote['vote'].upper()}")
-            print(f"   Confidence: {vote['confidence']:.2f}")
-            print(f"   Reasoning: {vote['reasoning']}")
+            # One line per agent so concurrent votes don't interleave
+            print(f"   {agent_name}: {vote['vote'].upper()} ({vote['confidence']:.2f}) - {vote['reasoning']} "
+                  f"[{usage['latency_seconds']:.1f}s, ~{usage['prompt_tokens']}+{usage['response_tokens']} tok]")
+            if not vote['parsed']:
+                print(f"   ⚠️  {agent_name}: reply not in VOTE/CONFIDENCE/REASONING format")
             
             return {
                 'agent': agent_name,
                 'vote': vote['vote'],
                 'confidence': vote['confidence'],
                 'reasoning': vote['reasoning'],
-                'raw_response': response[:200]
+                'raw_response': response[:200],
+                **usage
             }
             
         except Exception as e:
-            print(f"   ❌ Error: {e}")
+            usage = self.telemetry.record_call(
+                agent_name, time.monotonic() - started, sent_text, "", ok=False, model=model
+            )
+            print(f"   ❌ {agent_name} error: {e}")
             return {
                 'agent': agent_name,
                 'vote': 'hold',
                 'confidence': 0.0,
                 'reasoning': f'Error getting vote: {str(e)}',
-                'raw_response': ''
+                'raw_response': '',
+                **usage
             }
     
     def _parse_vote(self, response: str) -> Dict:
@@ -279,15 +888,18 @@ REASONING: [One clear sentence explaining your vote]
         vote = 'hold'
         confidence = 0.5
         reasoning = 'No reasoning provided'
+        found_vote = False
         
         for line in lines:
             line = line.strip()
             
             if line.startswith('VOTE:'):
                 vote = line.split(':', 1)[1].strip().lower()
+                found_vote = True
             elif line.startswith('CONFIDENCE:'):
                 try:
                     confidence = float(line.split(':', 1)[1].strip())
+                    confidence = max(0.0, min(1.0, confidence))
                 except:
                     confidence = 0.5
             elif line.startswith('REASONING:'):
@@ -296,54 +908,48 @@ REASONING: [One clear sentence explaining your vote]
         return {
             'vote': vote,
             'confidence': confidence,
-            'reasoning': reasoning
+            'reasoning': reasoning,
+            'parsed': found_vote and vote in VOTE_SCORES
         }
     
     def _calculate_consensus(self, votes: List[Dict]) -> Dict:
         """
-        Calculate consensus from 3 votes
-        Requires 2/3 agreement for strong signals
+        Calculate consensus from N votes
+        Confidence- and agent-weight-weighted average score, mapped to a decision.
+        Skipped members count toward the council size in agreement but cast no vote.
         """
-        # Vote score mapping
-        vote_scores = {
-            'strong_sell': 1,
-            'sell': 2,
-            'hold': 3,
-            'buy': 4,
-            'strong_buy': 5
-        }
+        council_size = len(votes)
+        votes = [v for v in votes if not v.get('skipped')]
         
         # Get vote scores
-        scores = [vote_scores.get(v['vote'], 3) for v in votes]
+        scores = [VOTE_SCORES.get(v['vote'], 3) for v in votes]
         avg_score = sum(scores) / len(scores)
         
         # Calculate weighted average with confidence
-        weighted_score = sum(
-            vote_scores.get(v['vote'], 3) * v['confidence'] 
-            for v in votes
-        ) / sum(v['confidence'] for v in votes)
+        # (plain average when every vote has zero confidence, e.g. all agents errored)
+        total_confidence = sum(v['confidence'] * v.get('weight', 1.0) for v in votes)
+        if total_confidence > 0:
+            weighted_score = sum(
+                VOTE_SCORES.get(v['vote'], 3) * v['confidence'] * v.get('weight', 1.0)
+                for v in votes
+            ) / total_confidence
+        else:
+            weighted_score = avg_score
         
-        # Check for unanimous or 2/3 agreement
+        # Size of the largest voting bloc
         vote_counts = {}
         for v in votes:
             vote_counts[v['vote']] = vote_counts.get(v['vote'], 0) + 1
         
         max_agreement = max(vote_counts.values())
-        agreement = f"{max_agreement}/3 agents agree"
+        agreement = f"{max_agreement}/{council_size} agents agree"
+        if council_size > len(votes):
+            agreement += f" ({council_size - len(votes)} skipped)"
         
         # Determine final decision
-        if weighted_score >= 4.5:
-            decision = 'strong_buy'
-        elif weighted_score >= 3.5:
-            decision = 'buy'
-        elif weighted_score >= 2.5:
-            decision = 'hold'
-        elif weighted_score >= 1.5:
-            decision = 'sell'
-        else:
-            decision = 'strong_sell'
+        decision = self._score_to_decision(weighted_score)
         
-        # Average confidence
+        # Average confidence of the votes cast
         avg_confidence = sum(v['confidence'] for v in votes) / len(votes)
         
         return {
@@ -352,3 +958,16 @@ REASONING: [One clear sentence explaining your vote]
             'agreement': agreement,
             'weighted_score': weighted_score
         }
+    
+    def _score_to_decision(self, weighted_score: float) -> str:
+        """Map a weighted vote score (1-5) to a decision"""
+        if weighted_score >= 4.5:
+            return 'strong_buy'
+        elif weighted_score >= 3.5:
+            return 'buy'
+        elif weighted_score >= 2.5:
+            return 'hold'
+        elif weighted_score >= 1.5:
+            return 'sell'
+        else:
+            return 'strong_sell'
@@ -19,7 +19,6 @@ import schedule
 from typing import Dict
 from datetime import datetime
 from dotenv import load_dotenv
-from signal import signal as signal_handler, SIGALRM, alarm
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
@@ -27,24 +26,20 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from crypto_com_agent_client import Agent, SQLitePlugin
 from crypto_com_agent_client.lib.enums.provider_enum import Provider
 
-from agents.market_data_agent import MARKET_DATA_TOOLS_PRO
-from agents.sentinel_agent import SENTINEL_TOOLS
+from agents.market_data_agent import MARKET_DATA_TOOLS_PRO, get_cro_price, get_market_summary
+from agents.sentinel_agent import SENTINEL_TOOLS, get_sentinel_status
 from agents.executioner_agent import EXECUTIONER_TOOLS
 from agents.multi_agent_council import MultiAgentCouncil
 from monitoring.sentiment_aggregator import SentimentAggregator
 from services.x402_payment import get_x402_client
+from services.ticker_cache import get_ticker_cache
+from services.market_stream import start_market_stream, live_market_stream
+from services.cdc_price_service import get_cdc_service
 
 # Import backend client for real-time dashboard updates
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from backend_client import BackendClient
 
-# Timeout exception for council voting
-class CouncilTimeout(Exception):
-    pass
-
-def timeout_handler(signum, frame):
-    raise CouncilTimeout("Council voting timeout")
-
 load_dotenv()
 
 # Initialize x402 payment client
@@ -107,11 +102,21 @@ class AutonomousTrader:
     
     def __init__(self):
         print("🤖 Initializing Autonomous Trader with Multi-Agent Council...")
+        init_started = time.perf_counter()
         self.sentiment_aggregator = SentimentAggregator()
         
         # Initialize multi-agent council
         all_tools = MARKET_DATA_TOOLS_PRO + SENTINEL_TOOLS + EXECUTIONER_TOOLS
-        self.council = MultiAgentCouncil(tools=all_tools)
+        self._balance_tracker = None
+        self.council = MultiAgentCouncil(
+            tools=all_tools,
+            context_sources={
+                "cro_price": lambda: get_cro_price.invoke({}),
+                "market_summary": lambda: get_market_summary.invoke({}),
+                "sentinel_status": lambda: get_sentinel_status.invoke({}),
+                "balances": self._get_balances,
+            }
+        )
         
         self.trade_history = []
         self.consecutive_losses = 0
@@ -124,7 +129,19 @@ class AutonomousTrader:
         else:
             print("⚠️  Backend not reachable - dashboard won't update")
         
-        print("✅ Autonomous Trader ready!\n")
+        self.startup_seconds = time.perf_counter() - init_started
+        print(f"✅ Autonomous Trader ready in {self.startup_seconds:.2f}s "
+              f"(council {self.council.startup_seconds:.2f}s)\n")
+    
+    def _get_balances(self) -> Dict:
+        """Wallet balances for the council snapshot (tracker created on first use)"""
+        if self._balance_tracker is None:
+            from balance_tracker import BalanceTracker
+            self._balance_tracker = BalanceTracker()
+        return {
+            symbol: {"balance": data.get("balance"), "fresh": data.get("fresh"), "source": data.get("source")}
+            for symbol, data in self._balance_tracker.get_all_balances().items()
+        }
     
     def make_trading_decision(self, execute_trade=True) -> Dict:
         """
@@ -149,6 +166,21 @@ class AutonomousTrader:
         
         # 2. Get latest multi-source sentiment
         signal = self.sentiment_aggregator.aggregate_sentiment("crypto-com-chain")
+        cache_stats = self.sentiment_aggregator.get_cache_stats()
+        coingecko_cache = cache_stats['coingecko']
+        gemini_cache = cache_stats['gemini']
+        print(f"   🗄️  CoinGecko cache: {coingecko_cache.get('hits', 0)} hits / "
+              f"{coingecko_cache.get('stale_hits', 0)} stale / {coingecko_cache.get('misses', 0)} misses")
+        print(f"   🗄️  Gemini cache: {gemini_cache['hit_rate']:.0%} hit rate, "
+              f"{gemini_cache['latency_saved_seconds']:.1f}s saved")
+        tier_metrics = self.sentiment_aggregator.real_sentiment.get_tier_metrics()
+        if tier_metrics['samples']:
+            print(f"   🧠 Local vs Gemini: {tier_metrics['direction_agreement']:.0%} direction agreement, "
+                  f"{tier_metrics['gemini_calls_last_hour']} Gemini calls this hour")
+        source_health = self.sentiment_aggregator.get_source_health()
+        for source_name, health in source_health.items():
+            print(f"   🩺 {source_name}: {health['state']} | p95 {health['p95_seconds']:.2f}s | "
+                  f"timeout {health['timeout_seconds']:.1f}s | {health['failures']} failures")
         
         # 💳 X402 Payment: Pay for sentiment analysis service
         sentiment_payment = x402.pay_for_sentiment_analysis(
@@ -166,7 +198,7 @@ class AutonomousTrader:
                 'signal': signal['signal'],
                 'sentiment': signal.get('avg_sentiment', 0),
                 'confidence': signal.get('strength', 0) / 4.0,
-                'agents': 3
+                'agents': len(self.council.registry)
             })
             
             if not x402.is_authorized(council_payment):
@@ -174,29 +206,21 @@ class AutonomousTrader:
                 sys.stdout.flush()
                 return {"action": "hold", "reason": "Council voting payment failed"}
             
-            # Get votes from 3 AI agents (with 60-second timeout)
-            print("\n⏳ Waiting for Multi-Agent Council votes (max 60s)...")
+            # Get votes from every council agent (voting in parallel, each under its own deadline)
+            print(f"\n⏳ Waiting for Multi-Agent Council votes (max {self.council.council_deadline:.0f}s)...")
             sys.stdout.flush()
             
-            try:
-                # Set 60-second timeout alarm
-                signal_handler(SIGALRM, timeout_handler)
-                alarm(60)
-                
-                council_result = self.council.vote_on_trade(
-                    market_data={
-                        'signal': signal['signal'],
-                        'sentiment_score': signal.get('avg_sentiment', 0),
-                        'strength': signal.get('strength', 0)
-                    },
-                    sentiment_signal=signal
-                )
-                
-                # Cancel alarm if successful
-                alarm(0)
-                
-            except CouncilTimeout:
-                print("\n⚠️  Council voting timeout (60s) - using sentiment signal directly")
+            council_result = self.council.vote_on_trade(
+                market_data={
+                    'signal': signal['signal'],
+                    'sentiment_score': signal.get('avg_sentiment', 0),
+                    'strength': signal.get('strength', 0)
+                },
+                sentiment_signal=signal
+            )
+            
+            if len(council_result.get('timed_out_agents', [])) == len(council_result['votes']):
+                print("\n⚠️  No council agent voted in time - using sentiment signal directly")
                 sys.stdout.flush()
                 # Fallback to sentiment-based decision
                 council_result = {
@@ -214,7 +238,22 @@ class AutonomousTrader:
             print(f"📊 Votes:")
             sys.stdout.flush()
             for vote in council_result['votes']:
-                print(f"   {vote['agent']}: {vote['vote'].upper()} ({vote['confidence']:.2f})")
+                if vote.get('skipped'):
+                    print(f"   {vote['agent']}: ✂️  skipped (decision already settled)")
+                    continue
+                print(f"   {vote['agent']}: {vote['vote'].upper()} ({vote['confidence']:.2f})"
+                      f"{' ♻️  cached' if vote.get('cached') else ''}")
+            if council_result.get('telemetry', {}).get('session_seconds') is not None:
+                metrics = self.council.get_metrics()
+                print(f"⏱️  Council session {council_result['telemetry']['session_seconds']:.1f}s "
+                      f"(p95 {metrics['session_p95_seconds']:.1f}s over {metrics['sessions']}), "
+                      f"~${council_result['telemetry']['cost_usd']:.4f} this vote, "
+                      f"${metrics['total_cost_usd']:.4f} total")
+            ticker_metrics = get_ticker_cache().metrics()
+            if ticker_metrics.get('misses'):
+                print(f"🗄️  Ticker cache: {ticker_metrics['hit_rate']:.0%} hit rate, "
+                      f"{ticker_metrics['saved_rate']:.0%} of lookups served without a request "
+                      f"({ticker_metrics.get('coalesced', 0)} coalesced)")
             
             response = f"Council consensus: {council_result['consensus'].upper()} (confidence: {council_result['confidence']:.2f})"
             print(f"\n🤖 Multi-Agent Decision:\n{response}")
@@ -227,9 +266,14 @@ class AutonomousTrader:
                 "strength": signal.get('strength', 0),
                 "sentiment_score": signal.get('avg_sentiment', 0),
                 "is_trending": signal.get('is_trending', False),
+                "timed_out_sources": signal.get('timed_out_sources', []),
+                "source_health": source_health,
                 "council_votes": council_result['votes'],
                 "consensus": council_result['consensus'],
                 "confidence": council_result['confidence'],
+                "council_cached": council_result.get('cached', False),
+                "council_context_seconds": council_result.get('context_seconds'),
+                "council_telemetry": council_result.get('telemetry'),
                 "agent_response": response,
             }
             self.trade_history.append(decision_log)
@@ -255,13 +299,11 @@ class AutonomousTrader:
                 
                 # Send price update from CDC Exchange (primary source)
                 try:
-                    from services.cdc_price_service import CDCPriceService
-                    cdc_service = CDCPriceService()
-                    price_data = cdc_service.get_cro_price()
+                    price_data = get_cdc_service().get_cro_price()
                     
                     price = price_data['price']
                     price_change = price_data['change_24h']
-                    print(f"   → Sending price: ${price:.6f} ({price_change:+.2f}%)")
+                    print(f"   → Sending price: ${price:.6f} ({price_change:+.2f}%, {price_data.get('age_seconds', 0):.1f}s old)")
                     sys.stdout.flush()
                     self.backend.send_price_update(
                         price=price,
@@ -465,6 +507,16 @@ class AutonomousTrader:
         print("   (Reduced frequency to stay within experimental model limits)")
         print("⏹️  Press Ctrl+C to stop\n")
         
+        # Optional: ingest sentiment continuously so decisions never wait on upstream APIs
+        if os.getenv("SENTIMENT_STREAMING", "false").lower() == "true":
+            self.sentiment_aggregator.start_streaming("crypto-com-chain")
+        
+        # Optional: live ticker state over WebSocket so price reads skip REST (MARKET_STREAM_ENABLED)
+        start_market_stream()
+        
+        # Keep the CRO price snapshot current so each cycle reads it instead of fetching
+        get_cdc_service().start_refresher()
+        
         # Schedule decision-making task (15 min to avoid quota issues)
         schedule.every(15).minutes.do(self.make_trading_decision)
         
@@ -478,6 +530,10 @@ class AutonomousTrader:
                 time.sleep(30)  # Check every 30 seconds
         except KeyboardInterrupt:
             print("\n\n⏹️  Stopping Autonomous Trader...")
+            self.sentiment_aggregator.stop_streaming()
+            if live_market_stream():
+                live_market_stream().stop()
+            get_cdc_service().stop_refresher()
             print(f"📊 Total decisions made: {len(self.trade_history)}")
             print("✅ Shutdown complete")
 
@@ -52,6 +52,7 @@ def get_market_intelligence(coin_id: str = "crypto-com-chain") -> dict:
             "strength": int,  # Number of data sources (0-4)
             "sources": list,  # List of source names
             "is_trending": bool,
+            "timed_out_sources": list,  # Sources that missed their deadline
             "reason": str
         }
     """
@@ -63,6 +64,7 @@ def get_market_intelligence(coin_id: str = "crypto-com-chain") -> dict:
         "strength": int(result.get("strength", 0)),
         "sources": list(result.get("sources", [])),
         "is_trending": bool(result.get("is_trending", False)),
+        "timed_out_sources": list(result.get("timed_out_sources", [])),
         "reason": str(result.get("reason", "No data available"))
     }
 
@@ -90,6 +92,56 @@ def get_coingecko_metrics(coin_id: str = "crypto-com-chain") -> dict:
     return sentiment_agg.get_coingecko_sentiment(coin_id)
 
 
+@mcp.tool()
+def get_watchlist_signals(coin_ids: str = None) -> dict:
+    """
+    Price-momentum scan of a watchlist of Cronos ecosystem tokens in one batched pass.
+    
+    Args:
+        coin_ids: Comma-separated CoinGecko ids (default: WATCHLIST_COINS)
+    
+    Returns per-coin momentum score, signal and strength (from 24h/7d price
+    change, not sentiment), plus trending membership, using one /coins/markets
+    call per 250 coins. requests_made counts only uncached CoinGecko requests.
+    """
+    ids = [c.strip() for c in coin_ids.split(",")] if coin_ids else None
+    result = sentiment_agg.aggregate_watchlist(ids)
+    return {
+        "basis": result["basis"],
+        "coins": result["coins"],
+        "missing": result["missing"],
+        "requests_made": result["requests_made"]
+    }
+
+
+@mcp.tool()
+def get_source_health() -> dict:
+    """
+    Get per-source health of the sentiment pipeline (CoinGecko, Reddit, RSS, Gemini):
+    circuit breaker state, p50/p95 latency, adaptive timeout, failure counts
+    and latency histogram.
+    """
+    return sentiment_agg.get_source_health()
+
+
+@mcp.tool()
+def get_sentiment_history(hours: float = 24, coin_id: str = "crypto-com-chain", source: str = None) -> dict:
+    """
+    Get stored sentiment history from the local time-series store.
+    
+    Args:
+        hours: How far back to look
+        coin_id: CoinGecko id the snapshots were taken for
+        source: Optional raw source (real_news, reddit, coingecko, trending);
+                omit for aggregated snapshots
+    
+    Returns time-ordered rows with timestamp, signal/strength/avg_sentiment
+    (snapshots) or sentiment_score (readings).
+    """
+    rows = sentiment_agg.get_sentiment_history(hours, coin_id, source)
+    return {"count": len(rows), "rows": rows}
+
+
 @mcp.tool()
 def check_cro_price() -> dict:
     """
@@ -283,6 +335,9 @@ if __name__ == "__main__":
     print("      - get_market_intelligence() [Multi-source sentiment]")
     print("      - get_reddit_sentiment() [Community signals]")
     print("      - get_coingecko_metrics() [On-chain metrics]")
+    print("      - get_watchlist_signals() [Batch watchlist scoring]")
+    print("      - get_source_health() [Sentiment source latency & breakers]")
+    print("      - get_sentiment_history() [Stored snapshots & source readings]")
     print("   \n💰 Crypto.com Exchange API Tools:")
     print("      - check_cro_price() [CDC Exchange real-time data]")
     print("      - get_cronos_market_data() [CDC Exchange market summary]")
@@ -0,0 +1,83 @@
+"""
+Incremental RSS Ingestion
+- Conditional GET (ETag / Last-Modified) so unchanged feeds come back as 304
+  and are never re-downloaded or re-parsed
+- Bounded seen-GUID index so only entries we have not handed downstream yet
+  are returned
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List
+
+import feedparser
+
+try:
+    from .http_session import get_http_session
+    from .resilience import get_resilience
+except ImportError:
+    from http_session import get_http_session
+    from resilience import get_resilience
+
+
+class IncrementalFeedReader:
+    """Fetch only new entries from RSS feeds"""
+
+    def __init__(self, max_seen: int = 2000):
+        self.max_seen = max_seen
+        self.session = get_http_session()
+        self.resilience = get_resilience()
+        self._validators: Dict[str, Dict[str, str]] = {}  # url -> {etag, last_modified}
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"fetches": 0, "not_modified": 0, "entries_parsed": 0, "new_entries": 0}
+
+    def fetch_new(self, url: str, limit: int = 20) -> List[Dict]:
+        """
+        Return entries from the first `limit` items of the feed that were not
+        returned by any previous call. An unchanged feed returns [] without parsing.
+        """
+        headers = {}
+        validators = self._validators.get(url, {})
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+        def request(timeout):
+            response = self.session.get(url, headers=headers, timeout=timeout)
+            if response.status_code != 304:
+                response.raise_for_status()
+            return response
+
+        response = self.resilience.call("rss", request)
+        self.stats["fetches"] += 1
+
+        if response.status_code == 304:
+            self.stats["not_modified"] += 1
+            return []
+
+        self._validators[url] = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+
+        feed = feedparser.parse(response.content)
+        entries = feed.entries[:limit]
+        self.stats["entries_parsed"] += len(entries)
+
+        new_entries = []
+        with self._lock:
+            for entry in entries:
+                guid = entry.get("id") or entry.get("link") or entry.get("title")
+                if not guid or guid in self._seen:
+                    continue
+                self._seen[guid] = None
+                new_entries.append(entry)
+
+            # Keep the index bounded (oldest GUIDs are forgotten first)
+            while len(self._seen) > self.max_seen:
+                self._seen.popitem(last=False)
+
+        self.stats["new_entries"] += len(new_entries)
+        return new_entries
@@ -0,0 +1,352 @@
+"""
+Record / Replay Fixtures for the Sentiment Pipeline
+Deterministic offline runs of SentimentAggregator and RealSentimentAnalyzer:
+- record: live CoinGecko, Reddit, RSS and Gemini responses are saved to disk
+- replay: the saved responses are served back, either with their original
+  latency or as fast as possible, and nothing touches the network
+
+Enabled with SENTIMENT_FIXTURE_MODE=record|replay (SENTIMENT_FIXTURE_DIR,
+SENTIMENT_FIXTURE_TIMING=original|fast). HTTP goes through an adapter
+mounted on the shared session; Gemini through a model wrapper.
+
+Benchmark against a recording:
+    python fixtures.py bench --cycles 5 --timing fast
+"""
+
+import os
+import sys
+import json
+import time
+import base64
+import hashlib
+import argparse
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+FIXTURE_MODES = ("off", "record", "replay")
+
+
+def fixture_mode() -> str:
+    mode = os.getenv("SENTIMENT_FIXTURE_MODE", "off").lower()
+    return mode if mode in FIXTURE_MODES else "off"
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()[:24]
+
+
+class FixtureStore:
+    """
+    Recorded exchanges, one JSONL file per kind (http / gemini).
+    Replay hands out the responses recorded for a key in order and keeps
+    returning the last one once they run out.
+    """
+
+    def __init__(self, directory: str = None, timing: str = None):
+        self.directory = directory or os.getenv("SENTIMENT_FIXTURE_DIR", "fixtures/sentiment")
+        self.timing = (timing or os.getenv("SENTIMENT_FIXTURE_TIMING", "original")).lower()
+        self._entries: Dict[str, Dict[str, List[Dict]]] = {}
+        self._cursors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.stats = {"recorded": 0, "replayed": 0, "fallback_matches": 0, "missing": 0}
+
+    def _path(self, kind: str) -> str:
+        return os.path.join(self.directory, f"{kind}.jsonl")
+
+    def _load(self, kind: str) -> Dict[str, List[Dict]]:
+        """Index recorded entries by exact key and by fallback key (caller holds the lock)"""
+        if kind not in self._entries:
+            index: Dict[str, List[Dict]] = {}
+            try:
+                with open(self._path(kind), "r", encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            entry = json.loads(line)
+                            index.setdefault(entry["key"], []).append(entry)
+                            index.setdefault(f"~{entry['fallback_key']}", []).append(entry)
+            except OSError:
+                pass
+            self._entries[kind] = index
+        return self._entries[kind]
+
+    def record(self, kind: str, key: str, fallback_key: str, entry: Dict):
+        """Append one exchange"""
+        entry = {"key": key, "fallback_key": fallback_key, "recorded_at": time.time(), **entry}
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self._path(kind), "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            self.stats["recorded"] += 1
+
+    def replay(self, kind: str, key: str, fallback_key: str) -> Optional[Dict]:
+        """Next recorded exchange for key (or for its fallback key), or None"""
+        with self._lock:
+            index = self._load(kind)
+            lookup = key if key in index else f"~{fallback_key}"
+            entries = index.get(lookup)
+            if not entries:
+                self.stats["missing"] += 1
+                return None
+            if lookup != key:
+                self.stats["fallback_matches"] += 1
+
+            cursor = self._cursors.get(f"{kind}:{lookup}", 0)
+            self._cursors[f"{kind}:{lookup}"] = cursor + 1
+            self.stats["replayed"] += 1
+            entry = entries[min(cursor, len(entries) - 1)]
+
+        if self.timing == "original":
+            time.sleep(entry.get("elapsed", 0.0))
+        return entry
+
+    def reset(self):
+        """Start replaying every key from its first recorded response again"""
+        with self._lock:
+            self._cursors.clear()
+
+
+class FixtureAdapter(HTTPAdapter):
+    """Transport adapter that records live responses or serves recorded ones"""
+
+    def __init__(self, store: FixtureStore, mode: str, **kwargs):
+        super().__init__(**kwargs)
+        self.store = store
+        self.mode = mode
+
+    @staticmethod
+    def _keys(request) -> tuple:
+        # Exact URL (query included); fallback ignores the query, e.g. a Reddit cursor
+        parts = urlsplit(request.url)
+        return (
+            _digest(request.method, request.url),
+            _digest(request.method, f"{parts.scheme}://{parts.netloc}{parts.path}"),
+        )
+
+    def send(self, request, **kwargs):
+        key, fallback_key = self._keys(request)
+
+        if self.mode == "replay":
+            entry = self.store.replay("http", key, fallback_key)
+            if entry is None:
+                raise requests.ConnectionError(f"No fixture recorded for {request.method} {request.url}")
+            return self._build_response(request, entry)
+
+        started = time.monotonic()
+        response = super().send(request, **kwargs)
+        elapsed = time.monotonic() - started
+        self.store.record("http", key, fallback_key, {
+            "method": request.method,
+            "url": request.url,
+            "status": response.status_code,
+            "headers": dict(response.headers),
+            "body": base64.b64encode(response.content).decode("ascii"),
+            "elapsed": round(elapsed, 4),
+        })
+        return response
+
+    def _build_response(self, request, entry: Dict) -> requests.Response:
+        response = requests.Response()
+        response.status_code = entry["status"]
+        headers = dict(entry["headers"])
+        # The body is stored decoded; drop transfer headers that no longer apply
+        for header in ("Content-Encoding", "Transfer-Encoding", "content-encoding", "transfer-encoding"):
+            headers.pop(header, None)
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = base64.b64decode(entry["body"])
+        response.url = request.url
+        response.request = request
+        response.reason = "Replayed"
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.elapsed = timedelta(seconds=entry.get("elapsed", 0.0))
+        response.connection = self
+        return response
+
+
+class _ReplayedText:
+    """Minimal stand-in for a Gemini response"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FixtureModel:
+    """Wraps a Gemini GenerativeModel to record or replay generate_content"""
+
+    def __init__(self, model, store: FixtureStore, mode: str):
+        self.model = model
+        self.store = store
+        self.mode = mode
+
+    def generate_content(self, prompt, **kwargs):
+        prompt_text = str(prompt)
+        key = _digest(getattr(self.model, "model_name", ""), prompt_text)
+        fallback_key = _digest(prompt_text.split("\n", 1)[0])  # same prompt template
+
+        if self.mode == "replay":
+            entry = self.store.replay("gemini", key, fallback_key)
+            if entry is None:
+                raise requests.ConnectionError("No Gemini fixture recorded for this prompt")
+            return _ReplayedText(entry["text"])
+
+        started = time.monotonic()
+        response = self.model.generate_content(prompt, **kwargs)
+        self.store.record("gemini", key, fallback_key, {
+            "prompt": prompt_text,
+            "text": response.text,
+            "elapsed": round(time.monotonic() - started, 4),
+        })
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+
+# Singleton store shared by the HTTP adapter and the Gemini wrapper
+_store = None
+_store_lock = threading.Lock()
+
+def get_fixture_store() -> FixtureStore:
+    """Get or create the process-wide fixture store"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = FixtureStore()
+    return _store
+
+
+def install_fixtures(session: requests.Session) -> requests.Session:
+    """Mount the fixture adapter on a session when a fixture mode is active"""
+    mode = fixture_mode()
+    if mode != "off":
+        adapter = FixtureAdapter(get_fixture_store(), mode, pool_connections=10, pool_maxsize=20)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        print(f"🎞️  HTTP fixtures: {mode} ({get_fixture_store().directory})")
+    return session
+
+
+def wrap_model(model):
+    """Wrap a Gemini model when a fixture mode is active"""
+    mode = fixture_mode()
+    return FixtureModel(model, get_fixture_store(), mode) if mode != "off" else model
+
+
+@contextmanager
+def _scoped_env(overrides: Dict[str, str]):
+    """Set environment variables for the duration of a block, then restore them"""
+    previous = {name: os.environ.get(name) for name in overrides}
+    os.environ.update(overrides)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def benchmark(cycles: int = 5, coin_id: str = "crypto-com-chain", warm: bool = False) -> Dict:
+    """
+    Run aggregate_sentiment `cycles` times against the active fixtures.
+    Cold by default: each cycle uses a fresh aggregator with the response
+    and LLM caches bypassed and the breakers and adaptive timeouts reset,
+    so every cycle does the same work. Recording runs cold too, so every
+    Gemini call is made (and recorded) rather than served from a cache.
+    Replayed and cold runs keep their LLM caches, training log and store in a
+    temporary directory, so fixture data never reaches the real files.
+    """
+    try:
+        from .sentiment_aggregator import SentimentAggregator
+        from .resilience import get_resilience
+    except ImportError:
+        from sentiment_aggregator import SentimentAggregator
+        from resilience import get_resilience
+
+    with tempfile.TemporaryDirectory(prefix="sentiment-bench-") as scratch:
+        overrides = {}
+        if fixture_mode() == "replay" or not warm:
+            overrides = {
+                "GEMINI_CACHE_PATH": os.path.join(scratch, "gemini_headline_cache.json"),
+                "GEMINI_ITEM_CACHE_PATH": os.path.join(scratch, "gemini_item_cache.json"),
+                "GEMINI_TRAINING_LOG": os.path.join(scratch, "gemini_headline_scores.jsonl"),
+                "GEMINI_ITEM_TRAINING_LOG": os.path.join(scratch, "gemini_item_scores.jsonl"),
+                "SENTIMENT_DB_PATH": os.path.join(scratch, "sentiment_timeseries.db"),
+                "SENTIMENT_STORE_ENABLED": "false",
+            }
+        if not warm:
+            overrides.update({"GEMINI_CACHE_TTL": "0", "GEMINI_ITEM_CACHE_TTL": "0"})
+
+        with _scoped_env(overrides):
+            store = get_fixture_store()
+            aggregator = SentimentAggregator()
+            latencies = []
+            try:
+                for _ in range(cycles):
+                    if not warm:
+                        store.reset()
+                        get_resilience().reset()
+                        aggregator.response_cache.invalidate()
+                        aggregator.close()
+                        aggregator = SentimentAggregator()
+                    started = time.perf_counter()
+                    aggregator.aggregate_sentiment(coin_id)
+                    latencies.append(time.perf_counter() - started)
+            finally:
+                aggregator.close()
+
+    ordered = sorted(latencies)
+    total = sum(latencies)
+    return {
+        "cycles": cycles,
+        "mode": fixture_mode(),
+        "timing": store.timing,
+        "p50_seconds": round(ordered[len(ordered) // 2], 4),
+        "p95_seconds": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 4),
+        "mean_seconds": round(total / cycles, 4),
+        "cycles_per_second": round(cycles / total, 2) if total else None,
+        "fixture_stats": dict(store.stats),
+    }
+
+
+def main():
+    """Record fixtures from live sources or benchmark the pipeline against them"""
+    parser = argparse.ArgumentParser(description="Sentiment pipeline record/replay fixtures")
+    parser.add_argument("command", choices=["record", "bench"])
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument("--coin", default="crypto-com-chain")
+    parser.add_argument("--dir", help="fixture directory (SENTIMENT_FIXTURE_DIR)")
+    parser.add_argument("--timing", choices=["original", "fast"], help="replay timing")
+    parser.add_argument("--warm", action="store_true", help="keep caches between bench cycles")
+    args = parser.parse_args()
+
+    os.environ["SENTIMENT_FIXTURE_MODE"] = "record" if args.command == "record" else "replay"
+    if args.dir:
+        os.environ["SENTIMENT_FIXTURE_DIR"] = args.dir
+    if args.timing:
+        os.environ["SENTIMENT_FIXTURE_TIMING"] = args.timing
+
+    if args.command == "record":
+        result = benchmark(cycles=args.cycles, coin_id=args.coin)
+        print(f"\n🎞️  Recorded {result['fixture_stats']['recorded']} exchanges "
+              f"to {get_fixture_store().directory}")
+        return
+
+    result = benchmark(cycles=args.cycles, coin_id=args.coin, warm=args.warm)
+    print("\n📊 Replay benchmark")
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    # Go through the importable module so the CLI shares the fixture store with http_session
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import fixtures
+    sys.exit(fixtures.main())
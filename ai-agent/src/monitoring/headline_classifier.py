@@ -0,0 +1,246 @@
+"""
+Local Headline Sentiment Classifier
+CPU-only, millisecond tier for news headlines:
+- Finance/crypto news lexicon as a prior (works with no training data)
+- Ridge regression over hashed word/bigram features, trained from the
+  Gemini scores we log every time the LLM tier runs (most recent
+  `window` labels only, refit in a background thread)
+Plus the routing policy that picks between this tier and Gemini, and
+agreement tracking between the two.
+"""
+
+import os
+import re
+import json
+import time
+import zlib
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# word -> polarity contribution for a headline
+NEWS_LEXICON = {
+    "partnership": 0.5, "partners": 0.4, "surge": 0.6, "surges": 0.6, "rally": 0.5,
+    "rallies": 0.5, "soar": 0.6, "soars": 0.6, "gain": 0.4, "gains": 0.4, "jump": 0.4,
+    "jumps": 0.4, "adoption": 0.4, "launch": 0.3, "launches": 0.3, "upgrade": 0.3,
+    "listing": 0.4, "lists": 0.3, "record": 0.3, "bullish": 0.6, "approval": 0.4,
+    "approved": 0.4, "integration": 0.3, "milestone": 0.3, "breakout": 0.5, "growth": 0.3,
+    "hack": -0.8, "hacked": -0.8, "exploit": -0.8, "crash": -0.7, "crashes": -0.7,
+    "plunge": -0.6, "plunges": -0.6, "lawsuit": -0.5, "sued": -0.5, "ban": -0.6,
+    "bans": -0.6, "delist": -0.6, "delisting": -0.6, "fraud": -0.8, "drop": -0.4,
+    "drops": -0.4, "fall": -0.3, "falls": -0.3, "bearish": -0.6, "scam": -0.8,
+    "outage": -0.5, "selloff": -0.6, "investigation": -0.4, "fine": -0.3, "fined": -0.4,
+    "layoffs": -0.5, "warning": -0.3, "slump": -0.5, "dump": -0.5, "liquidation": -0.5,
+}
+
+FEATURE_DIM = 1024
+MIN_TRAINING_SAMPLES = 20
+RIDGE_LAMBDA = 1.0
+TRAINING_WINDOW = 5000  # Labels kept for fitting; the log is compacted past twice this
+
+# "." only inside numbers ("0.085"), so "surges." tokenizes to the lexicon word "surges"
+_TOKEN_RE = re.compile(r"[a-z0-9$]+(?:\.[0-9]+)*")
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class HeadlineClassifier:
+    """Lexicon prior + linear model over hashed headline features"""
+
+    def __init__(self, training_log: str = None, window: int = None):
+        """
+        Args:
+            training_log: JSONL file of Gemini-scored headline sets (GEMINI_TRAINING_LOG)
+            window: most recent labels used for fitting (HEADLINE_TRAINING_WINDOW)
+        """
+        self.training_log = training_log or os.getenv("GEMINI_TRAINING_LOG", "gemini_headline_scores.jsonl")
+        self.window = window or int(os.getenv("HEADLINE_TRAINING_WINDOW", str(TRAINING_WINDOW)))
+        self.weights: Optional[np.ndarray] = None
+        self.bias = 0.0
+        self.trained_on = 0
+        self._lock = threading.Lock()
+        self._log_lock = threading.Lock()  # appends vs. compaction
+        self._trainer: Optional[threading.Thread] = None
+        self._new_labels = len(self._load_samples())  # labels not yet in a fit
+
+    def _lexicon_score(self, headline: str) -> float:
+        """Lexicon polarity of one headline, squashed into [-1, 1]"""
+        return float(np.tanh(sum(NEWS_LEXICON.get(token, 0.0) for token in _tokens(headline))))
+
+    def _features(self, headlines: List[str]) -> np.ndarray:
+        """Mean hashed unigram+bigram vector of a headline set, plus the lexicon score"""
+        vector = np.zeros(FEATURE_DIM + 1)
+        for headline in headlines:
+            tokens = _tokens(headline)
+            grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            for gram in grams:
+                vector[zlib.crc32(gram.encode("utf-8")) % FEATURE_DIM] += 1.0
+            vector[FEATURE_DIM] += self._lexicon_score(headline)
+        return vector / max(len(headlines), 1)
+
+    def log_label(self, headlines: List[str], score: float):
+        """Append a Gemini-scored headline set to the training log"""
+        try:
+            with self._log_lock, open(self.training_log, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"headlines": headlines, "score": score, "ts": time.time()}) + "\n")
+            with self._lock:
+                self._new_labels += 1
+        except OSError as e:
+            print(f"   ⚠️  Could not log training sample: {e}")
+
+    def _load_samples(self) -> List[Dict]:
+        """The most recent `window` samples in the training log"""
+        try:
+            with open(self.training_log, "r", encoding="utf-8") as f:
+                return [json.loads(line) for line in deque((l for l in f if l.strip()), maxlen=self.window)]
+        except (OSError, ValueError):
+            return []
+
+    def _compact_log(self):
+        """Keep only the last `window` lines once the log holds more than twice that (caller holds _log_lock)"""
+        try:
+            with open(self.training_log, "r", encoding="utf-8") as f:
+                lines = deque(f, maxlen=2 * self.window + 1)
+            if len(lines) <= 2 * self.window:
+                return
+            tmp_path = f"{self.training_log}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.writelines(list(lines)[-self.window:])
+            os.replace(tmp_path, self.training_log)
+        except OSError as e:
+            print(f"   ⚠️  Could not compact training log: {e}")
+
+    def train(self, min_new_samples: int = 10) -> bool:
+        """
+        Fit ridge regression on the most recent logged Gemini scores.
+        Skipped unless at least min_new_samples arrived since the last fit.
+        """
+        with self._lock:
+            if self._new_labels < min_new_samples:
+                return False
+
+        with self._log_lock:
+            self._compact_log()
+            samples = self._load_samples()
+            if len(samples) < MIN_TRAINING_SAMPLES:
+                return False
+            with self._lock:
+                self._new_labels = 0
+
+        X = np.array([self._features(s["headlines"]) for s in samples])
+        y = np.array([float(s["score"]) for s in samples])
+        bias = y.mean()
+
+        # Primal form: a (FEATURE_DIM + 1)^2 system whatever the number of samples
+        gram = X.T @ X + RIDGE_LAMBDA * np.eye(X.shape[1])
+        weights = np.linalg.solve(gram, X.T @ (y - bias))
+
+        with self._lock:
+            self.weights, self.bias, self.trained_on = weights, bias, len(samples)
+        print(f"   🧠 Local headline model trained on {len(samples)} Gemini-scored sets")
+        return True
+
+    def train_async(self, min_new_samples: int = 10) -> bool:
+        """Start train() in a background thread (one at a time); False if there is nothing to do"""
+        with self._lock:
+            if self._new_labels < min_new_samples or (self._trainer and self._trainer.is_alive()):
+                return False
+            self._trainer = threading.Thread(
+                target=self._train_quietly, args=(min_new_samples,),
+                name="headline-train", daemon=True
+            )
+            self._trainer.start()
+        return True
+
+    def _train_quietly(self, min_new_samples: int):
+        try:
+            self.train(min_new_samples)
+        except Exception as e:
+            print(f"   ⚠️  Local headline model training failed: {e}")
+
+    def predict(self, headlines: List[str]) -> Dict:
+        """Score a headline set locally in the same shape as the Gemini analysis"""
+        with self._lock:
+            weights, bias = self.weights, self.bias
+
+        if weights is None:
+            lexicon = [self._lexicon_score(h) for h in headlines]
+            score = float(np.mean(lexicon)) if lexicon else 0.0
+            confidence, method = "low", "lexicon"
+        else:
+            score = float(bias + self._features(headlines) @ weights)
+            confidence, method = "medium", "linear model"
+
+        score = max(-1.0, min(1.0, score))
+        return {
+            "sentiment_score": score,
+            "confidence": confidence,
+            "reasoning": f"Local {method} score over {len(headlines)} headlines",
+            "articles_analyzed": len(headlines),
+        }
+
+
+class HeadlineRouter:
+    """
+    Decides which tier scores the headlines and tracks how often the
+    tiers agree.
+    - local when the caller's latency budget is below Gemini's recent p95
+    - local when the hourly Gemini quota (GEMINI_HOURLY_QUOTA) is used up
+    - Gemini otherwise
+    """
+
+    def __init__(self, hourly_quota: int = None, agreement_window: int = 200):
+        if hourly_quota is None:
+            hourly_quota = int(os.getenv("GEMINI_HOURLY_QUOTA", "20"))
+        self.hourly_quota = hourly_quota
+        self._gemini_calls = deque()
+        self._agreement = deque(maxlen=agreement_window)  # (gemini, local) score pairs
+        self._lock = threading.Lock()
+
+    def _calls_last_hour(self) -> int:
+        cutoff = time.time() - 3600
+        while self._gemini_calls and self._gemini_calls[0] < cutoff:
+            self._gemini_calls.popleft()
+        return len(self._gemini_calls)
+
+    def choose(self, latency_budget: Optional[float], gemini_p95: Optional[float]) -> tuple:
+        """Return (tier, reason) where tier is 'gemini' or 'local'"""
+        with self._lock:
+            calls = self._calls_last_hour()
+        if calls >= self.hourly_quota:
+            return "local", f"Gemini quota tight ({calls}/{self.hourly_quota} calls this hour)"
+        if latency_budget is not None and gemini_p95 and latency_budget < gemini_p95:
+            return "local", f"latency budget {latency_budget:.1f}s < Gemini p95 {gemini_p95:.1f}s"
+        return "gemini", "within budget and quota"
+
+    def record_gemini_call(self):
+        with self._lock:
+            self._gemini_calls.append(time.time())
+
+    def record_agreement(self, gemini_score: float, local_score: float):
+        with self._lock:
+            self._agreement.append((gemini_score, local_score))
+
+    def agreement_metrics(self) -> Dict:
+        """Direction agreement (±0.1 deadband) and mean absolute gap between tiers"""
+        with self._lock:
+            pairs = list(self._agreement)
+            calls = self._calls_last_hour()
+        if not pairs:
+            return {"samples": 0, "direction_agreement": None, "mean_abs_diff": None,
+                    "gemini_calls_last_hour": calls}
+
+        def direction(score):
+            return 0 if abs(score) < 0.1 else (1 if score > 0 else -1)
+
+        agree = sum(direction(g) == direction(l) for g, l in pairs)
+        return {
+            "samples": len(pairs),
+            "direction_agreement": round(agree / len(pairs), 3),
+            "mean_abs_diff": round(sum(abs(g - l) for g, l in pairs) / len(pairs), 3),
+            "gemini_calls_last_hour": calls,
+        }
@@ -0,0 +1,36 @@
+"""
+Shared HTTP Session
+One pooled requests.Session for every sentiment source, so repeated calls
+to the same host reuse TCP/TLS connections instead of reconnecting.
+In fixture mode the session records or replays responses (see fixtures.py).
+"""
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    from .fixtures import install_fixtures
+except ImportError:
+    from fixtures import install_fixtures
+
+USER_AGENT = "CronosSentinel/1.0 (Autonomous Trading Bot)"
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """Get or create the process-wide pooled session"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({"User-Agent": USER_AGENT})
+            # Record/replay adapter when SENTIMENT_FIXTURE_MODE is set
+            _session = install_fixtures(session)
+    return _session
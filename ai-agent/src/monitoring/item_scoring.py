@@ -0,0 +1,282 @@
+"""
+Per-Item LLM Sentiment Scoring
+One batched Gemini call returns a JSON score for every news headline and
+social post collected in a cycle:
+- Item scores are cached by content hash, so later cycles only pay for
+  items they have not seen before
+- Items the LLM skips (or every item, when Gemini is unavailable or routed
+  around) get a local score from the source's own fallback scorer
+- Source aggregates are computed locally from the item scores
+"""
+
+import os
+import re
+import json
+import time
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    from .llm_cache import LLMResultCache, content_key
+except ImportError:
+    from llm_cache import LLMResultCache, content_key
+
+MAX_ITEM_CHARS = 280  # Reddit self-text is cut to this before prompting
+
+
+class ItemSentimentScorer:
+    """Batched, cached per-item scoring with Gemini and local fallbacks"""
+
+    def __init__(self, model, resilience, fallbacks: Dict[str, Callable[[List[str]], List[float]]],
+                 router=None, cache: LLMResultCache = None, batch_size: int = None,
+                 on_llm_score: Callable[[str, str, float, float], None] = None):
+        """
+        Args:
+            model: Gemini GenerativeModel
+            resilience: ResilienceRegistry used for the "gemini" source
+            fallbacks: source name -> batch scorer used when the LLM has no score
+            router: HeadlineRouter deciding whether Gemini may be called (quota/latency)
+            cache: per-item result cache (defaults to GEMINI_ITEM_CACHE_PATH)
+            batch_size: max items per Gemini request
+            on_llm_score: callback(source, text, llm_score, fallback_score) for each new LLM score
+        """
+        self.model = model
+        self.resilience = resilience
+        self.fallbacks = fallbacks
+        self.router = router
+        self.cache = cache or LLMResultCache(
+            path=os.getenv("GEMINI_ITEM_CACHE_PATH", "gemini_item_cache.json"),
+            ttl=float(os.getenv("GEMINI_ITEM_CACHE_TTL", "86400"))
+        )
+        self.batch_size = batch_size or int(os.getenv("GEMINI_ITEM_BATCH_SIZE", "60"))
+        self.on_llm_score = on_llm_score
+        self.llm_calls = 0
+
+    def _fallback_scores(self, items: List[Tuple[str, str]]) -> List[float]:
+        """Score items with their source's local scorer, one batch per source"""
+        scores = [0.0] * len(items)
+        by_source: Dict[str, List[int]] = {}
+        for index, (source, _) in enumerate(items):
+            by_source.setdefault(source, []).append(index)
+
+        for source, indexes in by_source.items():
+            fallback = self.fallbacks.get(source)
+            if fallback is None:
+                continue
+            for index, score in zip(indexes, fallback([items[i][1] for i in indexes])):
+                scores[index] = score
+        return scores
+
+    def _build_prompt(self, items: List[Tuple[str, str]]) -> str:
+        lines = [
+            f"{i}. [{source}] {' '.join(text.split())[:MAX_ITEM_CHARS]}"
+            for i, (source, text) in enumerate(items)
+        ]
+        return f"""Score the market sentiment toward CRO/Cronos expressed by each item below.
+Items are news headlines and Reddit posts.
+
+Use a scale from -1.0 to 1.0:
+- -1.0 = Very Bearish (hacks, crashes, lawsuits)
+- 0.0 = Neutral, mixed or unrelated
+- 1.0 = Very Bullish (partnerships, adoption, breakthroughs)
+
+Return only a JSON array with one object per item, in this exact form:
+[{{"id": 0, "score": 0.4}}, {{"id": 1, "score": -0.2}}]
+
+Items:
+""" + "\n".join(lines)
+
+    @staticmethod
+    def _parse_scores(response_text: str) -> Dict[int, float]:
+        """Map item id -> clamped score from the model's JSON reply"""
+        text = re.sub(r"^```(?:json)?|```$", "", response_text.strip()).strip()
+        try:
+            rows = json.loads(text)
+        except ValueError:
+            return {}
+        if isinstance(rows, dict):
+            rows = rows.get("items", [])
+
+        scores = {}
+        for row in rows if isinstance(rows, list) else []:
+            try:
+                scores[int(row["id"])] = max(-1.0, min(1.0, float(row["score"])))
+            except (KeyError, TypeError, ValueError):
+                continue
+        return scores
+
+    def _score_with_gemini(self, items: List[Tuple[str, str]]) -> Tuple[Dict[int, float], float]:
+        """One Gemini request for a chunk of items; returns (scores by index, latency)"""
+        prompt = self._build_prompt(items)
+        if self.router:
+            self.router.record_gemini_call()
+        self.llm_calls += 1
+
+        started = time.monotonic()
+        response = self.resilience.call(
+            "gemini",
+            lambda timeout: self.model.generate_content(
+                prompt,
+                generation_config={"response_mime_type": "application/json"},
+                request_options={"timeout": timeout}
+            )
+        )
+        return self._parse_scores(response.text), time.monotonic() - started
+
+    def score_items(self, items: List[Tuple[str, str]], latency_budget: float = None) -> List[Dict]:
+        """
+        Score (source, text) items.
+        Returns one {"score", "tier"} dict per item, tier being cache, gemini or local.
+        """
+        results: List[Optional[Dict]] = [None] * len(items)
+        keys = [content_key([text]) for _, text in items]
+
+        pending: Dict[str, List[int]] = {}  # content key -> item indexes (duplicates share one score)
+        for index, key in enumerate(keys):
+            if key in pending:
+                pending[key].append(index)
+                continue
+            cached = self.cache.get(key)
+            if cached:
+                results[index] = {"score": cached["score"], "tier": "cache"}
+            else:
+                pending[key] = [index]
+
+        unscored = list(pending.items())
+        if not unscored:
+            return results
+
+        to_score = [items[indexes[0]] for _, indexes in unscored]
+        local_scores = self._fallback_scores(to_score)
+        llm_scores: Dict[int, float] = {}
+
+        tier, route_reason = "gemini", None
+        if self.router:
+            gemini_p95 = self.resilience.source("gemini").snapshot()["p95_seconds"]
+            tier, route_reason = self.router.choose(latency_budget, gemini_p95)
+
+        if tier == "gemini":
+            print(f"   Scoring {len(to_score)} new items with Gemini ({len(items) - len(to_score)} cached)...")
+            for start in range(0, len(to_score), self.batch_size):
+                chunk = to_score[start:start + self.batch_size]
+                try:
+                    chunk_scores, latency = self._score_with_gemini(chunk)
+                except Exception as e:
+                    print(f"   ⚠️  Gemini item scoring failed (using local scores): {type(e).__name__}")
+                    break
+
+                fresh = {}
+                for offset, score in chunk_scores.items():
+                    if 0 <= offset < len(chunk):
+                        llm_scores[start + offset] = score
+                        fresh[unscored[start + offset][0]] = {"score": score}
+                if fresh:
+                    self.cache.put_many(fresh, latency / len(fresh))
+        else:
+            print(f"   ✓ Local item scores for {len(to_score)} new items ({route_reason})")
+
+        for position, (key, indexes) in enumerate(unscored):
+            if position in llm_scores:
+                entry = {"score": llm_scores[position], "tier": "gemini"}
+                if self.on_llm_score:
+                    source, text = to_score[position]
+                    self.on_llm_score(source, text, llm_scores[position], local_scores[position])
+            else:
+                entry = {"score": local_scores[position], "tier": "local"}
+            for index in indexes:
+                results[index] = dict(entry)
+
+        return results
+
+    def open_batch(self, participants: int, max_wait: float = None) -> "ScoringBatch":
+        """Start a batch that merges the items of several sources into one scoring call"""
+        if max_wait is None:
+            max_wait = float(os.getenv("SENTIMENT_ITEM_BATCH_WAIT", "8"))
+        return ScoringBatch(self, participants, max_wait)
+
+    def metrics(self) -> Dict:
+        """Item cache hit rate and number of Gemini scoring requests"""
+        metrics = self.cache.metrics()
+        metrics["llm_calls"] = self.llm_calls
+        return metrics
+
+
+class ScoringBatch:
+    """
+    Rendezvous for the sources of one collection cycle.
+    Each source hands over its items and blocks; once every participant has
+    submitted (or withdrawn), or max_wait has passed, a single scoring call
+    covers all of them. Sources arriving after that are scored on their own.
+    """
+
+    def __init__(self, scorer: ItemSentimentScorer, participants: int, max_wait: float):
+        self.scorer = scorer
+        self.waiting_for = participants
+        self.deadline = time.monotonic() + max_wait
+        self._items: List[Tuple[str, str]] = []
+        self._results: Optional[List[Dict]] = None
+        self._flushing = False
+        self._cond = threading.Condition()
+
+    def score_items(self, items: List[Tuple[str, str]]) -> List[Dict]:
+        """Submit one source's items and wait for the shared scoring call"""
+        with self._cond:
+            if self._flushing:
+                late = True
+            else:
+                late = False
+                start = len(self._items)
+                self._items.extend(items)
+                self.waiting_for -= 1
+                self._cond.notify_all()
+
+                flush = False
+                while self._results is None and not self._flushing:
+                    remaining = self.deadline - time.monotonic()
+                    if self.waiting_for <= 0 or remaining <= 0:
+                        self._flushing = flush = True
+                        batch = list(self._items)
+                        break
+                    self._cond.wait(remaining)
+
+        if late:
+            return self.scorer.score_items(items)
+
+        if flush:
+            try:
+                results = self.scorer.score_items(batch)
+            except Exception as e:
+                print(f"   ⚠️  Batched item scoring failed: {e}")
+                results = [{"score": score, "tier": "local"} for score in self.scorer._fallback_scores(batch)]
+            with self._cond:
+                self._results = results
+                self._cond.notify_all()
+        else:
+            with self._cond:
+                while self._results is None:
+                    self._cond.wait()
+
+        return self._results[start:start + len(items)]
+
+    def withdraw(self):
+        """A participant that has nothing to submit (e.g. its fetch failed)"""
+        with self._cond:
+            self.waiting_for -= 1
+            self._cond.notify_all()
+
+    def run(self, fetch: Callable[[Callable[[List[Tuple[str, str]]], List[Dict]]], Dict]) -> Dict:
+        """
+        Run one participant's fetch(score_items) inside the batch.
+        Withdraws automatically if the fetch finishes without submitting items.
+        """
+        submitted = []
+
+        def score_items(items):
+            submitted.append(True)
+            return self.score_items(items)
+
+        try:
+            return fetch(score_items)
+        finally:
+            if not submitted:
+                self.withdraw()
@@ -0,0 +1,100 @@
+"""
+Persistent LLM Result Cache
+Content-addressed store for LLM analysis results so identical inputs
+(e.g. an unchanged headline set on a slow news day) skip the model call.
+Results survive restarts via a small JSON file.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, Iterable, Optional
+
+
+def content_key(items: Iterable[str]) -> str:
+    """
+    Normalized hash of a set of texts
+    Case, surrounding/repeated whitespace, duplicates and order are ignored.
+    """
+    normalized = sorted({" ".join(str(item).lower().split()) for item in items if item})
+    return hashlib.sha256("\n".join(normalized).encode("utf-8")).hexdigest()
+
+
+class LLMResultCache:
+    """JSON-backed TTL cache with hit-rate and latency-saved metrics"""
+
+    def __init__(self, path: str, ttl: float):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = self._load()
+        self.hits = 0
+        self.misses = 0
+        self.latency_saved = 0.0
+
+    def _load(self) -> Dict:
+        """Load entries from disk, ignoring a missing or corrupt file"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        """Atomically write entries to disk (caller holds the lock)"""
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"   ⚠️  Could not persist LLM cache: {e}")
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached result for key, or None on miss/expiry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.time() - entry["stored_at"] < self.ttl:
+                self.hits += 1
+                self.latency_saved += entry.get("latency", 0.0)
+                return dict(entry["result"])
+
+            if entry:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, result: Dict, latency: float):
+        """Store a result along with how long the LLM took to produce it"""
+        self.put_many({key: result}, latency)
+
+    def put_many(self, results: Dict[str, Dict], latency: float):
+        """Store several results from one LLM call with a single disk write"""
+        with self._lock:
+            now = time.time()
+            # Drop expired entries so the file does not grow without bound
+            self._entries = {
+                k: v for k, v in self._entries.items()
+                if now - v["stored_at"] < self.ttl
+            }
+            for key, result in results.items():
+                self._entries[key] = {
+                    "result": result,
+                    "latency": round(latency, 3),
+                    "stored_at": now,
+                }
+            self._save()
+
+    def metrics(self) -> Dict:
+        """Hit rate and total LLM latency avoided"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "latency_saved_seconds": round(self.latency_saved, 2),
+                "entries": len(self._entries),
+            }
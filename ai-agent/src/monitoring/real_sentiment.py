@@ -6,13 +6,29 @@ Real Sentiment Sources - No API Keys Required
 """
 
 import os
-import requests
-import feedparser
-from typing import Dict, List
+import time
+from typing import Callable, Dict, List, Tuple
 from datetime import datetime
 from dotenv import load_dotenv
 import google.generativeai as genai
 
+try:
+    from .llm_cache import LLMResultCache, content_key
+    from .feed_reader import IncrementalFeedReader
+    from .resilience import get_resilience
+    from .headline_classifier import HeadlineClassifier, HeadlineRouter
+    from .item_scoring import ItemSentimentScorer
+    from .fixtures import wrap_model
+    from .text_scoring import get_social_scorer
+except ImportError:
+    from llm_cache import LLMResultCache, content_key
+    from feed_reader import IncrementalFeedReader
+    from resilience import get_resilience
+    from headline_classifier import HeadlineClassifier, HeadlineRouter
+    from item_scoring import ItemSentimentScorer
+    from fixtures import wrap_model
+    from text_scoring import get_social_scorer
+
 load_dotenv()
 
 
@@ -22,22 +38,58 @@ class RealSentimentAnalyzer:
     def __init__(self):
         self.cryptopanic_rss = "https://cryptopanic.com/news/rss/"
         genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-        self.gemini_model = genai.GenerativeModel('gemini-2.5-flash')
+        # Recorded/replayed instead of called live when SENTIMENT_FIXTURE_MODE is set
+        self.gemini_model = wrap_model(genai.GenerativeModel('gemini-2.5-flash'))
+        
+        # Memoize Gemini results by headline set (persists across restarts)
+        self.gemini_cache = LLMResultCache(
+            path=os.getenv("GEMINI_CACHE_PATH", "gemini_headline_cache.json"),
+            ttl=float(os.getenv("GEMINI_CACHE_TTL", "3600"))
+        )
+        
+        # Incremental RSS ingestion: feeds only hand over entries we have not seen
+        self.feed_reader = IncrementalFeedReader()
+        self.resilience = get_resilience()
+        
+        # Local CPU tier for headlines + policy choosing between it and Gemini.
+        # Per-headline labels (item mode) train their own model, apart from headline-set labels.
+        self.local_classifier = HeadlineClassifier()
+        self.item_classifier = HeadlineClassifier(
+            training_log=os.getenv("GEMINI_ITEM_TRAINING_LOG", "gemini_item_scores.jsonl")
+        )
+        self.tier_router = HeadlineRouter()
+        
+        # Per-item scoring: one JSON-scored batch for headlines and social posts
+        self.item_scoring = os.getenv("SENTIMENT_ITEM_SCORING", "false").lower() == "true"
+        self.item_scorer = ItemSentimentScorer(
+            model=self.gemini_model,
+            resilience=self.resilience,
+            fallbacks={
+                "news": lambda titles: [self.item_classifier.predict([t])["sentiment_score"] for t in titles],
+                "reddit": get_social_scorer().score_batch,
+            },
+            router=self.tier_router,
+            on_llm_score=self._on_item_scored
+        )
+        # Rolling window of the most recent relevant articles per feed (newest first)
+        self.recent_articles = {"CryptoPanic": [], "Google News": []}
+        self.window_sizes = {"CryptoPanic": 20, "Google News": 15}
     
     def get_cryptopanic_news(self, filter_keywords=None) -> List[Dict]:
         """
         Scrape CryptoPanic RSS feed
         Free, no authentication required
+        Returns only articles that are new since the previous call
         """
         if filter_keywords is None:
             filter_keywords = ["CRO", "Cronos", "Crypto.com"]
         
         try:
             print(f"   Fetching CryptoPanic RSS feed...")
-            feed = feedparser.parse(self.cryptopanic_rss)
+            entries = self.feed_reader.fetch_new(self.cryptopanic_rss, limit=20)  # Latest 20
             
             articles = []
-            for entry in feed.entries[:20]:  # Get latest 20
+            for entry in entries:
                 title = entry.get('title', '')
                 
                 # Filter for relevant keywords
@@ -49,7 +101,7 @@ class RealSentimentAnalyzer:
                         'source': 'CryptoPanic'
                     })
             
-            print(f"   ✓ CryptoPanic: Found {len(articles)} relevant articles")
+            print(f"   ✓ CryptoPanic: Found {len(articles)} new relevant articles")
             return articles
             
         except Exception as e:
@@ -60,6 +112,7 @@ class RealSentimentAnalyzer:
         """
         Scrape Google News RSS feed
         Free, no authentication required
+        Returns only articles that are new since the previous call
         """
         try:
             # Google News RSS endpoint with URL encoding
@@ -68,10 +121,10 @@ class RealSentimentAnalyzer:
             news_url = f"https://news.google.com/rss/search?q={encoded_query}&hl=en-US&gl=US&ceid=US:en"
             
             print(f"   Fetching Google News for '{query}'...")
-            feed = feedparser.parse(news_url)
+            entries = self.feed_reader.fetch_new(news_url, limit=15)  # Latest 15
             
             articles = []
-            for entry in feed.entries[:15]:  # Get latest 15
+            for entry in entries:
                 articles.append({
                     'title': entry.get('title', ''),
                     'link': entry.get('link', ''),
@@ -79,17 +132,20 @@ class RealSentimentAnalyzer:
                     'source': 'Google News'
                 })
             
-            print(f"   ✓ Google News: Found {len(articles)} articles")
+            print(f"   ✓ Google News: Found {len(articles)} new articles")
             return articles
             
         except Exception as e:
             print(f"   ✗ Google News error: {e}")
             return []
     
-    def analyze_headlines_with_gemini(self, articles: List[Dict]) -> Dict:
+    def analyze_headlines_with_gemini(self, articles: List[Dict], latency_budget: float = None) -> Dict:
         """
         Use Gemini AI to analyze sentiment from headlines
         Returns structured sentiment score (-1 to 1)
+        
+        Falls back to the local classifier when the latency budget or the
+        Gemini quota is tight, or when the Gemini call fails.
         """
         if not articles:
             return {
@@ -102,6 +158,26 @@ class RealSentimentAnalyzer:
         headlines = [f"- {article['title']}" for article in articles[:10]]
         headlines_text = "\n".join(headlines)
         
+        # Same headline set as a recent cycle -> reuse that analysis
+        cache_key = content_key(article['title'] for article in articles[:10])
+        cached = self.gemini_cache.get(cache_key)
+        if cached:
+            print(f"   ✓ Gemini Analysis (cached): {cached['sentiment_score']:.2f} ({cached['confidence']} confidence)")
+            cached["cached"] = True
+            cached["tier"] = "cache"
+            return cached
+        
+        titles = [article['title'] for article in articles[:10]]
+        self.local_classifier.train_async()
+        
+        gemini_p95 = self.resilience.source("gemini").snapshot()["p95_seconds"]
+        tier, route_reason = self.tier_router.choose(latency_budget, gemini_p95)
+        if tier == "local":
+            result = self.local_classifier.predict(titles)
+            print(f"   ✓ Local Analysis: {result['sentiment_score']:.2f} ({route_reason})")
+            result.update({"tier": "local", "route_reason": route_reason})
+            return result
+        
         prompt = f"""Analyze the market sentiment for CRO/Cronos based on these recent news headlines:
 
 {headlines_text}
@@ -136,17 +212,21 @@ REASONING: [one sentence explanation]"""
             # Set timeout to 30 seconds (Windows doesn't support signal.SIGALRM, so we'll handle it differently)
             # For Windows compatibility, we'll just call it directly and catch any errors
             try:
-                response = self.gemini_model.generate_content(prompt, request_options={"timeout": 30})
+                call_started = time.monotonic()
+                self.tier_router.record_gemini_call()
+                # Adaptive timeout (30s until there is latency history); skipped while the breaker is open
+                response = self.resilience.call(
+                    "gemini",
+                    lambda timeout: self.gemini_model.generate_content(prompt, request_options={"timeout": timeout})
+                )
                 response_text = response.text.strip()
+                call_latency = time.monotonic() - call_started
             except Exception as api_error:
-                # If timeout or API error, return neutral sentiment and continue
-                print(f"   ⚠️  Gemini API timeout/error (using neutral sentiment): {type(api_error).__name__}")
-                return {
-                    "sentiment_score": 0.0,
-                    "confidence": "low",
-                    "reasoning": "Skipped Gemini analysis due to API timeout - using neutral sentiment",
-                    "articles_analyzed": len(headlines)
-                }
+                # If timeout or API error, score locally instead of going neutral
+                print(f"   ⚠️  Gemini API timeout/error (using local classifier): {type(api_error).__name__}")
+                result = self.local_classifier.predict(titles)
+                result.update({"tier": "local", "route_reason": f"Gemini failed: {type(api_error).__name__}"})
+                return result
             
             # Parse response
             lines = response_text.split('\n')
@@ -169,12 +249,20 @@ REASONING: [one sentence explanation]"""
             
             print(f"   ✓ Gemini Analysis: {sentiment_score:.2f} ({confidence} confidence)")
             
-            return {
+            result = {
                 "sentiment_score": sentiment_score,
                 "confidence": confidence,
                 "reasoning": reasoning,
                 "articles_analyzed": len(headlines)
             }
+            if reasoning != "Unable to parse response":
+                self.gemini_cache.put(cache_key, result, call_latency)
+                # Every Gemini score is a training label and an agreement sample for the local tier
+                self.local_classifier.log_label(titles, sentiment_score)
+                local = self.local_classifier.predict(titles)
+                self.tier_router.record_agreement(sentiment_score, local["sentiment_score"])
+            result["tier"] = "gemini"
+            return result
             
         except Exception as e:
             print(f"   ✗ Gemini analysis error: {e}")
@@ -184,41 +272,113 @@ REASONING: [one sentence explanation]"""
                 "reasoning": f"Analysis failed: {str(e)[:50]}"
             }
     
-    def get_aggregated_sentiment(self) -> Dict:
+    def _on_item_scored(self, source: str, text: str, llm_score: float, local_score: float):
+        """Per-headline Gemini scores also train and benchmark the local tier"""
+        if source == "news":
+            self.item_classifier.log_label([text], llm_score)
+            self.item_classifier.train_async()
+            self.tier_router.record_agreement(llm_score, local_score)
+    
+    def score_articles(self, articles: List[Dict],
+                       score_items: Callable[[List[Tuple[str, str]]], List[Dict]]) -> Dict:
+        """
+        Score every article individually and average the item scores locally
+        Returns the same shape as analyze_headlines_with_gemini plus item_scores
+        """
+        titles = [article['title'] for article in articles]
+        scored = score_items([("news", title) for title in titles])
+        
+        llm_scored = sum(1 for item in scored if item["tier"] != "local")
+        sentiment_score = sum(item["score"] for item in scored) / len(scored)
+        if llm_scored >= 0.8 * len(scored) and len(scored) >= 5:
+            confidence = "high"
+        elif llm_scored >= 0.5 * len(scored):
+            confidence = "medium"
+        else:
+            confidence = "low"
+        
+        print(f"   ✓ Item Analysis: {sentiment_score:.2f} over {len(scored)} articles ({llm_scored} LLM-scored)")
+        return {
+            "sentiment_score": sentiment_score,
+            "confidence": confidence,
+            "reasoning": f"Mean of {len(scored)} per-article scores ({llm_scored} LLM, {len(scored) - llm_scored} local)",
+            "articles_analyzed": len(scored),
+            "tier": "items",
+            "item_scores": [
+                {"title": title, "score": round(item["score"], 3), "tier": item["tier"]}
+                for title, item in zip(titles, scored)
+            ],
+        }
+    
+    def _merge_recent(self, feed_name: str, new_articles: List[Dict]):
+        """Prepend newly seen articles to a feed's bounded window"""
+        window = new_articles + self.recent_articles[feed_name]
+        self.recent_articles[feed_name] = window[:self.window_sizes[feed_name]]
+    
+    def get_cache_metrics(self) -> Dict:
+        """Gemini memoization hit rate and latency saved"""
+        if self.item_scoring:
+            return self.item_scorer.metrics()
+        return self.gemini_cache.metrics()
+    
+    def get_tier_metrics(self) -> Dict:
+        """Agreement between Gemini and the local classifier, plus quota usage"""
+        metrics = self.tier_router.agreement_metrics()
+        metrics["local_model_trained_on"] = self.local_classifier.trained_on
+        metrics["item_model_trained_on"] = self.item_classifier.trained_on
+        return metrics
+    
+    def get_aggregated_sentiment(self, latency_budget: float = None,
+                                 score_items: Callable[[List[Tuple[str, str]]], List[Dict]] = None) -> Dict:
         """
         Aggregate sentiment from all real sources
         Returns comprehensive sentiment analysis
+        
+        Args:
+            latency_budget: Seconds the caller can wait; used to route headline scoring
+            score_items: per-item scorer (e.g. a batch shared with Reddit); item mode only
         """
+        started = time.monotonic()
         print("\n🔍 Real-Time Sentiment Analysis")
         print("=" * 60)
         
-        # Collect articles from all sources
-        all_articles = []
-        
-        # CryptoPanic
-        cryptopanic_articles = self.get_cryptopanic_news()
-        all_articles.extend(cryptopanic_articles)
+        # Collect new articles and fold them into each feed's rolling window
+        new_cryptopanic = self.get_cryptopanic_news()
+        new_google = self.get_google_news_headlines()
+        self._merge_recent("CryptoPanic", new_cryptopanic)
+        self._merge_recent("Google News", new_google)
         
-        # Google News
-        google_articles = self.get_google_news_headlines()
-        all_articles.extend(google_articles)
+        cryptopanic_articles = self.recent_articles["CryptoPanic"]
+        google_articles = self.recent_articles["Google News"]
+        all_articles = cryptopanic_articles + google_articles
         
         if not all_articles:
             print("   ⚠️  No articles found")
             raise Exception("No articles found for sentiment analysis")
         
-        # Analyze with Gemini API (primary source only)
-        analysis = self.analyze_headlines_with_gemini(all_articles)
+        # Analyze with Gemini API (or the local tier when the remaining budget is too small)
+        remaining = latency_budget - (time.monotonic() - started) if latency_budget is not None else None
+        if self.item_scoring:
+            analysis = self.score_articles(
+                all_articles,
+                score_items or (lambda items: self.item_scorer.score_items(items, latency_budget=remaining))
+            )
+        else:
+            analysis = self.analyze_headlines_with_gemini(all_articles, latency_budget=remaining)
         
         return {
             "source": "real_news",
             "sentiment_score": analysis["sentiment_score"],
             "confidence": analysis["confidence"],
             "reasoning": analysis["reasoning"],
+            "gemini_cached": analysis.get("cached", False),
+            "scoring_tier": analysis.get("tier", "gemini"),
             "articles_count": len(all_articles),
+            "new_articles_count": len(new_cryptopanic) + len(new_google),
             "cryptopanic_count": len(cryptopanic_articles),
             "google_news_count": len(google_articles),
             "sample_headlines": [a['title'] for a in all_articles[:3]],
+            "item_scores": analysis.get("item_scores"),
             "timestamp": datetime.now().isoformat()
         }
 
@@ -0,0 +1,182 @@
+"""
+Incremental Reddit Sentiment Source
+- Pooled HTTP session, one parallel request per subreddit
+- Per-subreddit `before` cursor so each cycle only downloads new posts
+- Post-id keyed score cache: a post is scored exactly once (new posts are
+  scored in one batch by the shared social text scorer)
+- Running weighted sums over a bounded window of recent posts, so the
+  aggregate is updated incrementally instead of re-scored from scratch
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+try:
+    from .http_session import get_http_session
+    from .text_scoring import SocialTextScorer, get_social_scorer
+    from .resilience import get_resilience
+except ImportError:
+    from http_session import get_http_session
+    from text_scoring import SocialTextScorer, get_social_scorer
+    from resilience import get_resilience
+
+DEFAULT_SUBREDDITS = ["CryptoCurrency", "CronosOfficial", "Crypto_com"]
+
+
+class _QueryState:
+    """Cursors and scored window for one search query"""
+
+    def __init__(self):
+        self.cursors: Dict[str, Dict] = {}  # subreddit -> {"name": fullname, "set_at": ts}
+        self.window: "OrderedDict[str, tuple]" = OrderedDict()  # post_id -> (score, weight)
+        self.weighted_sum = 0.0
+        self.weight_total = 0.0
+
+
+class RedditSentimentSource:
+    """Reddit sentiment with connection reuse, parallel fetches and incremental scoring"""
+
+    def __init__(self, subreddits: List[str] = None, limit: int = 10, window_size: int = 30,
+                 cursor_max_age: float = 3600, scorer: SocialTextScorer = None):
+        self.subreddits = subreddits or DEFAULT_SUBREDDITS
+        self.limit = limit
+        self.window_size = window_size
+        self.cursor_max_age = cursor_max_age
+        self.scorer = scorer or get_social_scorer()
+        self.session = get_http_session()
+        self.resilience = get_resilience()
+        self._executor = ThreadPoolExecutor(
+            max_workers=len(self.subreddits),
+            thread_name_prefix="reddit"
+        )
+        self._states: Dict[str, _QueryState] = {}
+        self._score_cache: "OrderedDict[str, float]" = OrderedDict()  # post_id -> text score
+        self._lock = threading.Lock()
+
+    def close(self):
+        """Release the subreddit fetch pool"""
+        self._executor.shutdown(wait=False)
+
+    @staticmethod
+    def _post_id(post: Dict) -> Optional[str]:
+        """Reddit fullname (t3_xxx), falling back to the bare id"""
+        return post.get('name') or post.get('id')
+
+    def _fetch_subreddit(self, subreddit: str, query: str, state: _QueryState) -> List[Dict]:
+        """Fetch posts newer than the subreddit's cursor"""
+        url = f"https://www.reddit.com/r/{subreddit}/search.json"
+        params = {"q": query, "limit": self.limit, "sort": "new", "restrict_sr": "true"}
+
+        cursor = state.cursors.get(subreddit)
+        if cursor and time.time() - cursor["set_at"] < self.cursor_max_age:
+            params["before"] = cursor["name"]
+        # An old cursor may point at a post that left the search index; a full
+        # fetch is cheap because already-scored posts come from the cache.
+
+        def request(timeout):
+            response = self.session.get(url, params=params, timeout=timeout)
+            response.raise_for_status()  # 429s count against the breaker
+            return response
+
+        response = self.resilience.call("reddit", request)
+
+        posts = [child['data'] for child in response.json()['data']['children']]
+        if posts:
+            state.cursors[subreddit] = {"name": posts[0].get('name'), "set_at": time.time()}
+        return posts
+
+    @staticmethod
+    def post_text(post: Dict) -> str:
+        """Text of a post as it is scored"""
+        return f"{post.get('title', '')} {post.get('selftext', '')}"
+
+    def _score_posts(self, posts: List[Dict], score_texts: Callable[[List[str]], List[float]]) -> List[float]:
+        """Score posts, reusing cached scores by post id and batching the rest"""
+        post_ids = [self._post_id(post) for post in posts]
+        with self._lock:
+            unscored = [(pid, post) for pid, post in zip(post_ids, posts) if pid not in self._score_cache]
+
+        if unscored:
+            # No lock held here: the scorer may wait on a batch shared with other sources
+            scores = score_texts([self.post_text(post) for _, post in unscored])
+            with self._lock:
+                for (pid, _), score in zip(unscored, scores):
+                    self._score_cache[pid] = score
+                # Bound the cache at a few windows' worth of posts
+                while len(self._score_cache) > self.window_size * 10:
+                    self._score_cache.popitem(last=False)
+
+        with self._lock:
+            return [self._score_cache.get(pid, 0.0) for pid in post_ids]
+
+    def get_sentiment(self, query: str = "Cronos CRO",
+                      score_texts: Callable[[List[str]], List[float]] = None) -> Optional[Dict]:
+        """
+        Fetch new posts in parallel and update the rolling weighted sentiment
+        
+        Args:
+            score_texts: batch scorer for new posts (defaults to the social text scorer)
+        """
+        with self._lock:
+            state = self._states.setdefault(query, _QueryState())
+
+        futures = [
+            self._executor.submit(self._fetch_subreddit, subreddit, query, state)
+            for subreddit in self.subreddits
+        ]
+        fetched = []
+        for future in futures:
+            try:
+                fetched.extend(future.result())
+            except Exception:
+                continue
+
+        # Oldest first, so the window evicts in age order
+        fetched.sort(key=lambda post: post.get('created_utc', 0))
+
+        with self._lock:
+            fresh = {}
+            for post in fetched:
+                post_id = self._post_id(post)
+                if post_id and post_id not in state.window:
+                    fresh[post_id] = post  # also drops cross-subreddit duplicates
+            posts = list(fresh.values())
+
+        scores = self._score_posts(posts, score_texts or self.scorer.score_batch)
+
+        new_posts = 0
+        with self._lock:
+            for post_id, post, score in zip(fresh, posts, scores):
+                if post_id in state.window:
+                    continue  # added by a concurrent call while we were scoring
+                # Weight by upvote ratio and score
+                weight = post.get('upvote_ratio', 0) * (1 + min(post.get('score', 0) / 100, 2))
+
+                state.window[post_id] = (score, weight)
+                state.weighted_sum += score * weight
+                state.weight_total += weight
+                new_posts += 1
+
+                if len(state.window) > self.window_size:
+                    _, (old_score, old_weight) = state.window.popitem(last=False)
+                    state.weighted_sum -= old_score * old_weight
+                    state.weight_total -= old_weight
+
+            if not state.window:
+                return None
+
+            sentiment_score = state.weighted_sum / state.weight_total if state.weight_total > 0 else 0
+            posts_analyzed = len(state.window)
+
+        return {
+            "source": "reddit",
+            "sentiment_score": sentiment_score,
+            "posts_analyzed": posts_analyzed,
+            "new_posts": new_posts,
+            "subreddits": self.subreddits,
+            "timestamp": datetime.now().isoformat()
+        }
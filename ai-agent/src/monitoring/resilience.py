@@ -0,0 +1,208 @@
+"""
+Per-Source Resilience Layer
+- Adaptive timeouts derived from each source's recent p95 latency
+- Circuit breakers: after repeated failures a source is skipped, then
+  probed again (one call at a time) once a cooldown has passed
+- Latency / error histograms per source for logging and export
+"""
+
+import time
+import threading
+from collections import deque
+from typing import Any, Callable, Dict
+
+# Histogram bucket upper bounds in seconds (last bucket is everything slower)
+LATENCY_BUCKETS = [0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+
+# name -> (default timeout, min timeout, max timeout) in seconds
+SOURCE_TIMEOUTS = {
+    "coingecko": (10.0, 2.0, 15.0),
+    "reddit": (10.0, 2.0, 15.0),
+    "rss": (15.0, 2.0, 20.0),
+    "gemini": (30.0, 5.0, 45.0),
+}
+
+
+def percentile(values, pct: float) -> float:
+    """Nearest-rank percentile of a sequence of numbers (0.0 when empty)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a source whose breaker is open"""
+    pass
+
+
+class SourceHealth:
+    """Latency window, histogram and circuit breaker for one upstream source"""
+
+    def __init__(self, name: str, default_timeout: float = 10.0, min_timeout: float = 1.0,
+                 max_timeout: float = 30.0, failure_threshold: int = 3, cooldown: float = 120.0,
+                 window: int = 100, min_samples: int = 5):
+        self.name = name
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.min_samples = min_samples
+
+        self.latencies = deque(maxlen=window)
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.successes = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.skipped = 0
+
+        self.state = "closed"  # closed -> open -> half_open -> closed/open
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def _percentile(self, pct: float) -> float:
+        """Percentile of the latency window (caller holds the lock)"""
+        return percentile(self.latencies, pct)
+
+    def adaptive_timeout(self) -> float:
+        """Twice the recent p95, clamped; the default until there are enough samples"""
+        with self._lock:
+            if len(self.latencies) < self.min_samples:
+                return self.default_timeout
+            return max(self.min_timeout, min(self.max_timeout, self._percentile(95) * 2))
+
+    def allow(self) -> bool:
+        """
+        Whether a call may go out now. After the cooldown an open breaker lets
+        exactly one probe through; other callers are skipped until record()
+        resolves it.
+        """
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.cooldown:
+                    self.skipped += 1
+                    return False
+                self.state = "half_open"
+            if self.state == "half_open":
+                if self.probe_in_flight:
+                    self.skipped += 1
+                    return False
+                self.probe_in_flight = True
+            return True
+
+    def record(self, latency: float, ok: bool, timed_out: bool = False):
+        """
+        Record the outcome of one call.
+        Only successes and timeouts feed the latency window: fast errors (429s,
+        refused connections) would otherwise pull p95, and with it the adaptive
+        timeout, down exactly while the source is struggling.
+        """
+        with self._lock:
+            self.probe_in_flight = False
+            if ok or timed_out:
+                self.latencies.append(latency)
+                bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS) if latency <= bound), len(LATENCY_BUCKETS))
+                self.histogram[bucket] += 1
+
+            if ok:
+                self.successes += 1
+                self.consecutive_failures = 0
+                self.state = "closed"
+                return
+
+            self.failures += 1
+            if timed_out:
+                self.timeouts += 1
+            self.consecutive_failures += 1
+            if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+                if self.state != "open":
+                    print(f"   🔌 Circuit OPEN for {self.name} ({self.consecutive_failures} consecutive failures)")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict:
+        """Exportable metrics for this source"""
+        timeout = self.adaptive_timeout()
+        with self._lock:
+            labels = [f"<={bound}s" for bound in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]}s"]
+            return {
+                "state": self.state,
+                "successes": self.successes,
+                "failures": self.failures,
+                "timeouts": self.timeouts,
+                "skipped": self.skipped,
+                "p50_seconds": round(self._percentile(50), 3),
+                "p95_seconds": round(self._percentile(95), 3),
+                "timeout_seconds": round(timeout, 2),
+                "histogram": dict(zip(labels, self.histogram)),
+            }
+
+
+def _is_timeout(error: Exception) -> bool:
+    """Recognize timeouts from requests, the stdlib and the Gemini client"""
+    # google.api_core.exceptions.DeadlineExceeded (matched by name, no google import needed)
+    if any(cls.__name__ == "DeadlineExceeded" for cls in type(error).__mro__):
+        return True
+    return isinstance(error, TimeoutError) or "timeout" in type(error).__name__.lower() \
+        or "timed out" in str(error).lower()
+
+
+class ResilienceRegistry:
+    """Holds one SourceHealth per source name"""
+
+    def __init__(self):
+        self._sources: Dict[str, SourceHealth] = {}
+        self._lock = threading.Lock()
+
+    def source(self, name: str) -> SourceHealth:
+        """Get or create the health tracker for a source"""
+        with self._lock:
+            if name not in self._sources:
+                default, low, high = SOURCE_TIMEOUTS.get(name, (10.0, 1.0, 30.0))
+                self._sources[name] = SourceHealth(name, default, low, high)
+            return self._sources[name]
+
+    def call(self, name: str, fn: Callable[[float], Any]) -> Any:
+        """
+        Call fn(timeout) under the source's breaker with its adaptive timeout.
+        Raises CircuitOpenError without calling fn while the breaker is open.
+        """
+        health = self.source(name)
+        if not health.allow():
+            raise CircuitOpenError(f"{name} circuit open, skipping call")
+
+        start = time.monotonic()
+        try:
+            result = fn(health.adaptive_timeout())
+        except Exception as e:
+            health.record(time.monotonic() - start, ok=False, timed_out=_is_timeout(e))
+            raise
+        health.record(time.monotonic() - start, ok=True)
+        return result
+
+    def reset(self):
+        """Forget every source's breaker state and latency window"""
+        with self._lock:
+            self._sources.clear()
+
+    def snapshot(self) -> Dict:
+        """Metrics for every source seen so far"""
+        with self._lock:
+            sources = dict(self._sources)
+        return {name: health.snapshot() for name, health in sources.items()}
+
+
+# Singleton instance
+_resilience = None
+_resilience_lock = threading.Lock()
+
+def get_resilience() -> ResilienceRegistry:
+    """Get or create the process-wide resilience registry"""
+    global _resilience
+    with _resilience_lock:
+        if _resilience is None:
+            _resilience = ResilienceRegistry()
+    return _resilience
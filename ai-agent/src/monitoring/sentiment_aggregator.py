@@ -9,39 +9,156 @@ Aggregates sentiment from:
 
 import os
 import sys
-import requests
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from typing import Dict, List
 from datetime import datetime
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 from dotenv import load_dotenv
 
 # Handle imports for both direct run and module import
 try:
     from .real_sentiment import RealSentimentAnalyzer
+    from .reddit_source import RedditSentimentSource
+    from .http_session import get_http_session
+    from .sentiment_engine import SentimentEngine
+    from .resilience import get_resilience
+    from .timeseries_store import get_timeseries_store
 except ImportError:
     from real_sentiment import RealSentimentAnalyzer
+    from reddit_source import RedditSentimentSource
+    from http_session import get_http_session
+    from sentiment_engine import SentimentEngine
+    from resilience import get_resilience
+    from timeseries_store import get_timeseries_store
+
+try:
+    from services.response_cache import get_response_cache
+except ImportError:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+    from services.response_cache import get_response_cache
 
 load_dotenv()
 
+# Per-source deadlines (seconds) for concurrent fan-out mode
+DEFAULT_SOURCE_TIMEOUTS = {
+    "real_news": 35.0,   # two RSS fetches + Gemini (30s request timeout)
+    "reddit": 15.0,
+    "coingecko": 10.0,
+    "trending": 10.0,
+}
+
+# CoinGecko response cache policy per endpoint: (fresh TTL, extra stale-while-revalidate window)
+COINGECKO_CACHE_TTLS = {
+    "coins": (float(os.getenv("COINGECKO_COIN_TTL", "120")), 600.0),
+    "coins/markets": (float(os.getenv("COINGECKO_MARKETS_TTL", "60")), 300.0),
+    "search/trending": (float(os.getenv("COINGECKO_TRENDING_TTL", "300")), 900.0),
+}
+COINGECKO_MARKETS_PAGE_SIZE = 250  # Max ids per /coins/markets request
+
+# Cronos ecosystem tokens scored by aggregate_watchlist (CoinGecko ids)
+DEFAULT_WATCHLIST = [
+    coin.strip() for coin in os.getenv(
+        "WATCHLIST_COINS",
+        "crypto-com-chain,wrapped-cro,vvs-finance,tectonic,ferro,mad-meerkat-finance"
+    ).split(",") if coin.strip()
+]
+
 
 class SentimentAggregator:
     """Aggregate sentiment from multiple crypto data sources"""
     
-    def __init__(self):
-        self.analyzer = SentimentIntensityAnalyzer()
+    def __init__(self, concurrent: bool = None, source_timeouts: Dict = None, cycle_deadline: float = None):
         self.coingecko_api = "https://api.coingecko.com/api/v3"
         self.real_sentiment = RealSentimentAnalyzer()  # NEW: Real news sentiment
-        self.reddit_headers = {"User-Agent": "CronosSentinel/1.0 (Autonomous Trading Bot)"}
+        self.reddit = RedditSentimentSource()
+        self.http = get_http_session()
+        # Per-item LLM scoring of headlines and Reddit posts (SENTIMENT_ITEM_SCORING)
+        self.item_scoring = self.real_sentiment.item_scoring
+        
+        # Concurrent fan-out mode (all sources at once, each with its own deadline)
+        if concurrent is None:
+            concurrent = os.getenv("SENTIMENT_FANOUT", "true").lower() == "true"
+        self.concurrent = concurrent
+        self.source_timeouts = {**DEFAULT_SOURCE_TIMEOUTS, **(source_timeouts or {})}
+        if cycle_deadline is None:
+            cycle_deadline = float(os.getenv("SENTIMENT_CYCLE_DEADLINE", "40"))
+        self.cycle_deadline = cycle_deadline
+        self._executor = ThreadPoolExecutor(
+            max_workers=len(DEFAULT_SOURCE_TIMEOUTS),
+            thread_name_prefix="sentiment-source"
+        )
+        # Last submitted future per source; a source still running is not resubmitted
+        self._inflight = {}
+        
+        # Process-wide cache shared with the MCP server and any other aggregator instance
+        self.response_cache = get_response_cache()
+        # Adaptive timeouts + circuit breakers per upstream source
+        self.resilience = get_resilience()
+        
+        # Append-only history of every snapshot and raw reading (SQLite WAL, background writer)
+        self.store = get_timeseries_store() if os.getenv("SENTIMENT_STORE_ENABLED", "true").lower() == "true" else None
+        
+        # Optional background engine; when running, aggregate_sentiment just reads its state
+        self.engine = None
+        self.engine_coin_id = None
+    
+    def _coingecko_get(self, path: str, params: Dict = None, upstream_calls: List = None) -> Dict:
+        """
+        GET a CoinGecko endpoint through the shared response cache
+        upstream_calls, when given, gets one entry per request that actually reached CoinGecko.
+        """
+        if path in COINGECKO_CACHE_TTLS:
+            endpoint = path
+        else:
+            endpoint = "coins" if path.startswith("coins/") else path
+        ttl, stale_ttl = COINGECKO_CACHE_TTLS.get(endpoint, (60.0, 300.0))
+        query = "&".join(f"{k}={v}" for k, v in sorted((params or {}).items()))
+        
+        def request(timeout):
+            if upstream_calls is not None:
+                upstream_calls.append(path)
+            response = self.http.get(
+                f"{self.coingecko_api}/{path}",
+                params=params,
+                timeout=timeout
+            )
+            response.raise_for_status()  # 429s must not be cached as data
+            return response.json()
+        
+        def fetch():
+            return self.resilience.call("coingecko", request)
+        
+        return self.response_cache.get(
+            f"coingecko:{path}?{query}", fetch,
+            ttl=ttl, stale_ttl=stale_ttl, namespace="coingecko"
+        )
+    
+    def close(self):
+        """Stop streaming and release the worker pools (the aggregator is unusable afterwards)"""
+        self.stop_streaming()
+        self._executor.shutdown(wait=False)
+        self.reddit.close()
+    
+    def get_source_health(self) -> Dict:
+        """Latency/error histogram, adaptive timeout and breaker state per source"""
+        return self.resilience.snapshot()
+    
+    def get_cache_stats(self) -> Dict:
+        """Hit/miss counters for the CoinGecko response cache and Gemini memoization"""
+        return {
+            "coingecko": self.response_cache.stats("coingecko"),
+            "gemini": self.real_sentiment.get_cache_metrics(),
+        }
     
     def get_coingecko_sentiment(self, coin_id: str = "crypto-com-chain") -> Dict:
         """Get sentiment data from CoinGecko"""
         try:
             # Get coin data
-            response = requests.get(
-                f"{self.coingecko_api}/coins/{coin_id}",
+            data = self._coingecko_get(
+                f"coins/{coin_id}",
                 params={"localization": "false", "tickers": "false", "community_data": "true", "developer_data": "false", "market_data": "true"}
             )
-            data = response.json()
             
             # Extract sentiment indicators
             sentiment_votes_up = data.get("sentiment_votes_up_percentage", 50)
@@ -77,8 +194,7 @@ class SentimentAggregator:
     def get_trending_status(self, coin_id: str = "crypto-com-chain") -> Dict:
         """Check if coin is trending"""
         try:
-            response = requests.get(f"{self.coingecko_api}/search/trending")
-            trending = response.json()
+            trending = self._coingecko_get("search/trending")
             
             # Check if our coin is in trending
             trending_coins = trending.get("coins", [])
@@ -98,109 +214,292 @@ class SentimentAggregator:
             print(f"Trending check error: {e}")
             return None
     
-    def get_reddit_sentiment(self, query: str = "Cronos CRO") -> Dict:
+    def get_reddit_sentiment(self, query: str = "Cronos CRO", score_texts=None) -> Dict:
         """Get sentiment from Reddit (FREE API, no auth needed)"""
         try:
-            subreddits = ["CryptoCurrency", "CronosOfficial", "Crypto_com"]
-            all_posts = []
-            
-            for subreddit in subreddits:
-                try:
-                    url = f"https://www.reddit.com/r/{subreddit}/search.json"
-                    params = {"q": query, "limit": 10, "sort": "new", "restrict_sr": "true"}
-                    response = requests.get(url, params=params, headers=self.reddit_headers, timeout=10)
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        for child in data['data']['children']:
-                            post = child['data']
-                            all_posts.append({
-                                "title": post.get('title', ''),
-                                "text": post.get('selftext', ''),
-                                "score": post.get('score', 0),
-                                "upvote_ratio": post.get('upvote_ratio', 0),
-                                "num_comments": post.get('num_comments', 0)
-                            })
-                except:
-                    continue
-            
-            if not all_posts:
-                return None
-            
-            # Analyze sentiment with crypto slang
-            bullish_keywords = ['bullish', 'moon', 'pump', 'buy', 'lfg', 'hodl', 'gem', 'rocket', '🚀', '📈']
-            bearish_keywords = ['bearish', 'dump', 'sell', 'fud', 'scam', 'rugpull', '📉', '💩']
-            
-            total_sentiment = 0
-            analyzed_count = 0
-            
-            for post in all_posts[:10]:  # Top 10 posts
-                text = f"{post['title']} {post['text']}".lower()
-                sentiment = self.analyzer.polarity_scores(text)
-                
-                # Boost for crypto slang
-                has_bullish = any(word in text for word in bullish_keywords)
-                has_bearish = any(word in text for word in bearish_keywords)
-                
-                score = sentiment['compound']
-                if has_bullish:
-                    score = min(score + 0.3, 1.0)
-                if has_bearish:
-                    score = max(score - 0.3, -1.0)
-                
-                # Weight by upvote ratio and score
-                weight = post['upvote_ratio'] * (1 + min(post['score'] / 100, 2))
-                total_sentiment += score * weight
-                analyzed_count += weight
-            
-            sentiment_score = total_sentiment / analyzed_count if analyzed_count > 0 else 0
-            
-            return {
-                "source": "reddit",
-                "sentiment_score": sentiment_score,
-                "posts_analyzed": len(all_posts),
-                "subreddits": subreddits,
-                "timestamp": datetime.now().isoformat()
-            }
-            
+            return self.reddit.get_sentiment(query, score_texts=score_texts)
         except Exception as e:
             print(f"Reddit error: {e}")
             return None
     
+    def start_streaming(self, coin_id: str = "crypto-com-chain", cadences: Dict = None,
+                        warmup_timeout: float = 60) -> SentimentEngine:
+        """
+        Start background ingestion for coin_id.
+        Afterwards aggregate_sentiment(coin_id) returns the engine's state instantly.
+        """
+        if self.engine:
+            self.stop_streaming()
+        
+        self.engine = SentimentEngine(
+            fetchers=self._source_fetchers(coin_id),
+            build_result=lambda readings, timed_out: self._build_result(readings, timed_out, log=False),
+            cadences=cadences,
+            on_update=(lambda source, reading, snapshot: self._record_update(coin_id, source, reading, snapshot))
+            if self.store else None
+        )
+        self.engine_coin_id = coin_id
+        self.engine.start(warmup_timeout=warmup_timeout)
+        return self.engine
+    
+    def _record_update(self, coin_id: str, source: str, reading: Dict, snapshot: Dict):
+        """Persist one engine poll: the raw reading and the rebuilt snapshot"""
+        self.store.record_reading(coin_id, source, reading)
+        self.store.record_snapshot(coin_id, snapshot, mode="streaming")
+    
+    def stop_streaming(self):
+        """Stop the background engine and go back to on-demand fetching"""
+        if self.engine:
+            self.engine.stop()
+        self.engine = None
+        self.engine_coin_id = None
+    
     def aggregate_sentiment(self, coin_id: str = "crypto-com-chain") -> Dict:
         """Aggregate sentiment from all sources"""
         
+        if self.engine and coin_id == self.engine_coin_id:
+            snapshot = self.engine.snapshot()
+            stale = [name for name, info in snapshot["staleness"].items() if info["stale"]]
+            print(f"🔍 Sentiment for {coin_id} (streaming): {snapshot['signal']} "
+                  f"({snapshot['avg_sentiment']:.2f}){' | stale: ' + ', '.join(stale) if stale else ''}")
+            return snapshot
+        
         print(f"🔍 Aggregating sentiment for {coin_id}...")
         
+        if self.concurrent:
+            readings, timed_out = self._collect_concurrent(coin_id)
+        else:
+            readings, timed_out = self._collect_sequential(coin_id), []
+        
+        result = self._build_result(readings, timed_out)
+        if self.store:
+            self.store.record_snapshot(coin_id, result, readings)
+        return result
+    
+    def get_sentiment_history(self, hours: float = 24, coin_id: str = "crypto-com-chain",
+                              source: str = None) -> List[Dict]:
+        """
+        Stored snapshots (or raw readings of one source) from the last `hours`
+        """
+        if not self.store:
+            return []
+        start = time.time() - hours * 3600
+        if source:
+            return self.store.query_readings(source=source, start=start, coin_id=coin_id)
+        return self.store.query_snapshots(start=start, coin_id=coin_id)
+    
+    def aggregate_watchlist(self, coin_ids: List[str] = None) -> Dict:
+        """
+        Price-momentum scan of many coins in one pass.
+        This is NOT sentiment: each coin's score is tanh of its 24h/7d price change,
+        mapped to a momentum signal with the same thresholds as _score_to_signal.
+        Market data comes from batched /coins/markets requests (up to 250 ids each)
+        and trending membership is checked once, so cost grows with the number of
+        pages rather than the number of coins. requests_made counts only requests
+        that reached CoinGecko (response-cache hits are free).
+        """
+        coin_ids = list(dict.fromkeys(coin_ids or DEFAULT_WATCHLIST))
+        print(f"🔍 Scoring price momentum for a watchlist of {len(coin_ids)} coins...")
+        
+        markets = []
+        upstream_calls = []
+        for i in range(0, len(coin_ids), COINGECKO_MARKETS_PAGE_SIZE):
+            chunk = coin_ids[i:i + COINGECKO_MARKETS_PAGE_SIZE]
+            try:
+                markets.extend(self._coingecko_get("coins/markets", params={
+                    "vs_currency": "usd",
+                    "ids": ",".join(chunk),
+                    "price_change_percentage": "24h,7d",
+                    "per_page": COINGECKO_MARKETS_PAGE_SIZE,
+                }, upstream_calls=upstream_calls))
+            except Exception as e:
+                print(f"   ⚠️  CoinGecko markets error: {e}")
+        
+        try:
+            trending = self._coingecko_get("search/trending", upstream_calls=upstream_calls)
+            trending_ids = {coin.get("item", {}).get("id") for coin in trending.get("coins", [])}
+        except Exception as e:
+            print(f"   ⚠️  Trending check error: {e}")
+            trending_ids = set()
+        
+        by_id = {row.get("id"): row for row in markets}
+        found = [coin for coin in coin_ids if coin in by_id]
+        missing = [coin for coin in coin_ids if coin not in by_id]
+        rows = [by_id[coin] for coin in found]
+        
+        def column(key):
+            return np.array([row.get(key) or 0.0 for row in rows], dtype=float)
+        
+        price = column("current_price")
+        change_24h = column("price_change_percentage_24h_in_currency")
+        change_7d = column("price_change_percentage_7d_in_currency")
+        volume = column("total_volume")
+        market_cap = column("market_cap")
+        is_trending = np.array([coin in trending_ids for coin in found], dtype=bool)
+        
+        # Momentum score in [-1, 1]: short-term move weighted above the weekly trend
+        score = np.clip(0.6 * np.tanh(change_24h / 10) + 0.4 * np.tanh(change_7d / 20), -1, 1)
+        volume_to_mcap = np.divide(volume, market_cap, out=np.zeros_like(volume), where=market_cap > 0)
+        
+        # Same thresholds and trending boost as _score_to_signal
+        boost = np.where(is_trending, 1.5, 1.0)
+        signal = np.select(
+            [score > 0.6, score > 0.3, score < -0.6, score < -0.3],
+            ["strong_buy", "weak_buy", "strong_sell", "weak_sell"],
+            default="hold"
+        )
+        strength = np.select(
+            [score > 0.6, score > 0.3, score < -0.6, score < -0.3],
+            [3 * boost, 2 * boost, -3 * boost, -2 * boost],
+            default=0
+        ).astype(int)
+        
+        table = {
+            "coin_id": found,
+            "symbol": [str(row.get("symbol", "")).upper() for row in rows],
+            "price": price.tolist(),
+            "change_24h": change_24h.round(2).tolist(),
+            "change_7d": change_7d.round(2).tolist(),
+            "volume_to_mcap": volume_to_mcap.round(4).tolist(),
+            "is_trending": is_trending.tolist(),
+            "momentum_score": score.round(3).tolist(),
+            "momentum_signal": signal.tolist(),
+            "momentum_strength": strength.tolist(),
+        }
+        requests_made = len(upstream_calls)
+        
+        print(f"   ✓ {len(found)} coins scored with {requests_made} CoinGecko requests"
+              f"{f' ({len(missing)} not found)' if missing else ''}")
+        
+        return {
+            "basis": "price_momentum",
+            "momentum_table": table,
+            "coins": [dict(zip(table, values)) for values in zip(*table.values())],
+            "missing": missing,
+            "requests_made": requests_made,
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    def _source_fetchers(self, coin_id: str, batch=None) -> Dict:
+        """
+        Map each source name to the zero-arg callable that fetches it
+        
+        With a scoring batch, news and Reddit hand their new items to one
+        shared per-item scoring call instead of scoring separately.
+        """
+        latency_budget = self.source_timeouts["real_news"] if self.concurrent else None
+        
+        def news(score_items=None):
+            return self.real_sentiment.get_aggregated_sentiment(
+                latency_budget=latency_budget, score_items=score_items
+            )
+        
+        def reddit(score_items=None):
+            score_texts = None
+            if self.item_scoring:
+                score_items = score_items or self.real_sentiment.item_scorer.score_items
+                score_texts = lambda texts: [item["score"] for item in score_items([("reddit", t) for t in texts])]
+            return self.get_reddit_sentiment("Cronos CRO", score_texts=score_texts)
+        
+        return {
+            "real_news": (lambda: batch.run(news)) if batch else news,
+            "reddit": (lambda: batch.run(reddit)) if batch else reddit,
+            "coingecko": lambda: self.get_coingecko_sentiment(coin_id),
+            "trending": lambda: self.get_trending_status(coin_id),
+        }
+    
+    def _collect_sequential(self, coin_id: str) -> Dict:
+        """Fetch every source one after another (original behaviour)"""
+        readings = {}
+        for name, fetch in self._source_fetchers(coin_id).items():
+            try:
+                readings[name] = fetch()
+            except Exception as e:
+                print(f"   ⚠️  {name} unavailable: {e}")
+                readings[name] = None
+        return readings
+    
+    def _collect_concurrent(self, coin_id: str) -> tuple:
+        """
+        Fan out to every source at once.
+        Each source gets its own deadline, capped by the overall cycle deadline;
+        whatever has not come back by then is reported as timed out.
+        A source whose call from an earlier cycle is still running is not
+        submitted again (so a hung upstream holds at most one worker) and is
+        reported as timed out straight away.
+        """
+        start = time.monotonic()
+        cycle_deadline = start + self.cycle_deadline
+        source_timeouts = dict(self.source_timeouts)
+        
+        still_running = [name for name, future in self._inflight.items() if not future.done()]
+        
+        batch = None
+        if self.item_scoring:
+            # News and Reddit items are scored in one call, so Reddit shares the news deadline
+            participants = sum(1 for name in ("real_news", "reddit") if name not in still_running)
+            if participants:
+                batch = self.real_sentiment.item_scorer.open_batch(participants=participants)
+            source_timeouts["reddit"] = max(source_timeouts["reddit"], source_timeouts["real_news"])
+        
+        futures = {
+            name: self._executor.submit(fetch)
+            for name, fetch in self._source_fetchers(coin_id, batch).items()
+            if name not in still_running
+        }
+        self._inflight.update(futures)
+        
+        readings = {}
+        timed_out = []
+        for name in still_running:
+            print(f"   ⏱️  {name} still running from an earlier cycle - skipped")
+            readings[name] = None
+            timed_out.append(name)
+        for name, future in futures.items():
+            source_deadline = start + source_timeouts.get(name, self.cycle_deadline)
+            remaining = max(0.0, min(source_deadline, cycle_deadline) - time.monotonic())
+            try:
+                readings[name] = future.result(timeout=remaining)
+            except FutureTimeout:
+                # Leave the worker running; its result is simply not used this cycle
+                print(f"   ⏱️  {name} timed out")
+                readings[name] = None
+                timed_out.append(name)
+            except Exception as e:
+                print(f"   ⚠️  {name} unavailable: {e}")
+                readings[name] = None
+        
+        print(f"   ⚡ Fan-out finished in {time.monotonic() - start:.2f}s")
+        return readings, timed_out
+    
+    def _build_result(self, readings: Dict, timed_out: List[str], log: bool = True) -> Dict:
+        """Combine per-source readings into the final signal"""
         sources = []
         
         # REAL NEWS SENTIMENT (CryptoPanic + Google News + Gemini AI)
-        try:
-            real_news = self.real_sentiment.get_aggregated_sentiment()
-            if real_news and real_news.get('sentiment_score') != 0:
-                sources.append(real_news)
+        real_news = readings.get("real_news")
+        if real_news and real_news.get('sentiment_score') != 0:
+            sources.append(real_news)
+            if log:
                 print(f"   ✓ Real News: {real_news['sentiment_score']:.2f} ({real_news['articles_count']} articles)")
-        except Exception as e:
-            print(f"   ⚠️  Real News unavailable: {e}")
         
         # Reddit sentiment
-        try:
-            reddit = self.get_reddit_sentiment("Cronos CRO")
-            if reddit and reddit.get('sentiment_score') != 0:
-                sources.append(reddit)
+        reddit = readings.get("reddit")
+        if reddit and reddit.get('sentiment_score') != 0:
+            sources.append(reddit)
+            if log:
                 print(f"   ✓ Reddit: {reddit['sentiment_score']:.2f} ({reddit['posts_analyzed']} posts)")
-        except Exception as e:
-            print(f"   ⚠️  Reddit unavailable: {e}")
         
-        # Collect from all sources
-        coingecko = self.get_coingecko_sentiment(coin_id)
+        coingecko = readings.get("coingecko")
         if coingecko:
             sources.append(coingecko)
-            print(f"   ✓ CoinGecko: {coingecko['sentiment_score']:.2f}")
+            if log:
+                print(f"   ✓ CoinGecko: {coingecko['sentiment_score']:.2f}")
         
-        trending = self.get_trending_status(coin_id)
+        trending = readings.get("trending")
         if trending:
-            print(f"   ✓ Trending: {trending['is_trending']}")
+            if log:
+                print(f"   ✓ Trending: {trending['is_trending']}")
         
         # Calculate weighted average
         if not sources:
@@ -210,6 +509,7 @@ class SentimentAggregator:
                 "avg_sentiment": 0,
                 "sources": [],
                 "weights": {"coingecko": 0, "news": 0, "social": 0, "technical": 0},
+                "timed_out_sources": timed_out,
                 "reason": "No data available"
             }
         
@@ -239,6 +539,7 @@ class SentimentAggregator:
             "sources": sources,
             "weights": weights,
             "is_trending": trending.get("is_trending", False) if trending else False,
+            "timed_out_sources": timed_out,
             "timestamp": datetime.now().isoformat(),
             "reason": self._generate_reason(signal, avg_score, trending)
         }
@@ -299,6 +600,8 @@ def main():
     print(f"📈 Sentiment: {result['avg_sentiment']:.3f}")
     print(f"🔥 Trending: {'YES' if result.get('is_trending') else 'NO'}")
     print(f"📊 Volume Spike: {'YES' if result.get('volume_spike') else 'NO'}")
+    if result.get('timed_out_sources'):
+        print(f"⏱️  Timed out: {', '.join(result['timed_out_sources'])}")
     print(f"📝 Reason: {result['reason']}")
     print("=" * 60)
 
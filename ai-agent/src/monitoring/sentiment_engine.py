@@ -0,0 +1,186 @@
+"""
+Streaming Sentiment Engine
+Background ingestion of every sentiment source on its own cadence.
+Each source keeps a time-decayed (EWMA) score; the combined signal is
+rebuilt whenever a source updates, so readers get the latest state
+without touching the network. A source whose reading is older than three
+of its cadences is dropped from the signal, and it is reported in
+timed_out_sources with any source whose last poll failed.
+"""
+
+import os
+import time
+import threading
+from typing import Callable, Dict, Optional
+
+# Seconds between polls of each source
+DEFAULT_CADENCES = {
+    "real_news": 600.0,
+    "reddit": 180.0,
+    "coingecko": 120.0,
+    "trending": 300.0,
+}
+
+
+class _SourceState:
+    """Latest reading and decayed score for one source"""
+
+    def __init__(self):
+        self.reading: Optional[Dict] = None
+        self.ewma: Optional[float] = None
+        self.updated_at: Optional[float] = None
+        self.errors = 0
+        self.failing = False  # last poll failed
+
+
+class SentimentEngine:
+    """Continuously refreshes sentiment sources in background threads"""
+
+    def __init__(self, fetchers: Dict[str, Callable[[], Optional[Dict]]],
+                 build_result: Callable[[Dict, list], Dict],
+                 cadences: Dict[str, float] = None, half_life: float = None,
+                 on_update: Callable[[str, Optional[Dict], Dict], None] = None):
+        """
+        Args:
+            fetchers: source name -> zero-arg callable returning a reading (or None)
+            build_result: combines readings into the aggregate_sentiment result
+            cadences: source name -> poll interval in seconds
+            half_life: EWMA half-life in seconds (older readings lose half their weight)
+            on_update: callback(source, raw reading, new snapshot) after each poll
+        """
+        self.fetchers = fetchers
+        self.build_result = build_result
+        self.on_update = on_update
+        self.cadences = {**DEFAULT_CADENCES, **(cadences or {})}
+        if half_life is None:
+            half_life = float(os.getenv("SENTIMENT_EWMA_HALF_LIFE", "1800"))
+        self.half_life = half_life
+
+        self._states = {name: _SourceState() for name in fetchers}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+        self._first_pass = threading.Event()
+        # Pre-built result; replaced wholesale on each update so reads never block
+        self._snapshot = self.build_result({}, [])
+        self._snapshot["updated_at"] = {name: None for name in fetchers}
+        self._built_stale = frozenset()
+
+    def start(self, warmup_timeout: float = 0):
+        """Start one polling thread per source, optionally waiting for a first reading from each"""
+        for name in self.fetchers:
+            thread = threading.Thread(
+                target=self._poll_loop, args=(name,),
+                name=f"sentiment-{name}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        print(f"📡 Sentiment engine started ({', '.join(f'{n}@{int(self.cadences[n])}s' for n in self.fetchers)})")
+
+        if warmup_timeout:
+            self._first_pass.wait(warmup_timeout)
+
+    def stop(self):
+        """Stop all polling threads"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=1)
+        self._threads = []
+
+    def _poll_loop(self, name: str):
+        """Fetch one source forever at its cadence"""
+        fetch = self.fetchers[name]
+        while not self._stop.is_set():
+            try:
+                reading = fetch()
+            except Exception as e:
+                print(f"   ⚠️  Sentiment engine: {name} failed: {e}")
+                reading = None
+
+            self._update(name, reading)
+            self._stop.wait(self.cadences.get(name, 300.0))
+
+    def _update(self, name: str, reading: Optional[Dict]):
+        """Fold a new reading into the source's EWMA and rebuild the snapshot"""
+        now = time.time()
+        with self._lock:
+            state = self._states[name]
+            state.failing = reading is None
+            if reading is None:
+                state.errors += 1
+            else:
+                score = reading.get("sentiment_score")
+                if score is not None:
+                    if state.ewma is None:
+                        state.ewma = score
+                    else:
+                        # Time-decayed EWMA: weight of the old value halves every half_life seconds
+                        alpha = 1 - 0.5 ** ((now - state.updated_at) / self.half_life)
+                        state.ewma += alpha * (score - state.ewma)
+                state.reading = reading
+                state.updated_at = now
+
+            if all(s.updated_at is not None or s.errors for s in self._states.values()):
+                self._first_pass.set()
+
+            snapshot = self._rebuild(now)
+
+        if self.on_update:
+            try:
+                self.on_update(name, reading, snapshot)
+            except Exception as e:
+                print(f"   ⚠️  Sentiment engine: update hook failed: {e}")
+
+    def _stale_after(self, source: str) -> float:
+        """Seconds after which a source's last reading no longer counts"""
+        return 3 * self.cadences.get(source, 300.0)
+
+    def _stale_sources(self, now: float) -> frozenset:
+        """Sources whose last good reading has aged past _stale_after"""
+        return frozenset(
+            name for name, state in self._states.items()
+            if state.updated_at is not None and now - state.updated_at > self._stale_after(name)
+        )
+
+    def _rebuild(self, now: float) -> Dict:
+        """Combine the usable readings into a new snapshot (caller holds the lock)"""
+        stale = self._stale_sources(now)
+        readings = {}
+        for source, source_state in self._states.items():
+            if source_state.reading is None or source in stale:
+                continue
+            smoothed = dict(source_state.reading)
+            if source_state.ewma is not None:
+                smoothed["sentiment_score"] = source_state.ewma
+            readings[source] = smoothed
+
+        unavailable = [source for source, s in self._states.items() if source in stale or s.failing]
+        snapshot = self.build_result(readings, unavailable)
+        snapshot["mode"] = "streaming"
+        snapshot["ewma"] = {
+            source: round(reading["sentiment_score"], 4)
+            for source, reading in readings.items()
+            if "sentiment_score" in reading
+        }
+        snapshot["updated_at"] = {source: s.updated_at for source, s in self._states.items()}
+        self._snapshot = snapshot
+        self._built_stale = stale
+        return snapshot
+
+    def snapshot(self) -> Dict:
+        """Latest aggregated state plus per-source staleness (no network I/O)"""
+        now = time.time()
+        if self._stale_sources(now) != self._built_stale:
+            # A source went stale since the last poll: drop it without waiting for the next update
+            with self._lock:
+                self._rebuild(now)
+        snapshot = dict(self._snapshot)
+        staleness = {}
+        for source, updated_at in snapshot.get("updated_at", {}).items():
+            age = round(now - updated_at, 1) if updated_at else None
+            staleness[source] = {
+                "age_seconds": age,
+                "stale": age is None or age > self._stale_after(source),
+            }
+        snapshot["staleness"] = staleness
+        return snapshot
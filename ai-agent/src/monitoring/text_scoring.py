@@ -0,0 +1,163 @@
+"""
+Social Text Scoring
+Shared scorer for short social posts (Reddit today, other social sources later):
+- One precompiled multi-pattern matcher for the crypto slang lexicons
+- VADER polarity scoring of a list of texts, one at a time (duplicates in the
+  list are scored once)
+- Scores memoized by text hash
+"""
+
+import os
+import re
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Tuple
+
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+# keyword -> boost applied to the VADER compound score when the keyword appears
+DEFAULT_LEXICON = {
+    "bullish": {kw: 0.3 for kw in ['bullish', 'moon', 'pump', 'buy', 'lfg', 'hodl', 'gem', 'rocket', '🚀', '📈']},
+    "bearish": {kw: 0.3 for kw in ['bearish', 'dump', 'sell', 'fud', 'scam', 'rugpull', '📉', '💩']},
+}
+
+
+def load_lexicon(path: str = None) -> Dict[str, Dict[str, float]]:
+    """
+    Load a lexicon JSON file: {"bullish": {"moon": 0.3, ...}, "bearish": {...}}
+    Falls back to DEFAULT_LEXICON when no path is configured.
+    """
+    path = path or os.getenv("SOCIAL_LEXICON_PATH")
+    if not path:
+        return DEFAULT_LEXICON
+    with open(path, "r", encoding="utf-8") as f:
+        lexicon = json.load(f)
+    return {
+        "bullish": {k.lower(): float(v) for k, v in lexicon.get("bullish", {}).items()},
+        "bearish": {k.lower(): float(v) for k, v in lexicon.get("bearish", {}).items()},
+    }
+
+
+class KeywordMatcher:
+    """
+    Single compiled alternation over every lexicon keyword.
+    One scan of the text finds all bullish and bearish hits with substring
+    semantics, like the original `word in text` checks: the alternation sits
+    in a lookahead so matches may overlap, and a hit on a keyword also counts
+    every keyword contained in it (e.g. 'pump' inside 'pumpamentals').
+    """
+
+    def __init__(self, lexicon: Dict[str, Dict[str, float]]):
+        self.weights: Dict[str, Tuple[str, float]] = {}
+        for polarity in ("bullish", "bearish"):
+            for keyword, weight in lexicon.get(polarity, {}).items():
+                self.weights[keyword.lower()] = (polarity, weight)
+
+        # Longest first so each position reports the longest keyword starting there
+        keywords = sorted(self.weights, key=len, reverse=True)
+        self.contained = {k: [other for other in keywords if other in k] for k in keywords}
+        self.pattern = re.compile(
+            "(?=(" + "|".join(re.escape(k) for k in keywords) + "))"
+        ) if keywords else None
+
+    def boosts(self, text: str) -> Tuple[float, float]:
+        """Return (bullish_boost, bearish_boost): the strongest weight hit on each side"""
+        bullish = bearish = 0.0
+        if self.pattern is None:
+            return bullish, bearish
+
+        hits = set()
+        for match in self.pattern.finditer(text):
+            hits.update(self.contained[match.group(1)])
+        for keyword in hits:
+            polarity, weight = self.weights[keyword]
+            if polarity == "bullish":
+                bullish = max(bullish, weight)
+            else:
+                bearish = max(bearish, weight)
+        return bullish, bearish
+
+
+class SocialTextScorer:
+    """VADER + slang boost scorer with a text-hash memo"""
+
+    def __init__(self, lexicon: Dict[str, Dict[str, float]] = None, cache_size: int = 5000,
+                 analyzer: SentimentIntensityAnalyzer = None):
+        self.analyzer = analyzer or SentimentIntensityAnalyzer()
+        self.matcher = KeywordMatcher(lexicon or load_lexicon())
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def _score_uncached(self, text: str) -> float:
+        score = self.analyzer.polarity_scores(text)['compound']
+        bullish, bearish = self.matcher.boosts(text)
+        if bullish:
+            score = min(score + bullish, 1.0)
+        if bearish:
+            score = max(score - bearish, -1.0)
+        return score
+
+    def score_batch(self, texts: Iterable[str]) -> List[float]:
+        """
+        Score a list of texts one by one (VADER has no batch API); cached and
+        duplicate texts are not re-scored, and the memo lock is taken twice per
+        call rather than per text.
+        """
+        normalized = [text.lower() for text in texts]
+        keys = [self._key(text) for text in normalized]
+
+        with self._lock:
+            pending = {}
+            for key, text in zip(keys, normalized):
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+                elif key not in pending:
+                    pending[key] = text
+                    self.misses += 1
+
+        # Score outside the lock; VADER is the expensive part
+        scored = {key: self._score_uncached(text) for key, text in pending.items()}
+
+        with self._lock:
+            self._cache.update(scored)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return [scored[key] if key in scored else self._cache.get(key, 0.0) for key in keys]
+
+    def score(self, text: str) -> float:
+        """Score a single text"""
+        return self.score_batch([text])[0]
+
+    def stats(self) -> Dict:
+        """Memo hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "cached_texts": len(self._cache),
+            }
+
+
+# Singleton instance
+_social_scorer = None
+_social_scorer_lock = threading.Lock()
+
+def get_social_scorer() -> SocialTextScorer:
+    """Get or create the shared social text scorer"""
+    global _social_scorer
+    with _social_scorer_lock:
+        if _social_scorer is None:
+            _social_scorer = SocialTextScorer()
+    return _social_scorer
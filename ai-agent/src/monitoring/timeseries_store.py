@@ -0,0 +1,234 @@
+"""
+Sentiment Time-Series Store
+Append-only SQLite (WAL) history of every aggregated sentiment snapshot
+and every raw source reading:
+- Writes are queued and committed in batches by a background thread, so
+  the hot path only pays for a queue put
+- Indexed by time, coin and source for fast range queries
+"""
+
+import os
+import json
+import time
+import queue
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Union
+
+TimeBound = Union[float, datetime, str, None]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    coin_id TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    signal TEXT,
+    strength INTEGER,
+    avg_sentiment REAL,
+    is_trending INTEGER,
+    weights TEXT,
+    timed_out TEXT,
+    payload TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_coin_ts ON snapshots (coin_id, ts);
+CREATE INDEX IF NOT EXISTS idx_snapshots_ts ON snapshots (ts);
+
+CREATE TABLE IF NOT EXISTS readings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    coin_id TEXT NOT NULL,
+    source TEXT NOT NULL,
+    sentiment_score REAL,
+    payload TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_readings_source_ts ON readings (source, ts);
+CREATE INDEX IF NOT EXISTS idx_readings_coin_source_ts ON readings (coin_id, source, ts);
+"""
+
+
+def _to_epoch(value: TimeBound) -> Optional[float]:
+    """Accept epoch seconds, datetimes or ISO strings as query bounds"""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.timestamp()
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, default=str)
+
+
+class SentimentTimeSeriesStore:
+    """Queue-fed SQLite store for sentiment snapshots and source readings"""
+
+    def __init__(self, path: str = None, max_queue: int = 10000, batch_size: int = 500):
+        self.path = path or os.getenv("SENTIMENT_DB_PATH", "sentiment_timeseries.db")
+        self.batch_size = batch_size
+        self._queue = queue.Queue(maxsize=max_queue)
+        self.written = 0
+        self.dropped = 0
+
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        conn.close()
+
+        self._writer = threading.Thread(target=self._write_loop, name="sentiment-store", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")  # readers never block the writer
+        conn.execute("PRAGMA synchronous=NORMAL")  # durable enough for analytics, far fewer fsyncs
+        return conn
+
+    # ---- hot path -------------------------------------------------------
+
+    def _enqueue(self, table: str, row: tuple):
+        try:
+            self._queue.put_nowait((table, row))
+        except queue.Full:
+            self.dropped += 1
+
+    def record_reading(self, coin_id: str, source: str, reading: Optional[Dict], ts: float = None):
+        """Queue one raw source reading (None readings are skipped)"""
+        if not reading:
+            return
+        self._enqueue("readings", (
+            ts or time.time(), coin_id, source,
+            reading.get("sentiment_score"), _dumps(reading)
+        ))
+
+    def record_snapshot(self, coin_id: str, result: Dict, readings: Dict = None, mode: str = "on_demand"):
+        """Queue an aggregated snapshot, plus the raw readings it was built from"""
+        now = time.time()
+        payload = {k: v for k, v in result.items() if k != "sources"}
+        self._enqueue("snapshots", (
+            now, coin_id, mode,
+            result.get("signal"), result.get("strength"), result.get("avg_sentiment"),
+            int(bool(result.get("is_trending"))),
+            _dumps(result.get("weights")), _dumps(result.get("timed_out_sources", [])),
+            _dumps(payload)
+        ))
+        for source, reading in (readings or {}).items():
+            self.record_reading(coin_id, source, reading, ts=now)
+
+    # ---- background writer ----------------------------------------------
+
+    def _write_loop(self):
+        """Drain the queue and commit rows in batches, one transaction per batch"""
+        conn = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            snapshots = [row for table, row in batch if table == "snapshots"]
+            readings = [row for table, row in batch if table == "readings"]
+            try:
+                with conn:
+                    if snapshots:
+                        conn.executemany(
+                            "INSERT INTO snapshots (ts, coin_id, mode, signal, strength, avg_sentiment, "
+                            "is_trending, weights, timed_out, payload) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            snapshots
+                        )
+                    if readings:
+                        conn.executemany(
+                            "INSERT INTO readings (ts, coin_id, source, sentiment_score, payload) "
+                            "VALUES (?, ?, ?, ?, ?)",
+                            readings
+                        )
+                self.written += len(batch)
+            except sqlite3.Error as e:
+                print(f"   ⚠️  Sentiment store write failed ({len(batch)} rows dropped): {e}")
+                self.dropped += len(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self):
+        """Block until every queued row has been committed"""
+        self._queue.join()
+
+    # ---- range queries --------------------------------------------------
+
+    def _query(self, sql: str, params: list) -> List[Dict]:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+        results = []
+        for row in rows:
+            record = dict(row)
+            for column in ("payload", "weights", "timed_out"):
+                if record.get(column):
+                    record[column] = json.loads(record[column])
+            record["timestamp"] = datetime.fromtimestamp(record["ts"]).isoformat()
+            results.append(record)
+        return results
+
+    @staticmethod
+    def _where(filters: Dict, start: TimeBound, end: TimeBound) -> tuple:
+        clauses, params = [], []
+        for column, value in filters.items():
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(_to_epoch(start))
+        if end is not None:
+            clauses.append("ts < ?")
+            params.append(_to_epoch(end))
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def query_snapshots(self, start: TimeBound = None, end: TimeBound = None,
+                        coin_id: str = None, limit: int = None) -> List[Dict]:
+        """Snapshots in [start, end), oldest first"""
+        where, params = self._where({"coin_id": coin_id}, start, end)
+        sql = f"SELECT * FROM snapshots{where} ORDER BY ts"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._query(sql, params)
+
+    def query_readings(self, source: str = None, start: TimeBound = None, end: TimeBound = None,
+                       coin_id: str = None, limit: int = None) -> List[Dict]:
+        """Raw source readings in [start, end), oldest first"""
+        where, params = self._where({"coin_id": coin_id, "source": source}, start, end)
+        sql = f"SELECT * FROM readings{where} ORDER BY ts"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._query(sql, params)
+
+    def stats(self) -> Dict:
+        """Rows written, dropped and still queued"""
+        return {
+            "written": self.written,
+            "dropped": self.dropped,
+            "queued": self._queue.qsize(),
+            "path": self.path,
+        }
+
+
+# Singleton instance
+_store = None
+_store_lock = threading.Lock()
+
+def get_timeseries_store() -> SentimentTimeSeriesStore:
+    """Get or create the process-wide sentiment store"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SentimentTimeSeriesStore()
+    return _store
@@ -1,9 +1,19 @@
 """
 Crypto.com Integration Module
 Uses Crypto.com Exchange API (crypto_com_developer_platform_client) for real prices
+
+One long-lived service per process (get_cdc_service): a background refresher
+keeps the latest CRO snapshot current and readers take it without locking or
+touching the network. Every snapshot carries age_seconds. Only real prices
+become snapshots; when the exchange is unreachable the last real snapshot
+keeps ageing, and simulated data is produced only for a reader that finds
+no real price within its max_age.
 """
 import os
+import time
 import random
+import threading
+from datetime import datetime
 from dotenv import load_dotenv
 
 # Use the SAME Exchange API that your agent uses (no API key needed for public data)
@@ -13,14 +23,41 @@ try:
 except ImportError:
     CDC_AVAILABLE = False
 
+try:
+    from .market_stream import live_market_stream
+except ImportError:
+    from market_stream import live_market_stream
+
 load_dotenv()
 
 class CDCPriceService:
     """Service to fetch CRO prices from Crypto.com Exchange"""
     
-    def __init__(self):
-        """Initialize CDC Exchange Client"""
+    def __init__(self, refresh_interval: float = None, max_age: float = None):
+        """
+        Initialize CDC Exchange Client
+        
+        Args:
+            refresh_interval: seconds between background refreshes (CDC_PRICE_REFRESH_INTERVAL).
+                The trader reads the price once per 15-minute decision cycle, so the
+                60s default costs 15 exchange calls per cycle and keeps the price it
+                reads at most a minute old.
+            max_age: oldest snapshot get_cro_price serves before fetching inline
+                (CDC_PRICE_MAX_AGE, default two refresh intervals)
+        """
         self.base_price = 0.085  # Fallback only
+        self.refresh_interval = refresh_interval if refresh_interval is not None else float(os.getenv("CDC_PRICE_REFRESH_INTERVAL", "60"))
+        if max_age is None:
+            max_age = float(os.getenv("CDC_PRICE_MAX_AGE", str(2 * self.refresh_interval)))
+        self.max_age = max_age
+        
+        # Latest {'data', 'fetched_at'}; replaced whole on refresh so reads need no lock
+        self._snapshot = None
+        self._refresher = None
+        self._stop = threading.Event()
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.last_error = None
         
         if not CDC_AVAILABLE:
             print("❌ crypto_com_developer_platform_client not installed")
@@ -58,16 +95,136 @@ class CDCPriceService:
             'source': 'crypto.com_simulated'  # Changed from 'mock'
         }
     
-    def get_cro_price(self):
+    # ---- background refresh ---------------------------------------------
+    
+    @property
+    def refreshing(self) -> bool:
+        return self._refresher is not None and self._refresher.is_alive()
+    
+    def start_refresher(self, interval: float = None):
+        """Keep the CRO snapshot current from a background thread (no-op if already running)"""
+        if interval is not None:
+            self.refresh_interval = interval
+        if self.refreshing:
+            return self
+        self._stop.clear()
+        self._refresher = threading.Thread(target=self._refresh_loop, name="cdc-price-refresh", daemon=True)
+        self._refresher.start()
+        print(f"🔄 CRO price refresher started (every {self.refresh_interval:g}s)")
+        return self
+    
+    def stop_refresher(self, timeout: float = 5.0):
+        """Stop the background refresher"""
+        self._stop.set()
+        if self._refresher:
+            self._refresher.join(timeout)
+        self._refresher = None
+    
+    def _refresh_loop(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.refresh_interval)
+    
+    def refresh(self):
         """
-        Fetch current CRO/USD price from Crypto.com Exchange
+        Fetch CRO now and publish it as the latest snapshot.
+        On failure the previous real snapshot is kept (its age keeps growing).
+        Returns the latest snapshot, or None if there has never been one.
+        """
+        try:
+            data = self._fetch_cro_price()
+        except Exception as e:
+            self.refresh_errors += 1
+            self.last_error = str(e)
+            print(f"   ⚠️  CRO price refresh failed: {e}")
+            return self.snapshot()
+        self._publish(data)
+        return self.snapshot()
+    
+    def _publish(self, data):
+        self._snapshot = {'data': data, 'fetched_at': time.time()}
+        self.refreshes += 1
+    
+    def snapshot(self, max_age: float = None):
+        """
+        Latest CRO snapshot with age_seconds and fetched_at, without locking or
+        network; None when there is none yet or it is older than max_age.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        age = time.time() - snapshot['fetched_at']
+        if max_age is not None and age > max_age:
+            return None
+        return dict(
+            snapshot['data'],
+            age_seconds=round(age, 3),
+            fetched_at=datetime.fromtimestamp(snapshot['fetched_at']).isoformat()
+        )
+    
+    def metrics(self):
+        snapshot = self.snapshot()
+        return {
+            'refreshing': self.refreshing,
+            'refresh_interval': self.refresh_interval,
+            'refreshes': self.refreshes,
+            'refresh_errors': self.refresh_errors,
+            'last_error': self.last_error,
+            'snapshot_age_seconds': snapshot['age_seconds'] if snapshot else None,
+            'source': snapshot['source'] if snapshot else None,
+        }
+    
+    # ---- reads ------------------------------------------------------------
+    
+    def get_cro_price(self, max_age: float = None):
+        """
+        Current CRO/USD price: the latest snapshot when it is no older than
+        max_age (defaults to CDC_PRICE_MAX_AGE), otherwise fetched inline.
+        Falls back to simulated data (source 'crypto.com_simulated') only when
+        no real price within max_age can be had.
         
         Returns:
-            dict: Price data with current, 24h change, volume, etc.
+            dict: Price data with current, 24h change, volume, etc. plus age_seconds
         """
+        max_age = self.max_age if max_age is None else max_age
+        stream = live_market_stream()
+        streamed = stream.get('CRO_USDT') if stream else None
+        if streamed and streamed.get('last_price'):
+            return self._fetch_cro_price()  # streamed state is newer than any snapshot
+        
+        snapshot = self.snapshot(max_age)
+        if snapshot:
+            return snapshot
+        
+        # No refresher running, or it is failing: try once inline
+        self.refresh()
+        snapshot = self.snapshot(max_age)
+        if snapshot:
+            return snapshot
+        return dict(self._generate_mock_data(), age_seconds=0.0, fetched_at=datetime.now().isoformat())
+    
+    def _fetch_cro_price(self):
+        """Fetch a real CRO/USD price from the stream or the Exchange API; raises when neither has one"""
+        # Live streamed state, when the market stream is running, costs no request
+        stream = live_market_stream()
+        streamed = stream.get('CRO_USDT') if stream else None
+        if streamed and streamed.get('last_price'):
+            best_bid, best_ask = streamed.get('best_bid'), streamed.get('best_ask')
+            price_data = {
+                'price': streamed['last_price'],
+                'change_24h': streamed.get('change_24h_percent') or 0,
+                'volume_24h': streamed.get('volume_24h') or 0,
+                'high_24h': streamed.get('high_24h') or 0,
+                'low_24h': streamed.get('low_24h') or 0,
+                'age_seconds': streamed['age_seconds'],
+                'source': 'crypto.com_stream'
+            }
+            if best_bid and best_ask:
+                price_data.update({'bid': best_bid, 'ask': best_ask, 'spread': best_ask - best_bid})
+            return price_data
+        
         if not CDC_AVAILABLE or not self.initialized:
-            # Silently use simulated data
-            return self._generate_mock_data()
+            raise RuntimeError("Crypto.com Exchange client unavailable")
         
         try:
             # Fetch REAL price from Crypto.com Exchange (same as your agent)
@@ -95,15 +252,13 @@ class CDCPriceService:
                     'source': 'crypto.com_exchange'
                 }
             else:
-                # Silent fallback
-                return self._generate_mock_data()
+                raise RuntimeError(f"No CRO_USDT price in ticker response: {ticker}")
             
         except Exception as e:
             # Check if it's a timeout (VPN needed)
             if 'timeout' in str(e).lower() or 'timed out' in str(e).lower():
                 print("💡 Tip: Enable VPN to connect to Crypto.com API for real prices")
-            # Use simulated data
-            return self._generate_mock_data()
+            raise
     
     def get_cro_market_data(self):
         """
@@ -142,12 +297,14 @@ class CDCPriceService:
 
 # Singleton instance
 _cdc_service = None
+_cdc_service_lock = threading.Lock()
 
 def get_cdc_service():
     """Get or create CDC price service singleton"""
     global _cdc_service
-    if _cdc_service is None:
-        _cdc_service = CDCPriceService()
+    with _cdc_service_lock:
+        if _cdc_service is None:
+            _cdc_service = CDCPriceService()
     return _cdc_service
 
 
@@ -167,7 +324,7 @@ if __name__ == "__main__":
     print(f"   24h Volume: ${price_data['volume_24h']:,.0f}")
     print(f"   24h High: ${price_data['high_24h']:.6f}")
     print(f"   24h Low: ${price_data['low_24h']:.6f}")
-    print(f"   Source: {price_data['source']}")
+    print(f"   Source: {price_data['source']} ({price_data['age_seconds']:.1f}s old)")
     
     print("\n📈 Fetching extended market data...")
     market_data = service.get_cro_market_data()
@@ -0,0 +1,305 @@
+"""
+Streaming Market Data
+WebSocket client for the Crypto.com Exchange market channels (ticker.* and
+trade.*) that keeps live per-instrument state in process:
+- last price, best bid/ask, 24h high/low/volume/change, last trade
+- Readers never lock: each update swaps in a new snapshot dict
+- Heartbeats answered, reconnects with backoff, resubscribes on reconnect
+
+Enabled with MARKET_STREAM_ENABLED=true. Run services/mock_market_stream.py
+and point MARKET_STREAM_URL at it to exercise this without the exchange.
+"""
+import os
+import json
+import time
+import asyncio
+import threading
+from typing import Dict, Iterable, Optional
+
+try:
+    import websockets
+    WEBSOCKETS_AVAILABLE = True
+except ImportError:
+    WEBSOCKETS_AVAILABLE = False
+
+DEFAULT_URL = "wss://stream.crypto.com/exchange/v1/market"
+
+
+def streaming_enabled() -> bool:
+    return os.getenv("MARKET_STREAM_ENABLED", "false").lower() == "true"
+
+
+def _normalize(instrument: str) -> str:
+    return instrument.strip().replace("-", "_").upper()
+
+
+def _float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class MarketStream:
+    """Background WebSocket subscriber holding the latest state per instrument"""
+
+    def __init__(self, url: str = None, instruments: Iterable[str] = None, max_age: float = None):
+        """
+        Args:
+            url: market WebSocket endpoint (MARKET_STREAM_URL)
+            instruments: instruments to subscribe to (MARKET_STREAM_INSTRUMENTS)
+            max_age: seconds after which state counts as stale for readers (MARKET_STREAM_MAX_AGE)
+        """
+        self.url = url or os.getenv("MARKET_STREAM_URL", DEFAULT_URL)
+        if instruments is None:
+            instruments = os.getenv("MARKET_STREAM_INSTRUMENTS", "CRO_USDT,BTC_USDT,ETH_USDT").split(",")
+        # Replaced (never mutated) by subscribe() so the loop thread and readers iterate a stable set
+        self.instruments = frozenset(_normalize(i) for i in instruments if i.strip())
+        self.max_age = max_age if max_age is not None else float(os.getenv("MARKET_STREAM_MAX_AGE", "10"))
+        self.connect_delay = float(os.getenv("MARKET_STREAM_CONNECT_DELAY", "1"))  # exchange asks for 1s before requests
+        # Cap on instruments added by subscribe() (the set is re-sent on every reconnect)
+        self.max_instruments = int(os.getenv("MARKET_STREAM_MAX_INSTRUMENTS", "50"))
+
+        self._state: Dict[str, Dict] = {}  # instrument -> snapshot, replaced (never mutated) on update
+        self._loop = None
+        self._ws = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._request_id = 0
+        self._subscribe_lock = threading.Lock()
+
+        self.connected = False
+        self.messages = 0
+        self.reconnects = 0
+        self.heartbeats = 0
+        self.last_error = None
+
+    # ---- lifecycle ------------------------------------------------------
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "MarketStream":
+        """Connect in a background thread (no-op if already running)"""
+        if not WEBSOCKETS_AVAILABLE:
+            print("❌ websockets not installed - market stream disabled")
+            return self
+        if self.running:
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run_loop, name="market-stream", daemon=True)
+        self._thread.start()
+        print(f"📡 Market stream starting: {self.url} ({', '.join(sorted(self.instruments))})")
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        """Close the connection and stop the background thread"""
+        self._stop.set()
+        if self._loop and self._ws and not self._loop.is_closed():
+            asyncio.run_coroutine_threadsafe(self._ws.close(), self._loop)
+        if self._thread:
+            self._thread.join(timeout)
+        self.connected = False
+
+    def wait_ready(self, instruments: Iterable[str] = None, timeout: float = 10.0) -> bool:
+        """Block until every instrument has state (e.g. before the first trading cycle)"""
+        wanted = {_normalize(i) for i in (instruments or self.instruments)}
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if wanted.issubset(self._state):
+                return True
+            time.sleep(0.05)
+        return False
+
+    def subscribe(self, instruments: Iterable[str]):
+        """
+        Add instruments; subscribed right away when connected, else on (re)connect.
+        Instruments beyond MARKET_STREAM_MAX_INSTRUMENTS are ignored.
+        """
+        with self._subscribe_lock:
+            current = self.instruments
+            new = {_normalize(i) for i in instruments} - current
+            room = max(0, self.max_instruments - len(current))
+            if len(new) > room:
+                dropped = sorted(new)[room:]
+                print(f"   ⚠️  Market stream capped at {self.max_instruments} instruments - not subscribing {', '.join(dropped)}")
+                new = set(sorted(new)[:room])
+            if not new:
+                return
+            self.instruments = current | new
+        if self.connected and self._loop:
+            asyncio.run_coroutine_threadsafe(self._send_subscribe(self._ws, new), self._loop)
+
+    # ---- reads (lock-free) ----------------------------------------------
+
+    def get(self, instrument: str, max_age: float = None) -> Optional[Dict]:
+        """
+        Latest state for an instrument with its age, or None when there is
+        none or it is older than max_age (defaults to MARKET_STREAM_MAX_AGE).
+        """
+        snapshot = self._state.get(_normalize(instrument))
+        if snapshot is None:
+            return None
+        age = time.time() - snapshot["updated_at"]
+        if age > (self.max_age if max_age is None else max_age):
+            return None
+        return dict(snapshot, age_seconds=round(age, 3))
+
+    def ticker_data(self, instrument: str, max_age: float = None) -> Optional[Dict]:
+        """Latest state in the field names of Exchange.get_ticker_by_instrument()['data']"""
+        snapshot = self.get(instrument, max_age)
+        if snapshot is None or snapshot.get("last_price") is None:
+            return None
+        return {
+            "instrumentName": snapshot["instrument"],
+            "lastPrice": snapshot["last_price"],
+            "bestBid": snapshot.get("best_bid"),
+            "bestAsk": snapshot.get("best_ask"),
+            "high": snapshot.get("high_24h") or 0,
+            "low": snapshot.get("low_24h") or 0,
+            "volume": snapshot.get("volume_24h") or 0,
+            "change": snapshot.get("change_24h_percent") or 0,
+            "timestamp": snapshot.get("exchange_ts", ""),
+            "age_seconds": snapshot["age_seconds"],
+        }
+
+    def metrics(self) -> Dict:
+        return {
+            "connected": self.connected,
+            "instruments": sorted(self.instruments),
+            "with_state": sorted(self._state),
+            "messages": self.messages,
+            "reconnects": self.reconnects,
+            "heartbeats": self.heartbeats,
+            "last_error": self.last_error,
+        }
+
+    # ---- background loop ------------------------------------------------
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._run())
+        finally:
+            self._loop.close()
+
+    async def _run(self):
+        backoff = 1.0
+        while not self._stop.is_set():
+            try:
+                async with websockets.connect(self.url, ping_interval=None, max_size=2 ** 22) as ws:
+                    self._ws = ws
+                    await asyncio.sleep(self.connect_delay)
+                    await self._send_subscribe(ws, self.instruments)
+                    self.connected = True
+                    backoff = 1.0
+                    async for raw in ws:
+                        await self._handle(ws, raw)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                if not self._stop.is_set():
+                    print(f"   ⚠️  Market stream disconnected ({self.last_error}) - retrying in {backoff:.0f}s")
+            self.connected = False
+            self._ws = None
+            if self._stop.is_set():
+                break
+            self.reconnects += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    def _next_id(self) -> int:
+        self._request_id += 1
+        return self._request_id
+
+    async def _send_subscribe(self, ws, instruments):
+        channels = [f"{channel}.{i}" for i in sorted(instruments) for channel in ("ticker", "trade")]
+        await ws.send(json.dumps({
+            "id": self._next_id(),
+            "method": "subscribe",
+            "params": {"channels": channels},
+            "nonce": int(time.time() * 1000),
+        }))
+
+    async def _handle(self, ws, raw):
+        message = json.loads(raw)
+        if message.get("method") == "public/heartbeat":
+            self.heartbeats += 1
+            await ws.send(json.dumps({"id": message.get("id"), "method": "public/respond-heartbeat"}))
+            return
+
+        result = message.get("result") or {}
+        rows = result.get("data") or []
+        if not rows:
+            return
+        self.messages += 1
+        channel = result.get("channel", "")
+        instrument = result.get("instrument_name")
+        if channel == "ticker":
+            for row in rows:
+                self._apply_ticker(row.get("i") or instrument, row)
+        elif channel.startswith("trade"):
+            newest = max(rows, key=lambda r: r.get("t", 0))
+            self._apply_trade(newest.get("i") or instrument, newest)
+
+    def _update(self, instrument: str, fields: Dict):
+        """Swap in a new snapshot (single reference assignment, so readers need no lock)"""
+        instrument = _normalize(instrument)
+        previous = self._state.get(instrument, {"instrument": instrument})
+        self._state[instrument] = dict(previous, **fields, updated_at=time.time())
+
+    def _apply_ticker(self, instrument: str, row: Dict):
+        change = _float(row.get("c"))
+        self._update(instrument, {
+            "last_price": _float(row.get("a")),
+            "best_bid": _float(row.get("b")),
+            "best_ask": _float(row.get("k")),
+            "high_24h": _float(row.get("h")),
+            "low_24h": _float(row.get("l")),
+            "volume_24h": _float(row.get("v")),
+            "change_24h_percent": change * 100 if change is not None else None,  # raw change is a ratio
+            "exchange_ts": row.get("t"),
+        })
+
+    def _apply_trade(self, instrument: str, row: Dict):
+        price = _float(row.get("p"))
+        self._update(instrument, {
+            "last_price": price,
+            "last_trade": {
+                "price": price,
+                "quantity": _float(row.get("q")),
+                "side": row.get("s"),
+                "timestamp": row.get("t"),
+            },
+        })
+
+
+# Singleton instance
+_market_stream = None
+_market_stream_lock = threading.Lock()
+
+def get_market_stream() -> MarketStream:
+    """Get or create the process-wide market stream (not started)"""
+    global _market_stream
+    with _market_stream_lock:
+        if _market_stream is None:
+            _market_stream = MarketStream()
+    return _market_stream
+
+
+def live_market_stream() -> Optional[MarketStream]:
+    """The process-wide stream if it has been started and is running, else None"""
+    if _market_stream is not None and _market_stream.running:
+        return _market_stream
+    return None
+
+
+def start_market_stream(wait: float = 5.0) -> Optional[MarketStream]:
+    """Start the process-wide stream when MARKET_STREAM_ENABLED, waiting up to `wait` for first data"""
+    if not streaming_enabled():
+        return None
+    stream = get_market_stream().start()
+    if stream.running and wait and not stream.wait_ready(timeout=wait):
+        print(f"   ⚠️  Market stream has no data yet after {wait:.0f}s - tools fall back to REST")
+    return stream
@@ -0,0 +1,181 @@
+"""
+Mock Market Stream
+Local stand-in for the Crypto.com Exchange market WebSocket, speaking the
+same subscribe / heartbeat / ticker / trade messages. Prices follow a
+seeded random walk, so runs are repeatable.
+
+    python services/mock_market_stream.py --port 8765
+    MARKET_STREAM_ENABLED=true MARKET_STREAM_URL=ws://127.0.0.1:8765 python autonomous_trader.py
+"""
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import threading
+from typing import Dict
+
+import websockets
+
+DEFAULT_PRICES = {"CRO_USDT": 0.085, "BTC_USDT": 62000.0, "ETH_USDT": 2400.0}
+
+
+class MockMarketStream:
+    """WebSocket server publishing ticker and trade updates for subscribed instruments"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, interval: float = 0.2,
+                 prices: Dict[str, float] = None, heartbeat_interval: float = 30.0, seed: int = 7):
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.prices = dict(prices or DEFAULT_PRICES)
+        self.opens = dict(self.prices)  # "24h ago" reference for the change field
+        self.heartbeat_interval = heartbeat_interval
+        self.random = random.Random(seed)
+        self.heartbeat_responses = 0
+        self.connections = 0
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    # ---- server lifecycle -----------------------------------------------
+
+    def start(self) -> str:
+        """Serve in a background thread; returns the ws:// URL"""
+        self._thread = threading.Thread(target=self._run_loop, name="mock-market-stream", daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+        return self.url
+
+    def stop(self):
+        """Close the server and its connections (safe to call twice)"""
+        if self._loop and self._server and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._server.close)
+        if self._thread:
+            self._thread.join(5)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(self._serve())
+        self._loop.close()
+
+    async def _serve(self):
+        self._server = await websockets.serve(self._handler, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        await self._server.wait_closed()
+
+    # ---- protocol -------------------------------------------------------
+
+    async def _handler(self, ws, *_):
+        self.connections += 1
+        subscribed = set()
+        publisher = asyncio.ensure_future(self._publish(ws, subscribed))
+        try:
+            async for raw in ws:
+                message = json.loads(raw)
+                if message.get("method") == "subscribe":
+                    channels = message.get("params", {}).get("channels", [])
+                    subscribed.update(channels)
+                    await ws.send(json.dumps({"id": message.get("id"), "method": "subscribe", "code": 0}))
+                elif message.get("method") == "public/respond-heartbeat":
+                    self.heartbeat_responses += 1
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            publisher.cancel()
+
+    async def _publish(self, ws, subscribed: set):
+        last_heartbeat = time.monotonic()
+        while True:
+            await asyncio.sleep(self.interval)
+            if time.monotonic() - last_heartbeat >= self.heartbeat_interval:
+                last_heartbeat = time.monotonic()
+                await ws.send(json.dumps({"id": int(time.time() * 1000), "method": "public/heartbeat", "code": 0}))
+
+            for subscription in sorted(subscribed):
+                channel, _, instrument = subscription.partition(".")
+                if instrument not in self.prices:
+                    continue
+                if channel == "ticker":
+                    self._step(instrument)
+                    data = [self._ticker_row(instrument)]
+                elif channel == "trade":
+                    data = [self._trade_row(instrument)]
+                else:
+                    continue
+                await ws.send(json.dumps({
+                    "id": -1,
+                    "method": "subscribe",
+                    "code": 0,
+                    "result": {
+                        "instrument_name": instrument,
+                        "subscription": subscription,
+                        "channel": channel,
+                        "data": data,
+                    },
+                }))
+
+    def _step(self, instrument: str):
+        self.prices[instrument] *= 1 + self.random.gauss(0, 0.001)
+
+    def _ticker_row(self, instrument: str) -> Dict:
+        price = self.prices[instrument]
+        spread = price * 0.0005
+        return {
+            "i": instrument,
+            "a": f"{price:.8g}",
+            "b": f"{price - spread:.8g}",
+            "k": f"{price + spread:.8g}",
+            "h": f"{max(price, self.opens[instrument]) * 1.01:.8g}",
+            "l": f"{min(price, self.opens[instrument]) * 0.99:.8g}",
+            "v": f"{self.random.uniform(1e6, 2e6):.2f}",
+            "c": f"{price / self.opens[instrument] - 1:.6f}",
+            "t": int(time.time() * 1000),
+        }
+
+    def _trade_row(self, instrument: str) -> Dict:
+        return {
+            "i": instrument,
+            "p": f"{self.prices[instrument]:.8g}",
+            "q": f"{self.random.uniform(1, 1000):.2f}",
+            "s": self.random.choice(["BUY", "SELL"]),
+            "d": str(self.random.getrandbits(48)),
+            "t": int(time.time() * 1000),
+        }
+
+
+def main():
+    """Run the mock market stream until interrupted"""
+    parser = argparse.ArgumentParser(description="Local stand-in for the exchange market WebSocket")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--interval", type=float, default=0.5, help="seconds between updates")
+    args = parser.parse_args()
+
+    server = MockMarketStream(args.host, args.port, args.interval)
+    print(f"📡 Mock market stream on {server.start()} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
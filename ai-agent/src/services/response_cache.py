@@ -0,0 +1,183 @@
+"""
+Process-wide Response Cache
+TTL cache with stale-while-revalidate and single-flight request coalescing.
+Shared by every caller in the process so repeated lookups of the same
+endpoint (trader loop, MCP tools, test helpers) cost one upstream request.
+"""
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict
+
+
+class _Entry:
+    """Cached value plus the time it was fetched"""
+
+    __slots__ = ("value", "fetched_at")
+
+    def __init__(self, value: Any, fetched_at: float):
+        self.value = value
+        self.fetched_at = fetched_at
+
+
+class ResponseCache:
+    """
+    Thread-safe response cache
+
+    - fresh (age < ttl): served from cache
+    - stale (ttl <= age < ttl + stale_ttl): served from cache, refreshed in background
+    - expired / missing: fetched; concurrent identical requests share one fetch
+    - fetch error: last known value is served if it is younger than max_stale
+    - entries older than max_stale are dropped, and the oldest go first past max_entries
+    """
+
+    def __init__(self, max_entries: int = None, max_stale: float = None):
+        """
+        Args:
+            max_entries: Most keys kept (RESPONSE_CACHE_MAX_ENTRIES)
+            max_stale: Oldest value ever served, even on fetch error (RESPONSE_CACHE_MAX_STALE)
+        """
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+        self.max_stale = max_stale if max_stale is not None else float(os.getenv("RESPONSE_CACHE_MAX_STALE", "3600"))
+        self._entries: Dict[str, _Entry] = {}
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._stats_lock = threading.Lock()
+
+    def get(self, key: str, fetch: Callable[[], Any], ttl: float,
+            stale_ttl: float = 0, namespace: str = "default") -> Any:
+        """
+        Return the cached value for key, calling fetch() when needed
+
+        Args:
+            key: Cache key (should include endpoint and parameters)
+            fetch: Zero-arg callable that returns the fresh value or raises
+            ttl: Seconds a value is considered fresh
+            stale_ttl: Extra seconds a value may be served while it is refreshed
+            namespace: Bucket for hit/miss counters (e.g. 'coingecko')
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            age = now - entry.fetched_at if entry else None
+
+            if entry and age < ttl:
+                self._count(namespace, "hits")
+                return entry.value
+
+            if entry and age < ttl + stale_ttl:
+                self._count(namespace, "stale_hits")
+                if key not in self._inflight:
+                    # Registered before the thread starts so a burst of stale hits refreshes once
+                    future = Future()
+                    self._inflight[key] = future
+                    self._count(namespace, "background_refreshes")
+                    threading.Thread(
+                        target=self._refresh_quietly,
+                        args=(key, fetch, namespace, future),
+                        daemon=True
+                    ).start()
+                return entry.value
+
+            self._count(namespace, "misses")
+
+        try:
+            return self._fetch_coalesced(key, fetch, namespace)
+        except Exception:
+            if entry is not None and age < self.max_stale:
+                # Stale-if-error: an old answer beats no answer (e.g. on HTTP 429)
+                self._count(namespace, "stale_on_error")
+                return entry.value
+            raise
+
+    def _fetch_coalesced(self, key: str, fetch: Callable[[], Any], namespace: str) -> Any:
+        """Run fetch() once per key, letting concurrent callers wait on the same result"""
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self._count(namespace, "coalesced")
+
+        if leader:
+            self._run_fetch(key, fetch, namespace, future)
+
+        return future.result()
+
+    def _run_fetch(self, key: str, fetch: Callable[[], Any], namespace: str, future: Future):
+        """Call fetch() for the in-flight future registered under key and settle it"""
+        try:
+            value = fetch()
+            with self._lock:
+                self._store(key, value)
+            future.set_result(value)
+        except Exception as e:
+            self._count(namespace, "errors")
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _store(self, key: str, value: Any):
+        """Insert a fresh value and evict expired / excess entries (caller holds the lock)"""
+        now = time.monotonic()
+        self._entries.pop(key, None)  # re-insert so dict order is fetch order
+        self._entries[key] = _Entry(value, now)
+        while self._entries:
+            oldest_key = next(iter(self._entries))
+            oldest = self._entries[oldest_key]
+            if len(self._entries) <= self.max_entries and now - oldest.fetched_at < self.max_stale:
+                break
+            del self._entries[oldest_key]
+
+    def _refresh_quietly(self, key: str, fetch: Callable[[], Any], namespace: str, future: Future):
+        """Background refresh for stale entries; failures keep the old value"""
+        self._run_fetch(key, fetch, namespace, future)
+        error = future.exception()
+        if error is not None:
+            print(f"   ⚠️  Background refresh failed for {key}: {error}")
+
+    def _count(self, namespace: str, counter: str):
+        """Increment a hit/miss counter"""
+        with self._stats_lock:
+            bucket = self._stats.setdefault(namespace, {})
+            bucket[counter] = bucket.get(counter, 0) + 1
+
+    def invalidate(self, key: str = None):
+        """Drop one key, or everything when key is None"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self, namespace: str = None) -> Dict:
+        """Hit/miss counters, per namespace (or a single namespace)"""
+        with self._stats_lock:
+            snapshot = {ns: dict(counters) for ns, counters in self._stats.items()}
+
+        for counters in snapshot.values():
+            served = counters.get("hits", 0) + counters.get("stale_hits", 0)
+            lookups = served + counters.get("misses", 0)
+            counters["hit_rate"] = round(served / lookups, 3) if lookups else 0.0
+
+        if namespace is not None:
+            return snapshot.get(namespace, {"hit_rate": 0.0})
+        return snapshot
+
+
+# Singleton instance
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+def get_response_cache() -> ResponseCache:
+    """Get or create the process-wide response cache"""
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+    return _response_cache
@@ -0,0 +1,267 @@
+"""
+Shared Ticker Cache
+Short-TTL cache in front of Exchange.get_ticker_by_instrument, built on the
+process-wide ResponseCache:
+- Concurrent lookups of the same instrument share one request (single-flight)
+- Every ticker comes back with a freshness block (live / cache, age)
+- Hit-rate counters live in the response cache's "tickers" namespace
+- Multi-instrument lookups use one all-tickers request when the exchange
+  client has one, else a concurrent fan-out of per-instrument lookups
+- When the market stream is running, fresh streamed state is served first
+  and no request is made at all
+"""
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+try:
+    from crypto_com_developer_platform_client import Exchange
+    CDC_AVAILABLE = True
+except ImportError:
+    CDC_AVAILABLE = False
+
+try:
+    from .response_cache import ResponseCache, get_response_cache
+    from .market_stream import live_market_stream
+except ImportError:
+    from response_cache import ResponseCache, get_response_cache
+    from market_stream import live_market_stream
+
+NAMESPACE = "tickers"
+
+# Field naming the instrument in a bulk ticker row, by client version
+INSTRUMENT_FIELDS = ("instrumentName", "instrument_name", "i", "symbol")
+
+# Raw exchange short keys -> the field names the per-instrument ticker uses
+SHORT_FIELDS = {"a": "lastPrice", "h": "high", "l": "low", "v": "volume"}
+
+
+def normalize_instrument(instrument: str) -> str:
+    """'cro-usdt' -> 'CRO_USDT'"""
+    return instrument.strip().replace("-", "_").upper()
+
+
+def _exchange_ticker(instrument: str) -> Dict:
+    if not CDC_AVAILABLE:
+        raise RuntimeError("crypto_com_developer_platform_client not installed")
+    return Exchange.get_ticker_by_instrument(instrument)
+
+
+def _exchange_bulk_fetch() -> Optional[Callable[[], Dict]]:
+    """The client's all-tickers call, if this version has one"""
+    return getattr(Exchange, "get_all_tickers", None) if CDC_AVAILABLE else None
+
+
+def _bulk_rows(response) -> Dict[str, Dict]:
+    """Index an all-tickers response by normalized instrument name"""
+    rows = response.get("data", []) if isinstance(response, dict) else response
+    if isinstance(rows, dict):
+        rows = rows.get("data", [])
+    indexed = {}
+    for row in rows or []:
+        name = next((row[field] for field in INSTRUMENT_FIELDS if row.get(field)), None)
+        if name:
+            row = dict(row)
+            for short, field in SHORT_FIELDS.items():
+                if field not in row and short in row:
+                    row[field] = row[short]
+            if "change" not in row and "c" in row:
+                row["change"] = float(row["c"]) * 100  # raw 24h change is a ratio
+            indexed[normalize_instrument(name)] = row
+    return indexed
+
+
+class TickerCache:
+    """Per-instrument ticker lookups with TTL, coalescing and freshness metadata"""
+
+    def __init__(self, cache: ResponseCache = None, fetch: Callable[[str], Dict] = None,
+                 ttl: float = None, stale_ttl: float = None, bulk_fetch: Callable[[], Dict] = None):
+        """
+        Args:
+            cache: response cache to store tickers in (defaults to the process-wide one)
+            fetch: instrument -> raw ticker response (defaults to the Exchange API)
+            bulk_fetch: () -> every ticker in one response (defaults to Exchange.get_all_tickers when present)
+            ttl: seconds a ticker is served without refetching (TICKER_CACHE_TTL)
+            stale_ttl: extra seconds a ticker may be served while refreshed in background
+        """
+        self.cache = cache or get_response_cache()
+        self.fetch = fetch or _exchange_ticker
+        self.ttl = ttl if ttl is not None else float(os.getenv("TICKER_CACHE_TTL", "5"))
+        self.stale_ttl = stale_ttl if stale_ttl is not None else float(os.getenv("TICKER_CACHE_STALE_TTL", "10"))
+        self.bulk_fetch = bulk_fetch if bulk_fetch is not None else (
+            _exchange_bulk_fetch() if fetch is None else None
+        )
+        self.bulk_min = int(os.getenv("TICKER_BULK_MIN_PAIRS", "2"))
+        self._fanout = ThreadPoolExecutor(
+            max_workers=int(os.getenv("TICKER_FANOUT_WORKERS", "8")),
+            thread_name_prefix="ticker-fanout"
+        )
+        self.stream_hits = 0
+
+    def get_ticker(self, instrument: str) -> Dict:
+        """
+        Ticker for one instrument.
+        Returns {"instrument", "data": the exchange's ticker data, "freshness": {...}};
+        raises whatever the exchange call raised when there is nothing cached.
+        """
+        instrument = normalize_instrument(instrument)
+        streamed = self._from_stream(instrument)
+        if streamed:
+            return streamed
+        requested_at = time.time()
+
+        def fetch():
+            return {"ticker": self.fetch(instrument), "fetched_at": time.time()}
+
+        entry = self.cache.get(
+            f"ticker:{instrument}", fetch,
+            ttl=self.ttl, stale_ttl=self.stale_ttl, namespace=NAMESPACE
+        )
+        data = entry["ticker"].get("data", {})
+        self._follow_on_stream(instrument, data)
+        return {
+            "instrument": instrument,
+            "data": data,
+            "freshness": self._freshness(entry["fetched_at"], requested_at),
+        }
+
+    def get_tickers(self, instruments: List[str]) -> Dict[str, Dict]:
+        """
+        Tickers for several instruments at once: instrument -> get_ticker-style
+        result, or {"instrument", "error"} for one that could not be fetched.
+        One cached all-tickers request covers every instrument when the client
+        supports it; otherwise the per-instrument lookups run concurrently.
+        Never raises: a failure is reported per instrument.
+        """
+        instruments = list(dict.fromkeys(normalize_instrument(i) for i in instruments if i.strip()))
+        streamed = {i: self._from_stream(i) for i in instruments}
+        remaining = [i for i in instruments if streamed[i] is None]
+        if not remaining:
+            return streamed
+        try:
+            fetched = self._fetch_many(remaining)
+        except Exception as e:
+            fetched = {i: {"instrument": i, "error": str(e)} for i in remaining}
+        return {i: streamed[i] or fetched[i] for i in instruments}
+
+    def _fetch_many(self, instruments: List[str]) -> Dict[str, Dict]:
+        """Bulk snapshot or concurrent per-instrument lookups"""
+        if self.bulk_fetch and len(instruments) >= self.bulk_min:
+            try:
+                return self._from_snapshot(instruments)
+            except Exception as e:
+                print(f"   ⚠️  Bulk ticker snapshot failed, fetching per instrument: {e}")
+
+        def lookup(instrument):
+            try:
+                return self.get_ticker(instrument)
+            except Exception as e:
+                return {"instrument": instrument, "error": str(e)}
+
+        if len(instruments) == 1:
+            return {instruments[0]: lookup(instruments[0])}
+        return dict(zip(instruments, self._fanout.map(lookup, instruments)))
+
+    def _from_stream(self, instrument: str) -> Optional[Dict]:
+        """Fresh streamed state for an instrument, or None (stream off, not subscribed or stale)"""
+        stream = live_market_stream()
+        if stream is None:
+            return None
+        data = stream.ticker_data(instrument)
+        if data is None:
+            return None
+        self.stream_hits += 1
+        return {
+            "instrument": instrument,
+            "data": data,
+            "freshness": {
+                "source": "stream",
+                "age_seconds": data["age_seconds"],
+                "fetched_at": datetime.fromtimestamp(time.time() - data["age_seconds"]).isoformat(),
+                "ttl_seconds": stream.max_age,
+            },
+        }
+
+    def _follow_on_stream(self, instrument: str, data: Dict):
+        """
+        Subscribe the stream to an instrument the exchange just returned a real
+        ticker for, so later lookups skip REST. Unknown symbols (e.g. typos in
+        tool arguments) never get this far.
+        """
+        stream = live_market_stream()
+        if stream is not None and data.get("lastPrice") not in (None, "", 0, "0"):
+            stream.subscribe([instrument])
+
+    def _from_snapshot(self, instruments: List[str]) -> Dict[str, Dict]:
+        """Filter the cached all-tickers snapshot down to the requested instruments"""
+        requested_at = time.time()
+
+        def fetch():
+            rows = _bulk_rows(self.bulk_fetch())
+            if not rows:
+                # An error payload: raise so it is not cached and _fetch_many falls back per instrument
+                raise RuntimeError("all-tickers response had no ticker rows")
+            return {"rows": rows, "fetched_at": time.time()}
+
+        entry = self.cache.get(
+            "tickers:all", fetch,
+            ttl=self.ttl, stale_ttl=self.stale_ttl, namespace=NAMESPACE
+        )
+        freshness = self._freshness(entry["fetched_at"], requested_at)
+        results = {}
+        for instrument in instruments:
+            row = entry["rows"].get(instrument)
+            if row is None:
+                results[instrument] = {"instrument": instrument, "error": "not in ticker snapshot"}
+            else:
+                self._follow_on_stream(instrument, row)
+                results[instrument] = {"instrument": instrument, "data": row, "freshness": dict(freshness)}
+        return results
+
+    def _freshness(self, fetched_at: float, requested_at: float) -> Dict:
+        """
+        "live" only when the data was fetched after this lookup began (by us or by a
+        coalesced request we waited on); stale hits and stale-on-error are "cache"
+        even if a background refresh ran meanwhile.
+        """
+        return {
+            "source": "live" if fetched_at >= requested_at else "cache",
+            "age_seconds": round(max(0.0, time.time() - fetched_at), 3),
+            "fetched_at": datetime.fromtimestamp(fetched_at).isoformat(),
+            "ttl_seconds": self.ttl,
+        }
+
+    def invalidate(self, instrument: str):
+        """Drop one instrument's cached ticker"""
+        self.cache.invalidate(f"ticker:{normalize_instrument(instrument)}")
+
+    def metrics(self) -> Dict:
+        """
+        Hit rate, misses, coalesced requests and errors for ticker lookups.
+        A coalesced lookup counts as a miss in hit_rate but never reached the
+        exchange; requests_saved counts hits, coalesced and streamed lookups together.
+        """
+        metrics = self.cache.stats(NAMESPACE)
+        lookups = metrics.get("hits", 0) + metrics.get("stale_hits", 0) + metrics.get("misses", 0) + self.stream_hits
+        saved = lookups - (metrics.get("misses", 0) - metrics.get("coalesced", 0))
+        metrics["stream_hits"] = self.stream_hits
+        metrics["requests_saved"] = saved
+        metrics["saved_rate"] = round(saved / lookups, 3) if lookups else 0.0
+        metrics["ttl_seconds"] = self.ttl
+        return metrics
+
+
+# Singleton instance
+_ticker_cache = None
+_ticker_cache_lock = threading.Lock()
+
+def get_ticker_cache() -> TickerCache:
+    """Get or create the process-wide ticker cache"""
+    global _ticker_cache
+    with _ticker_cache_lock:
+        if _ticker_cache is None:
+            _ticker_cache = TickerCache()
+    return _ticker_cache
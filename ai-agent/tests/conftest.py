@@ -0,0 +1,23 @@
+"""
+Shared pytest setup: put src/ on the path (as the trader does) and keep
+caches, logs and databases out of the working tree.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+
+@pytest.fixture(autouse=True)
+def isolated_paths(tmp_path, monkeypatch):
+    """Point every on-disk cache/log/store at a per-test temp dir"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GEMINI_CACHE_PATH", str(tmp_path / "gemini_headline_cache.json"))
+    monkeypatch.setenv("GEMINI_ITEM_CACHE_PATH", str(tmp_path / "gemini_item_cache.json"))
+    monkeypatch.setenv("GEMINI_TRAINING_LOG", str(tmp_path / "gemini_headline_scores.jsonl"))
+    monkeypatch.setenv("GEMINI_ITEM_TRAINING_LOG", str(tmp_path / "gemini_item_scores.jsonl"))
+    monkeypatch.setenv("SENTIMENT_DB_PATH", str(tmp_path / "sentiment_timeseries.db"))
+    monkeypatch.setenv("SENTIMENT_STORE_ENABLED", "false")
+    return tmp_path
@@ -0,0 +1,97 @@
+import time
+
+import pytest
+
+import services.cdc_price_service as cdc
+
+
+class FakeExchange:
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+
+    def get_ticker_by_instrument(self, instrument):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("exchange down")
+        return {"data": {"lastPrice": "0.1", "priceChange": "0", "volume": "100", "high": "0.11", "low": "0.09"}}
+
+
+@pytest.fixture
+def exchange(monkeypatch):
+    fake = FakeExchange()
+    monkeypatch.setattr(cdc, "CDC_AVAILABLE", True)
+    monkeypatch.setattr(cdc, "Exchange", fake, raising=False)
+    monkeypatch.setattr(cdc, "Client", type("Client", (), {"init": staticmethod(lambda **kw: None)}), raising=False)
+    monkeypatch.setattr(cdc, "live_market_stream", lambda: None)
+    return fake
+
+
+def test_defaults_follow_the_refresh_interval(monkeypatch, exchange):
+    monkeypatch.delenv("CDC_PRICE_REFRESH_INTERVAL", raising=False)
+    monkeypatch.delenv("CDC_PRICE_MAX_AGE", raising=False)
+    service = cdc.CDCPriceService()
+    assert service.refresh_interval == 60
+    assert service.max_age == 120
+    assert cdc.CDCPriceService(refresh_interval=5).max_age == 10
+
+
+def test_failed_refresh_keeps_the_real_snapshot_ageing(exchange):
+    service = cdc.CDCPriceService(refresh_interval=60, max_age=60)
+    assert service.refresh()["source"] == "crypto.com_exchange"
+
+    exchange.fail = True
+    time.sleep(0.02)
+    kept = service.refresh()
+    assert kept["source"] == "crypto.com_exchange"
+    assert kept["age_seconds"] >= 0.02
+    metrics = service.metrics()
+    assert metrics["refreshes"] == 1
+    assert metrics["refresh_errors"] == 1
+    assert metrics["last_error"] == "exchange down"
+
+
+def test_missing_client_is_a_refresh_error_not_a_snapshot(exchange):
+    service = cdc.CDCPriceService()
+    service.initialized = False
+    assert service.refresh() is None
+    assert service.snapshot() is None
+    assert service.refresh_errors == 1
+
+
+def test_read_falls_back_to_simulated_without_publishing(exchange):
+    service = cdc.CDCPriceService(refresh_interval=60, max_age=0.01)
+    service.refresh()
+    exchange.fail = True
+    time.sleep(0.02)
+
+    price = service.get_cro_price()
+    assert price["source"] == "crypto.com_simulated"
+    assert service.snapshot()["source"] == "crypto.com_exchange"
+    assert service.snapshot()["age_seconds"] >= 0.02
+
+
+def test_stale_read_refetches_inline(exchange):
+    service = cdc.CDCPriceService(refresh_interval=60, max_age=60)
+    first = service.get_cro_price()
+    assert first["source"] == "crypto.com_exchange"
+    assert service.get_cro_price()["source"] == "crypto.com_exchange"
+    assert exchange.calls == 1
+
+    time.sleep(0.02)
+    assert service.get_cro_price(max_age=0.01)["age_seconds"] < 0.01
+    assert exchange.calls == 2
+
+
+def test_refresher_starts_and_stops(exchange):
+    service = cdc.CDCPriceService()
+    service.start_refresher(interval=0.01)
+    try:
+        deadline = time.time() + 2
+        while service.refreshes < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert service.refreshing
+        assert service.refreshes >= 2
+    finally:
+        service.stop_refresher()
+    assert not service.refreshing
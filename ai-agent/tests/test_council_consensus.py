@@ -0,0 +1,63 @@
+import pytest
+
+pytest.importorskip("crypto_com_agent_client")
+
+from agents.multi_agent_council import MultiAgentCouncil
+
+
+def vote(kind, confidence=1.0, weight=1.0):
+    return {"agent": kind, "vote": kind, "confidence": confidence, "weight": weight}
+
+
+@pytest.fixture
+def council():
+    # the consensus math needs no agents, config or network
+    return MultiAgentCouncil.__new__(MultiAgentCouncil)
+
+
+def test_consensus_is_confidence_and_weight_weighted(council):
+    result = council._calculate_consensus([vote("strong_buy", 1.0, 2.0), vote("sell", 0.5), vote("sell", 0.5)])
+    assert result["weighted_score"] == pytest.approx((5 * 2 + 2 * 0.5 + 2 * 0.5) / 3)
+    assert result["decision"] == "buy"
+    assert result["agreement"] == "2/3 agents agree"
+    assert result["confidence"] == pytest.approx(2 / 3)
+
+
+def test_consensus_with_zero_confidence_is_a_plain_average(council):
+    result = council._calculate_consensus([vote("strong_sell", 0.0), vote("buy", 0.0)])
+    assert result["weighted_score"] == 2.5
+    assert result["decision"] == "hold"
+
+
+def test_decided_early_only_when_outstanding_votes_cannot_change_the_bucket(council):
+    votes = [vote("strong_buy"), vote("strong_buy")]
+    assert council._decided_early(votes, remaining_weight=0) == "strong_buy"
+    # one more full-weight strong_sell would drag 5.0 down to 3.67 (buy)
+    assert council._decided_early(votes, remaining_weight=1) is None
+    assert council._decided_early([vote("hold")] * 4, remaining_weight=0.5) == "hold"
+    assert council._decided_early([vote("buy", 0.0)], remaining_weight=0) is None
+
+
+def test_decided_early_agrees_with_the_final_consensus(council):
+    votes = [vote("buy", 0.9), vote("buy", 0.8), vote("hold", 0.6)]
+    early = council._decided_early(votes[:2], remaining_weight=0.2)
+    assert early == "buy"
+    for outstanding in ("strong_sell", "strong_buy"):
+        final = council._calculate_consensus(votes[:2] + [vote(outstanding, 0.2)])
+        assert final["decision"] == early
+
+
+def test_parse_vote(council):
+    parsed = council._parse_vote("VOTE: BUY\nCONFIDENCE: 1.7\nREASONING: momentum")
+    assert parsed == {"vote": "buy", "confidence": 1.0, "reasoning": "momentum", "parsed": True}
+    assert council._parse_vote("VOTE: moon\nCONFIDENCE: high")["parsed"] is False
+    assert council._parse_vote("I think buy")["vote"] == "hold"
+
+
+def test_skipped_members_count_toward_agreement_but_not_the_math(council):
+    skipped = dict(vote("hold", 0.0), skipped=True)
+    result = council._calculate_consensus([vote("buy", 0.8), vote("buy", 0.6), skipped])
+    assert result["decision"] == "buy"
+    assert result["weighted_score"] == 4
+    assert result["confidence"] == pytest.approx(0.7)
+    assert result["agreement"] == "2/3 agents agree (1 skipped)"
@@ -0,0 +1,52 @@
+import pytest
+
+from agents.council_telemetry import CouncilTelemetry, estimate_cost, estimate_tokens
+from monitoring.resilience import percentile
+
+
+def test_percentile():
+    assert percentile([], 95) == 0.0
+    assert percentile([3.0], 50) == 3.0
+    assert percentile(list(range(1, 101)), 50) == 51
+    assert percentile(list(range(1, 101)), 95) == 95
+    assert percentile([5, 1, 3], 100) == 5
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
+
+
+def test_pricing_is_read_once_at_construction(monkeypatch):
+    monkeypatch.setenv("COUNCIL_PRICE_INPUT_PER_M", "1.0")
+    monkeypatch.setenv("COUNCIL_PRICE_OUTPUT_PER_M", "2.0")
+    telemetry = CouncilTelemetry(model="gemini-2.5-flash", window=10)
+    monkeypatch.setenv("COUNCIL_PRICE_INPUT_PER_M", "100.0")
+
+    call = telemetry.record_call("Risk Manager", 0.5, "x" * 4_000_000, "y" * 4_000_000)
+    assert call["prompt_tokens"] == call["response_tokens"] == 1_000_000
+    assert call["cost_usd"] == pytest.approx(3.0)
+
+
+def test_unknown_model_priced_like_flash():
+    assert estimate_cost("some-new-model", 1_000_000, 0) == estimate_cost("gemini-2.5-flash", 1_000_000, 0)
+
+
+def test_metrics_and_session_summary():
+    telemetry = CouncilTelemetry(window=10)
+    telemetry.record_call("A", 1.0, "p" * 40, "r" * 8)
+    telemetry.record_call("A", 3.0, "p" * 40, "not json", parsed=False)
+    telemetry.record_timeout("B")
+    telemetry.record_session(2.0)
+
+    metrics = telemetry.get_metrics()
+    assert metrics["sessions"] == 1
+    assert metrics["agents"]["A"]["calls"] == 2
+    assert metrics["agents"]["A"]["parse_failures"] == 1
+    assert metrics["agents"]["A"]["p95_seconds"] == 3.0
+    assert metrics["agents"]["B"]["timeouts"] == 1
+
+    votes = [{"agent": "A", "latency_seconds": 1.0, "prompt_tokens": 10, "response_tokens": 2, "cost_usd": 0.1}]
+    summary = telemetry.session_summary(votes, 2.0)
+    assert summary["calls"] == 1 and summary["prompt_tokens"] == 10 and summary["agents"] == {"A": 1.0}
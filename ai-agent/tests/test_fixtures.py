@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+pytest.importorskip("google.generativeai")
+
+from monitoring import fixtures
+from monitoring.sentiment_aggregator import SentimentAggregator
+
+
+def test_cold_benchmark_leaves_real_caches_and_env_alone(tmp_path, monkeypatch):
+    real_files = {
+        "GEMINI_CACHE_PATH": tmp_path / "gemini_headline_cache.json",
+        "GEMINI_ITEM_CACHE_PATH": tmp_path / "gemini_item_cache.json",
+        "GEMINI_TRAINING_LOG": tmp_path / "gemini_headline_scores.jsonl",
+        "GEMINI_ITEM_TRAINING_LOG": tmp_path / "gemini_item_scores.jsonl",
+    }
+    real_files["GEMINI_CACHE_PATH"].write_text('{"kept": {"result": {}, "latency": 1.0, "stored_at": 1e12}}')
+    real_files["GEMINI_ITEM_CACHE_PATH"].write_text("{}")
+    real_files["GEMINI_TRAINING_LOG"].write_text('{"headlines": ["real"], "score": 0.5, "ts": 0}\n')
+    real_files["GEMINI_ITEM_TRAINING_LOG"].write_text('{"headlines": ["real"], "score": 0.5, "ts": 0}\n')
+    before = {name: path.read_text() for name, path in real_files.items()}
+
+    monkeypatch.setenv("SENTIMENT_FIXTURE_MODE", "replay")
+    monkeypatch.setenv("SENTIMENT_FIXTURE_DIR", str(tmp_path / "fixtures"))
+    monkeypatch.setenv("GEMINI_CACHE_TTL", "3600")
+    monkeypatch.delenv("GEMINI_ITEM_CACHE_TTL", raising=False)
+
+    created = []
+
+    def fake_cycle(self, coin_id="crypto-com-chain"):
+        # What a replayed Gemini answer does: cache it and log it as a training label
+        created.append(self)
+        self.real_sentiment.gemini_cache.put("replayed", {"score": 0.1}, latency=0.2)
+        self.real_sentiment.item_scorer.cache.put("item", {"score": 0.1}, latency=0.2)
+        self.real_sentiment.local_classifier.log_label(["fixture headline"], 0.1)
+        self.real_sentiment.item_classifier.log_label(["fixture headline"], 0.1)
+        return {"signal": "hold"}
+
+    monkeypatch.setattr(SentimentAggregator, "aggregate_sentiment", fake_cycle)
+
+    result = fixtures.benchmark(cycles=2)
+
+    assert result["cycles"] == 2
+    assert {name: path.read_text() for name, path in real_files.items()} == before
+    assert os.environ["GEMINI_CACHE_TTL"] == "3600"
+    assert "GEMINI_ITEM_CACHE_TTL" not in os.environ
+    for name, path in real_files.items():
+        assert os.environ[name] == str(path)
+    # Every aggregator the benchmark built has released its pools
+    assert created and all(agg._executor._shutdown for agg in created)
+
+
+def test_cold_cycles_start_with_fresh_breakers(monkeypatch):
+    from monitoring.resilience import get_resilience
+
+    monkeypatch.setenv("SENTIMENT_FIXTURE_MODE", "replay")
+    seen = []
+
+    def fake_cycle(self, coin_id="crypto-com-chain"):
+        seen.append(get_resilience().snapshot())
+        get_resilience().source("gemini").record(3.0, ok=False, timed_out=True)
+        return {"signal": "hold"}
+
+    monkeypatch.setattr(SentimentAggregator, "aggregate_sentiment", fake_cycle)
+    fixtures.benchmark(cycles=3)
+    assert seen == [{}, {}, {}]
+
+
+def test_record_bypasses_real_llm_caches(tmp_path, monkeypatch):
+    monkeypatch.setenv("SENTIMENT_FIXTURE_MODE", "off")
+    monkeypatch.setenv("SENTIMENT_FIXTURE_DIR", str(tmp_path / "fixtures"))
+    monkeypatch.setenv("GEMINI_CACHE_TTL", "3600")
+    monkeypatch.setattr("sys.argv", ["fixtures", "record", "--cycles", "1"])
+    seen = {}
+
+    def fake_cycle(self, coin_id="crypto-com-chain"):
+        seen.update({name: os.environ.get(name) for name in ("GEMINI_CACHE_TTL", "GEMINI_CACHE_PATH")})
+        return {"signal": "hold"}
+
+    monkeypatch.setattr(SentimentAggregator, "aggregate_sentiment", fake_cycle)
+    fixtures.main()
+    assert seen["GEMINI_CACHE_TTL"] == "0"
+    assert seen["GEMINI_CACHE_PATH"] != os.path.join(str(tmp_path), "gemini_headline_cache.json")
+    assert "sentiment-bench-" in seen["GEMINI_CACHE_PATH"]
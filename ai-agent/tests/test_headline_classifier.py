@@ -0,0 +1,59 @@
+from monitoring.headline_classifier import NEWS_LEXICON, HeadlineClassifier, _tokens
+
+
+def test_trailing_punctuation_is_not_part_of_a_token():
+    assert _tokens("CRO surges. Rally ends...") == ["cro", "surges", "rally", "ends"]
+
+
+def test_decimals_and_tickers_survive():
+    assert _tokens("$CRO hits 0.085, v2.5 live") == ["$cro", "hits", "0.085", "v2.5", "live"]
+
+
+def test_sentence_final_lexicon_words_score():
+    word = next(w for w, weight in NEWS_LEXICON.items() if weight > 0 and " " not in w)
+    classifier = HeadlineClassifier()
+    assert classifier._lexicon_score(f"Cronos {word}.") == classifier._lexicon_score(f"Cronos {word}") > 0
+
+
+def log_labels(classifier, count, offset=0):
+    for i in range(count):
+        polarity = 1 if i % 2 else -1
+        classifier.log_label([f"Cronos {'surges' if polarity > 0 else 'crashes'} on story {i + offset}"], 0.5 * polarity)
+
+
+def test_primal_fit_matches_the_dual_solution(tmp_path):
+    import numpy as np
+    from monitoring.headline_classifier import RIDGE_LAMBDA
+
+    classifier = HeadlineClassifier(str(tmp_path / "labels.jsonl"))
+    log_labels(classifier, 30)
+    assert classifier.train()
+
+    samples = classifier._load_samples()
+    X = np.array([classifier._features(s["headlines"]) for s in samples])
+    y = np.array([s["score"] for s in samples])
+    dual = X.T @ np.linalg.solve(X @ X.T + RIDGE_LAMBDA * np.eye(len(y)), y - y.mean())
+    assert np.allclose(classifier.weights, dual)
+    assert classifier.predict(["Cronos surges"])["sentiment_score"] > 0 > classifier.predict(["Cronos crashes"])["sentiment_score"]
+
+
+def test_fit_uses_a_rolling_window_and_compacts_the_log(tmp_path):
+    path = tmp_path / "labels.jsonl"
+    classifier = HeadlineClassifier(str(path), window=25)
+    log_labels(classifier, 60)
+    assert classifier.train()
+    assert classifier.trained_on == 25
+    assert len(path.read_text().splitlines()) == 25
+    assert not classifier.train()            # nothing new since the last fit
+    log_labels(classifier, 10, offset=60)
+    assert classifier.train()
+
+
+def test_background_training(tmp_path):
+    classifier = HeadlineClassifier(str(tmp_path / "labels.jsonl"))
+    assert not classifier.train_async()
+    log_labels(classifier, 30)
+    assert classifier.train_async()
+    classifier._trainer.join(5)
+    assert classifier.trained_on == 30
+    assert not classifier.train_async()
@@ -0,0 +1,49 @@
+import json
+import time
+
+from monitoring.llm_cache import LLMResultCache, content_key
+
+
+def test_content_key_ignores_case_whitespace_duplicates_and_order():
+    key = content_key(["CRO rallies  ", "ETF approved"])
+    assert content_key(["etf   approved", "cro rallies", "CRO Rallies", ""]) == key
+    assert content_key(["cro rallies"]) != key
+
+
+def test_hit_miss_and_latency_saved(tmp_path):
+    cache = LLMResultCache(str(tmp_path / "cache.json"), ttl=60)
+    assert cache.get("k") is None
+    cache.put("k", {"score": 0.4}, latency=1.25)
+    assert cache.get("k") == {"score": 0.4}
+    assert cache.metrics() == {"hits": 1, "misses": 1, "hit_rate": 0.5,
+                               "latency_saved_seconds": 1.25, "entries": 1}
+
+
+def test_entries_expire_after_ttl(tmp_path):
+    cache = LLMResultCache(str(tmp_path / "cache.json"), ttl=0.05)
+    cache.put("k", {"score": 1}, latency=1)
+    time.sleep(0.06)
+    assert cache.get("k") is None
+    assert cache.metrics()["entries"] == 0
+
+
+def test_results_survive_a_restart(tmp_path):
+    path = str(tmp_path / "cache.json")
+    LLMResultCache(path, ttl=60).put_many({"a": {"score": 1}, "b": {"score": 2}}, latency=2)
+    reloaded = LLMResultCache(path, ttl=60)
+    assert reloaded.get("b") == {"score": 2}
+
+
+def test_put_many_prunes_expired_entries(tmp_path):
+    path = tmp_path / "cache.json"
+    cache = LLMResultCache(str(path), ttl=0.05)
+    cache.put("old", {"score": 1}, latency=1)
+    time.sleep(0.06)
+    cache.put("new", {"score": 2}, latency=1)
+    assert list(json.loads(path.read_text())) == ["new"]
+
+
+def test_corrupt_file_starts_empty(tmp_path):
+    path = tmp_path / "cache.json"
+    path.write_text("{broken")
+    assert LLMResultCache(str(path), ttl=60).get("k") is None
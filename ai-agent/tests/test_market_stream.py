@@ -0,0 +1,146 @@
+"""Stream client against the local stand-in server (services/mock_market_stream.py)"""
+import time
+
+import pytest
+
+pytest.importorskip("websockets")
+
+from services import market_stream
+from services.market_stream import MarketStream
+from services.mock_market_stream import MockMarketStream
+from services.response_cache import ResponseCache
+from services.ticker_cache import TickerCache
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.fixture
+def server():
+    mock = MockMarketStream(interval=0.05, heartbeat_interval=0.2)
+    mock.start()
+    yield mock
+    mock.stop()
+
+
+@pytest.fixture
+def stream_factory(monkeypatch):
+    monkeypatch.setenv("MARKET_STREAM_CONNECT_DELAY", "0")
+    streams = []
+
+    def make(url, instruments=("CRO_USDT",), max_age=5.0):
+        stream = MarketStream(url, instruments, max_age=max_age).start()
+        streams.append(stream)
+        monkeypatch.setattr(market_stream, "_market_stream", stream)
+        return stream
+
+    yield make
+    for stream in streams:
+        stream.stop()
+
+
+def test_subscribe_heartbeat_and_ticker_state(server, stream_factory):
+    stream = stream_factory(server.url)
+    assert stream.wait_ready(timeout=5)
+
+    data = stream.ticker_data("cro-usdt")
+    assert data["lastPrice"] > 0
+    assert data["bestBid"] < data["bestAsk"]
+    assert data["age_seconds"] < 1
+    assert stream.get("CRO_USDT")["last_trade"]["side"] in ("BUY", "SELL")
+
+    assert wait_for(lambda: server.heartbeat_responses >= 1)
+    assert stream.heartbeats >= 1
+
+
+def test_late_subscribe_and_stop(server, stream_factory):
+    stream = stream_factory(server.url)
+    assert stream.wait_ready(timeout=5)
+    assert stream.get("BTC_USDT") is None
+
+    stream.subscribe(["btc_usdt"])
+    assert stream.wait_ready(["BTC_USDT"], timeout=5)
+
+    stream.stop()
+    assert not stream.running
+    assert market_stream.live_market_stream() is None
+
+
+def test_subscription_cap(server, stream_factory, monkeypatch):
+    monkeypatch.setenv("MARKET_STREAM_MAX_INSTRUMENTS", "2")
+    stream = stream_factory(server.url)
+    stream.subscribe(["BTC_USDT", "ETH_USDT", "DOGE_USDT"])
+    assert stream.instruments == {"CRO_USDT", "BTC_USDT"}
+
+
+def test_subscribe_replaces_the_instrument_set(server, stream_factory):
+    stream = stream_factory(server.url)
+    before = stream.instruments
+    stream.subscribe(["BTC_USDT"])
+    assert before == {"CRO_USDT"}           # a reader's snapshot never changes under it
+    assert stream.instruments == {"CRO_USDT", "BTC_USDT"}
+
+
+def test_reconnects_and_resubscribes(server, stream_factory):
+    stream = stream_factory(server.url)
+    assert stream.wait_ready(timeout=5)
+    port = server.port
+
+    server.stop()
+    assert wait_for(lambda: not stream.connected)
+
+    replacement = MockMarketStream(port=port, interval=0.05)
+    replacement.start()
+    try:
+        before = stream.messages
+        assert wait_for(lambda: stream.connected and stream.messages > before, timeout=8)
+        assert stream.reconnects >= 1
+        assert replacement.connections == 1
+    finally:
+        replacement.stop()
+
+
+def test_stale_state_falls_back_to_rest(server, stream_factory):
+    stream = stream_factory(server.url, max_age=0.3)
+    assert stream.wait_ready(timeout=5)
+
+    rest_calls = []
+
+    def rest(instrument):
+        rest_calls.append(instrument)
+        return {"data": {"lastPrice": "0.07", "instrumentName": instrument}}
+
+    cache = TickerCache(cache=ResponseCache(), fetch=rest, ttl=10, stale_ttl=0)
+    assert cache.get_ticker("CRO_USDT")["freshness"]["source"] == "stream"
+
+    server.stop()
+    assert wait_for(lambda: stream.get("CRO_USDT") is None, timeout=3)
+    fallback = cache.get_ticker("CRO_USDT")
+    assert fallback["freshness"]["source"] == "live"
+    assert rest_calls == ["CRO_USDT"]
+
+
+def test_only_real_tickers_are_added_to_the_stream(server, stream_factory):
+    stream = stream_factory(server.url)
+    assert stream.wait_ready(timeout=5)
+
+    def rest(instrument):
+        if instrument == "TYPO_USDT":
+            raise RuntimeError("instrument not found")
+        return {"data": {"lastPrice": "62000", "instrumentName": instrument}}
+
+    cache = TickerCache(cache=ResponseCache(), fetch=rest, ttl=10, stale_ttl=0)
+    with pytest.raises(RuntimeError):
+        cache.get_ticker("TYPO_USDT")
+    assert "TYPO_USDT" not in stream.instruments
+
+    cache.get_ticker("BTC_USDT")
+    assert "BTC_USDT" in stream.instruments
+    assert stream.wait_ready(["BTC_USDT"], timeout=5)
+    assert cache.get_ticker("BTC_USDT")["freshness"]["source"] == "stream"
@@ -0,0 +1,231 @@
+import json
+
+import pytest
+
+pytest.importorskip("crypto_com_agent_client")
+
+from agents import council_ab
+from agents.multi_agent_council import BUILTIN_PERSONAS, MultiAgentCouncil, load_agent_registry
+
+SIGNAL = {"signal": "weak_buy", "avg_sentiment": 0.42, "strength": 2, "is_trending": False}
+MARKET = {"signal": "weak_buy", "sentiment_score": 0.42, "strength": 2}
+
+
+@pytest.fixture
+def council_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("COUNCIL_AGENTS_FILE", str(tmp_path / "no_registry.json"))
+    monkeypatch.setenv("COUNCIL_EAGER_INIT", "false")
+    monkeypatch.setenv("COUNCIL_CACHE_ENABLED", "true")
+    monkeypatch.setenv("COUNCIL_VOTING_MODE", "multi_call")
+    return tmp_path
+
+
+def canned_votes(council, roster, vote="buy"):
+    return [
+        {"agent": name, "vote": vote, "confidence": 0.8, "reasoning": "r", "weight": council._weight(key)}
+        for key, _, name in roster
+    ]
+
+
+def stub_collectors(council, monkeypatch, prompts):
+    def collect_votes(roster, prompt, deadline):
+        prompts.append(("multi_call", prompt))
+        return canned_votes(council, roster, "buy"), [], []
+
+    def collect_panel(roster, market_block, deadline):
+        prompts.append(("single_call", market_block))
+        return canned_votes(council, roster, "sell"), [], None
+
+    monkeypatch.setattr(council, "_collect_votes", collect_votes)
+    monkeypatch.setattr(council, "_collect_panel_votes", collect_panel)
+
+
+def test_cached_decision_is_not_shared_across_voting_modes(council_env, monkeypatch):
+    council = MultiAgentCouncil()
+    prompts = []
+    stub_collectors(council, monkeypatch, prompts)
+
+    multi = council.vote_on_trade(MARKET, SIGNAL)
+    single = council.vote_on_trade(MARKET, SIGNAL, voting_mode="single_call")
+    assert not single["cached"]
+    assert (multi["consensus"], single["consensus"]) == ("buy", "sell")
+
+    again = council.vote_on_trade(MARKET, SIGNAL, voting_mode="single_call")
+    assert again["cached"] and again["consensus"] == "sell"
+    assert len(prompts) == 2
+
+
+def test_ab_gives_both_modes_the_same_context_and_time(council_env, monkeypatch):
+    monkeypatch.setenv("COUNCIL_CONTEXT_MODE", "snapshot")
+    fetches = []
+
+    def price():
+        fetches.append(1)
+        return {"price": 0.08 + len(fetches) / 1000}
+
+    council = MultiAgentCouncil(context_sources={"cro_price": price})
+    prompts = []
+    stub_collectors(council, monkeypatch, prompts)
+
+    report = council_ab.compare_voting_modes([SIGNAL, dict(SIGNAL, avg_sentiment=-0.5)], council)
+
+    assert report["inputs"] == 2
+    assert len(fetches) == 2                     # once per input, not once per mode
+    by_input = [dict(prompts[0:2]), dict(prompts[2:4])]
+    for sessions in by_input:
+        assert sessions["multi_call"].startswith(sessions["single_call"])
+        assert "CONTEXT SNAPSHOT" in sessions["single_call"]
+
+
+def test_registry_without_builtin_personas(tmp_path):
+    path = tmp_path / "agents.json"
+    path.write_text(json.dumps({"agents": [
+        {"key": "quant", "name": "Quant", "instructions": ["Use numbers."], "weight": 2},
+        {"persona": "risk_manager", "weight": 1.5},
+        {"key": "off", "name": "Off", "instructions": "x", "enabled": False},
+        {"key": "bad", "name": "Bad", "instructions": "x", "weight": 0},
+        {"key": "quant", "name": "Duplicate", "instructions": "x"},
+        {"name": "No key"},
+    ]}))
+    registry = load_agent_registry(str(path))
+    assert list(registry) == ["quant", "risk_manager"]
+    assert registry["quant"]["weight"] == 2.0
+    assert registry["quant"]["instructions"] == "Use numbers."
+    assert registry["risk_manager"]["weight"] == 1.5
+
+
+def test_registry_falls_back_to_builtins(tmp_path):
+    assert list(load_agent_registry(str(tmp_path / "missing.json"))) == list(BUILTIN_PERSONAS)
+    broken = tmp_path / "broken.json"
+    broken.write_text("{not json")
+    assert list(load_agent_registry(str(broken))) == list(BUILTIN_PERSONAS)
+    empty = tmp_path / "empty.json"
+    empty.write_text(json.dumps({"agents": [{"key": "x", "name": "X", "instructions": "i", "enabled": False}]}))
+    assert list(load_agent_registry(str(empty))) == list(BUILTIN_PERSONAS)
+
+
+def test_council_without_builtin_personas(council_env, monkeypatch):
+    import crypto_com_agent_client
+
+    registry = load_agent_registry(str(council_env / "missing.json"))
+    registry = {"quant": dict(registry["market_analyst"], key="quant", model="gemini-2.5-pro")}
+    monkeypatch.setenv("COUNCIL_PANEL_MODEL", "gemini-2.0-flash")
+    council = MultiAgentCouncil(registry=registry)
+
+    assert not hasattr(council, "risk_manager")
+    with pytest.raises(KeyError, match="not a council member"):
+        council._get_agent("risk_manager")
+
+    models = []
+    monkeypatch.setattr(crypto_com_agent_client.Agent, "init",
+                        staticmethod(lambda llm_config, **kwargs: models.append(llm_config["model"]) or object()))
+    council._get_agent("quant")
+    council._get_agent("panel")
+    assert models == ["gemini-2.5-pro", "gemini-2.0-flash"]
+
+
+def test_parse_panel_votes(council_env):
+    council = MultiAgentCouncil()
+    reply = """```json
+    {"votes": [
+        {"member": "Risk Manager", "vote": "SELL", "confidence": 1.4, "reasoning": "drawdown"},
+        {"member": "market_analyst", "vote": "buy", "confidence": -1},
+        {"member": "sentiment_specialist", "vote": "moon", "confidence": 0.9},
+        {"vote": "hold"},
+        {"member": "quant", "vote": "hold", "confidence": "n/a"}
+    ]}
+    ```"""
+    replies = council._parse_panel_votes(reply)
+    assert set(replies) == {"risk_manager", "market_analyst"}
+    assert replies["risk_manager"]["vote"] == "sell"
+    assert replies["risk_manager"]["confidence"] == 1.0
+    assert replies["market_analyst"]["confidence"] == 0.0
+    assert replies["market_analyst"]["reasoning"] == "No reasoning provided"
+
+
+def test_parse_panel_votes_rejects_garbage(council_env):
+    council = MultiAgentCouncil()
+    assert council._parse_panel_votes("no json here") == {}
+    assert council._parse_panel_votes('{"votes": "buy"}') == {}
+    assert council._parse_panel_votes("[1, 2]") == {}
+
+
+def test_council_deadline_includes_context_gathering(council_env, monkeypatch):
+    import time
+
+    monkeypatch.setenv("COUNCIL_CONTEXT_MODE", "snapshot")
+    monkeypatch.setenv("COUNCIL_DEADLINE", "1")
+    council = MultiAgentCouncil(context_sources={"cro_price": lambda: time.sleep(0.3) or {"price": 0.08}})
+    remaining = []
+
+    def collect_votes(roster, prompt, deadline):
+        remaining.append(deadline - time.monotonic())
+        return canned_votes(council, roster), [], []
+
+    monkeypatch.setattr(council, "_collect_votes", collect_votes)
+    council.vote_on_trade(MARKET, SIGNAL)
+    assert remaining and remaining[0] < 0.75
+
+
+def test_failed_panel_call_counts_as_timed_out(council_env, monkeypatch):
+    class FailingAgent:
+        def interact(self, prompt):
+            raise RuntimeError("quota exceeded")
+
+    council = MultiAgentCouncil()
+    monkeypatch.setattr(council, "_get_agent", lambda key: FailingAgent())
+    result = council.vote_on_trade(MARKET, SIGNAL, voting_mode="single_call")
+
+    assert len(result["timed_out_agents"]) == len(result["votes"]) == len(council.registry)
+    assert all(v["reasoning"] == "Panel call failed" for v in result["votes"])
+
+
+def test_early_decision_keeps_one_vote_per_member(council_env, monkeypatch):
+    import time
+
+    registry = load_agent_registry(str(council_env / "missing.json"))
+    slow_key = list(registry)[-1]
+    registry[slow_key] = dict(registry[slow_key], weight=0.2)
+    council = MultiAgentCouncil(registry=registry)
+    slow_name = f"{registry[slow_key]['emoji']} {registry[slow_key]['name']}"
+
+    def get_vote(agent, prompt, agent_name):
+        if agent_name == slow_name:
+            time.sleep(1)
+        return {"agent": agent_name, "vote": "hold", "confidence": 1.0, "reasoning": "r"}
+
+    monkeypatch.setattr(council, "_get_agent_vote", get_vote)
+    result = council.vote_on_trade(MARKET, SIGNAL)
+
+    assert result["skipped_agents"] == [slow_name]
+    assert [v["agent"] for v in result["votes"]] == [
+        f"{spec['emoji']} {spec['name']}" for spec in registry.values()
+    ]
+    assert result["votes"][-1]["skipped"]
+    assert result["agreement"] == "2/3 agents agree (1 skipped)"
+    assert result["confidence"] == 1.0
+
+
+def test_ab_hears_every_member_and_pairs_votes_by_agent(council_env, monkeypatch):
+    council = MultiAgentCouncil()
+    roster = [(key, spec['name'], f"{spec['emoji']} {spec['name']}") for key, spec in council.registry.items()]
+    seen_early_decision = []
+
+    def collect_votes(roster_arg, prompt, deadline):
+        seen_early_decision.append(council.early_decision)
+        votes = canned_votes(council, roster, "buy")
+        votes[0]["vote"] = "sell"
+        return votes, [], []
+
+    def collect_panel(roster_arg, market_block, deadline):
+        # Same votes, different order: pairing must go by agent, not by position
+        votes = canned_votes(council, roster, "buy")
+        votes[0]["vote"] = "sell"
+        return list(reversed(votes)), [], None
+
+    monkeypatch.setattr(council, "_collect_votes", collect_votes)
+    monkeypatch.setattr(council, "_collect_panel_votes", collect_panel)
+    report = council_ab.compare_voting_modes([SIGNAL], council)
+
+    assert seen_early_decision == [False]
+    assert report["per_agent_vote_agreement"] == 1.0
@@ -0,0 +1,93 @@
+import threading
+
+import pytest
+
+from monitoring.resilience import CircuitOpenError, ResilienceRegistry, SourceHealth, _is_timeout
+
+
+def open_breaker(health):
+    for _ in range(health.failure_threshold):
+        assert health.allow()
+        health.record(0.01, ok=False)
+    assert health.state == "open"
+
+
+def test_half_open_lets_one_probe_through():
+    health = SourceHealth("test", cooldown=0.0)
+    open_breaker(health)
+
+    assert health.allow()          # the probe
+    assert not health.allow()      # concurrent callers wait for it
+    assert not health.allow()
+    assert health.state == "half_open"
+
+    health.record(0.1, ok=True)
+    assert health.state == "closed"
+    assert health.allow() and health.allow()
+
+
+def test_failed_probe_reopens_the_breaker():
+    health = SourceHealth("test", cooldown=0.0)
+    open_breaker(health)
+    assert health.allow()
+    health.record(0.1, ok=False)
+    assert health.state == "open"
+    assert health.allow()          # next probe after the (zero) cooldown
+
+
+def test_parallel_callers_send_a_single_probe():
+    registry = ResilienceRegistry()
+    health = registry.source("reddit")
+    health.cooldown = 0.0
+    open_breaker(health)
+
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def probe(timeout):
+        calls.append(timeout)
+        started.set()
+        release.wait(5)
+        return "ok"
+
+    worker = threading.Thread(target=registry.call, args=("reddit", probe))
+    worker.start()
+    started.wait(5)
+    for _ in range(3):
+        with pytest.raises(CircuitOpenError):
+            registry.call("reddit", probe)
+    release.set()
+    worker.join(5)
+    assert len(calls) == 1
+    assert health.state == "closed"
+
+
+def test_fast_errors_do_not_shrink_the_adaptive_timeout():
+    health = SourceHealth("test", default_timeout=10.0, min_timeout=1.0, max_timeout=30.0,
+                          failure_threshold=100, min_samples=5)
+    for _ in range(5):
+        health.record(4.0, ok=True)
+    before = health.adaptive_timeout()
+    for _ in range(50):
+        health.record(0.01, ok=False)   # e.g. instant 429s
+    assert health.adaptive_timeout() == before == 8.0
+
+    health.record(20.0, ok=False, timed_out=True)
+    assert 20.0 in health.latencies
+
+
+def test_deadline_exceeded_is_a_timeout():
+    class GoogleAPICallError(Exception):
+        pass
+
+    class DeadlineExceeded(GoogleAPICallError):
+        pass
+
+    class Vague(DeadlineExceeded):
+        pass
+
+    assert _is_timeout(DeadlineExceeded("504 Deadline Exceeded"))
+    assert _is_timeout(Vague("upstream"))
+    assert _is_timeout(TimeoutError())
+    assert not _is_timeout(ValueError("bad json"))
@@ -0,0 +1,129 @@
+import threading
+import time
+
+import pytest
+
+from services.response_cache import ResponseCache
+
+
+class Counter:
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+        self.fail = False
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return self.calls
+
+
+def test_fresh_values_are_served_from_cache():
+    cache, fetch = ResponseCache(), Counter()
+    assert cache.get("k", fetch, ttl=10) == 1
+    assert cache.get("k", fetch, ttl=10) == 1
+    assert fetch.calls == 1
+    assert cache.stats("default") == {"misses": 1, "hits": 1, "hit_rate": 0.5}
+
+
+def test_concurrent_misses_share_one_fetch():
+    cache, fetch = ResponseCache(), Counter(delay=0.1)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("k", fetch, ttl=10, namespace="ns")))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [1] * 5
+    assert fetch.calls == 1
+    stats = cache.stats("ns")
+    assert stats["misses"] == 5 and stats["coalesced"] == 4
+
+
+def test_coalesced_callers_all_see_the_error():
+    cache, fetch = ResponseCache(), Counter(delay=0.1)
+    fetch.fail = True
+    errors = []
+
+    def call():
+        try:
+            cache.get("k", fetch, ttl=10)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == ["upstream down"] * 3
+    assert fetch.calls == 1
+
+
+def test_stale_value_is_served_while_refreshed_in_background():
+    cache, fetch = ResponseCache(), Counter(delay=0.05)
+    cache.get("k", fetch, ttl=0.01, stale_ttl=10)
+    time.sleep(0.02)
+    assert cache.get("k", fetch, ttl=0.01, stale_ttl=10) == 1
+    deadline = time.time() + 2
+    while fetch.calls < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.1)
+    assert cache.get("k", fetch, ttl=10) == 2
+    assert cache.stats("default")["background_refreshes"] == 1
+
+
+def test_expired_value_is_served_on_error_but_never_invented():
+    cache, fetch = ResponseCache(), Counter()
+    cache.get("k", fetch, ttl=0.01)
+    time.sleep(0.02)
+    fetch.fail = True
+    assert cache.get("k", fetch, ttl=0.01) == 1
+    assert cache.stats("default")["stale_on_error"] == 1
+    with pytest.raises(RuntimeError):
+        cache.get("other", fetch, ttl=0.01)
+
+
+def test_invalidate():
+    cache, fetch = ResponseCache(), Counter()
+    cache.get("a", fetch, ttl=10)
+    cache.get("b", fetch, ttl=10)
+    cache.invalidate("a")
+    assert cache.get("a", fetch, ttl=10) == 3
+    cache.invalidate()
+    assert cache.get("b", fetch, ttl=10) == 4
+
+
+def test_burst_of_stale_hits_starts_one_refresh():
+    cache, fetch = ResponseCache(), Counter(delay=0.1)
+    cache.get("k", fetch, ttl=0.01, stale_ttl=10)
+    time.sleep(0.02)
+    threads = [threading.Thread(target=cache.get, args=("k", fetch), kwargs={"ttl": 0.01, "stale_ttl": 10})
+               for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    time.sleep(0.2)
+    assert fetch.calls == 2
+    assert cache.stats("default")["background_refreshes"] == 1
+
+
+def test_values_older_than_max_stale_are_not_served_on_error():
+    cache, fetch = ResponseCache(max_stale=0.05), Counter()
+    cache.get("k", fetch, ttl=0.01)
+    time.sleep(0.06)
+    fetch.fail = True
+    with pytest.raises(RuntimeError):
+        cache.get("k", fetch, ttl=0.01)
+
+
+def test_oldest_entries_are_evicted_past_max_entries():
+    cache, fetch = ResponseCache(max_entries=2), Counter()
+    for key in ("a", "b", "c"):
+        cache.get(key, fetch, ttl=10)
+    assert cache.get("b", fetch, ttl=10) == 2
+    assert cache.get("a", fetch, ttl=10) == 4
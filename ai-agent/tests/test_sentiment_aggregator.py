@@ -0,0 +1,112 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("google.generativeai")
+
+from monitoring.sentiment_aggregator import SentimentAggregator
+
+
+@pytest.fixture
+def aggregator(monkeypatch):
+    monkeypatch.setenv("SENTIMENT_ITEM_SCORING", "false")
+    agg = SentimentAggregator(
+        concurrent=True,
+        source_timeouts={name: 0.3 for name in ("real_news", "reddit", "coingecko", "trending")},
+        cycle_deadline=1.0,
+    )
+    yield agg
+    agg._executor.shutdown(wait=False)
+
+
+def test_hung_source_does_not_starve_the_next_cycle(aggregator, monkeypatch):
+    release = threading.Event()
+    calls = {"reddit": 0}
+
+    def hung_reddit():
+        calls["reddit"] += 1
+        release.wait(10)
+        return None
+
+    def reading(name):
+        return lambda: {"source": name, "sentiment_score": 0.5}
+
+    monkeypatch.setattr(aggregator, "_source_fetchers", lambda coin_id, batch=None: {
+        "real_news": reading("news"),
+        "reddit": hung_reddit,
+        "coingecko": reading("coingecko"),
+        "trending": lambda: {"source": "trending", "is_trending": False},
+    })
+
+    try:
+        for _ in range(2):
+            start = time.monotonic()
+            readings, timed_out = aggregator._collect_concurrent("crypto-com-chain")
+            assert time.monotonic() - start < 0.9
+            assert timed_out == ["reddit"]
+            assert readings["real_news"]["source"] == "news"
+            assert readings["coingecko"]["source"] == "coingecko"
+            assert readings["trending"] is not None
+        # The hung call was not resubmitted in the second cycle
+        assert calls["reddit"] == 1
+    finally:
+        release.set()
+
+    aggregator._inflight["reddit"].result(timeout=2)
+    readings, timed_out = aggregator._collect_concurrent("crypto-com-chain")
+    assert calls["reddit"] == 2
+    assert timed_out == []
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class FakeCoinGecko:
+    """Answers /coins/markets and /search/trending, counting requests"""
+
+    def __init__(self):
+        self.requests = []
+
+    def get(self, url, params=None, timeout=None):
+        self.requests.append(url)
+        if url.endswith("search/trending"):
+            return FakeResponse({"coins": [{"item": {"id": "vvs-finance"}}]})
+        return FakeResponse([
+            {"id": "crypto-com-chain", "symbol": "cro", "current_price": 0.1,
+             "price_change_percentage_24h_in_currency": 12.0,
+             "price_change_percentage_7d_in_currency": 25.0,
+             "total_volume": 10.0, "market_cap": 100.0},
+            {"id": "vvs-finance", "symbol": "vvs", "current_price": 0.01,
+             "price_change_percentage_24h_in_currency": -1.0,
+             "price_change_percentage_7d_in_currency": 0.0,
+             "total_volume": 0.0, "market_cap": 0.0},
+        ])
+
+
+def test_watchlist_is_labelled_momentum_and_counts_only_upstream_requests(aggregator):
+    from services.response_cache import ResponseCache
+
+    aggregator.http = FakeCoinGecko()
+    aggregator.response_cache = ResponseCache()
+
+    result = aggregator.aggregate_watchlist(["crypto-com-chain", "vvs-finance", "unknown-coin"])
+    assert result["basis"] == "price_momentum"
+    assert result["requests_made"] == len(aggregator.http.requests) == 2
+    assert result["missing"] == ["unknown-coin"]
+    cro, vvs = result["coins"]
+    assert cro["momentum_signal"] == "strong_buy" and cro["momentum_strength"] == 3
+    assert vvs["is_trending"] and vvs["momentum_signal"] == "hold"
+
+    # Served from the response cache: nothing reaches CoinGecko
+    again = aggregator.aggregate_watchlist(["crypto-com-chain", "vvs-finance", "unknown-coin"])
+    assert again["requests_made"] == 0
+    assert len(aggregator.http.requests) == 2
@@ -0,0 +1,54 @@
+from monitoring.sentiment_engine import SentimentEngine
+
+
+def build_result(readings, timed_out):
+    scores = [r["sentiment_score"] for r in readings.values()]
+    return {
+        "avg_sentiment": sum(scores) / len(scores) if scores else 0,
+        "sources": sorted(readings),
+        "timed_out_sources": sorted(timed_out),
+    }
+
+
+def make_engine():
+    fetchers = {"news": lambda: None, "reddit": lambda: None}
+    return SentimentEngine(fetchers, build_result, cadences={"news": 10, "reddit": 10}, half_life=60)
+
+
+def test_failed_poll_is_reported_but_fresh_reading_still_counts():
+    engine = make_engine()
+    engine._update("news", {"sentiment_score": 0.6})
+    engine._update("reddit", {"sentiment_score": -0.2})
+    engine._update("news", None)
+    snapshot = engine.snapshot()
+    assert snapshot["sources"] == ["news", "reddit"]
+    assert snapshot["timed_out_sources"] == ["news"]
+
+    engine._update("news", {"sentiment_score": 0.6})
+    assert engine.snapshot()["timed_out_sources"] == []
+
+
+def test_dead_source_stops_pinning_the_aggregate():
+    engine = make_engine()
+    engine._update("news", {"sentiment_score": 0.8})
+    engine._update("reddit", {"sentiment_score": 0.0})
+    assert engine.snapshot()["avg_sentiment"] == 0.4
+
+    engine._states["news"].updated_at -= 31     # older than three cadences
+    engine._update("reddit", {"sentiment_score": 0.0})
+    snapshot = engine.snapshot()
+    assert snapshot["sources"] == ["reddit"]
+    assert snapshot["avg_sentiment"] == 0.0
+    assert snapshot["timed_out_sources"] == ["news"]
+    assert snapshot["staleness"]["news"]["stale"]
+
+
+def test_stale_source_is_dropped_on_read_without_a_new_poll():
+    engine = make_engine()
+    engine._update("news", {"sentiment_score": 0.8})
+    engine._update("reddit", {"sentiment_score": 0.2})
+    for state in engine._states.values():
+        state.updated_at -= 31
+    snapshot = engine.snapshot()
+    assert snapshot["sources"] == []
+    assert snapshot["timed_out_sources"] == ["news", "reddit"]
@@ -0,0 +1,37 @@
+import random
+
+from monitoring.text_scoring import DEFAULT_LEXICON, KeywordMatcher
+
+
+def substring_boosts(lexicon, text):
+    """The original per-keyword `keyword in text` checks"""
+    bullish = max([w for k, w in lexicon["bullish"].items() if k in text], default=0.0)
+    bearish = max([w for k, w in lexicon["bearish"].items() if k in text], default=0.0)
+    return bullish, bearish
+
+
+OVERLAPPING = {
+    "bullish": {"moon": 0.2, "moonshot": 0.5, "pump": 0.3, "up": 0.1},
+    "bearish": {"shot": 0.4, "dump": 0.3, "pumpanddump": 0.6},
+}
+
+
+def test_overlapping_keywords_match_substring_logic():
+    matcher = KeywordMatcher(OVERLAPPING)
+    for text in ["moonshot", "dumpump", "pumpanddump soon", "shotmoon", "nothing here", "upup"]:
+        assert matcher.boosts(text) == substring_boosts(OVERLAPPING, text), text
+
+
+def test_random_texts_match_substring_logic():
+    rng = random.Random(3)
+    fragments = [k for side in OVERLAPPING.values() for k in side] + ["x", " ", "mo", "sh", "du"]
+    matcher = KeywordMatcher(OVERLAPPING)
+    for _ in range(500):
+        text = "".join(rng.choice(fragments) for _ in range(rng.randint(0, 8)))
+        assert matcher.boosts(text) == substring_boosts(OVERLAPPING, text), text
+
+
+def test_default_lexicon():
+    matcher = KeywordMatcher(DEFAULT_LEXICON)
+    for text in ["to the moon 🚀", "sell the fud, rugpull", "hodl and buy the dump", "meh"]:
+        assert matcher.boosts(text) == substring_boosts(DEFAULT_LEXICON, text), text
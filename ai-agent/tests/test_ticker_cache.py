@@ -0,0 +1,142 @@
+import threading
+import time
+
+import pytest
+
+from services.response_cache import ResponseCache
+from services.ticker_cache import TickerCache
+
+
+class FakeExchange:
+    def __init__(self, delay=0.0):
+        self.calls = []
+        self.delay = delay
+        self.fail = False
+
+    def __call__(self, instrument):
+        self.calls.append(instrument)
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("exchange down")
+        return {"data": {"lastPrice": 0.08 + len(self.calls) / 1000, "instrumentName": instrument}}
+
+
+def make_cache(fetch, ttl=0.05, stale_ttl=0.05):
+    return TickerCache(cache=ResponseCache(), fetch=fetch, ttl=ttl, stale_ttl=stale_ttl)
+
+
+def test_fresh_lookup_is_live_then_cached():
+    exchange = FakeExchange()
+    cache = make_cache(exchange, ttl=10)
+    assert cache.get_ticker("cro-usdt")["freshness"]["source"] == "live"
+    second = cache.get_ticker("CRO_USDT")
+    assert second["freshness"]["source"] == "cache"
+    assert exchange.calls == ["CRO_USDT"]
+
+
+def test_stale_hit_is_labelled_cache_even_while_refreshing():
+    exchange = FakeExchange(delay=0.02)
+    cache = make_cache(exchange, ttl=0.05, stale_ttl=5)
+    cache.get_ticker("CRO_USDT")
+    time.sleep(0.08)
+    stale = cache.get_ticker("CRO_USDT")     # starts a background refresh
+    assert stale["freshness"]["source"] == "cache"
+    assert stale["freshness"]["age_seconds"] >= 0.05
+    time.sleep(0.1)
+    assert len(exchange.calls) == 2
+
+
+def test_stale_on_error_is_labelled_cache():
+    exchange = FakeExchange()
+    cache = make_cache(exchange, ttl=0.02, stale_ttl=0.02)
+    first = cache.get_ticker("CRO_USDT")
+    time.sleep(0.06)
+    exchange.fail = True
+    fallback = cache.get_ticker("CRO_USDT")
+    assert fallback["freshness"]["source"] == "cache"
+    assert fallback["data"] == first["data"]
+
+
+def test_error_without_cached_value_raises():
+    exchange = FakeExchange()
+    exchange.fail = True
+    with pytest.raises(RuntimeError):
+        make_cache(exchange).get_ticker("CRO_USDT")
+
+
+def test_concurrent_lookups_share_one_request():
+    exchange = FakeExchange(delay=0.1)
+    cache = make_cache(exchange, ttl=10)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_ticker("CRO_USDT"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert exchange.calls == ["CRO_USDT"]
+    assert {r["freshness"]["source"] for r in results} == {"live"}
+    metrics = cache.metrics()
+    assert metrics["coalesced"] == 7 and metrics["requests_saved"] == 7
+
+
+def test_bulk_rows_normalizes_names_and_short_fields():
+    from services.ticker_cache import _bulk_rows
+
+    rows = _bulk_rows({"data": {"data": [
+        {"i": "CRO_USDT", "a": "0.08", "h": "0.09", "l": "0.07", "v": "100", "c": "0.025"},
+        {"instrumentName": "btc-usdt", "lastPrice": "62000", "change": 1.5},
+        {"no_name": True},
+    ]}})
+    assert set(rows) == {"CRO_USDT", "BTC_USDT"}
+    cro = rows["CRO_USDT"]
+    assert (cro["lastPrice"], cro["high"], cro["low"], cro["volume"]) == ("0.08", "0.09", "0.07", "100")
+    assert cro["change"] == pytest.approx(2.5)
+    assert rows["BTC_USDT"]["change"] == 1.5
+    assert _bulk_rows([]) == {} and _bulk_rows({"code": 10001, "message": "bad"}) == {}
+
+
+def test_bulk_snapshot_serves_many_pairs_with_one_request():
+    exchange = FakeExchange()
+    bulk_calls = []
+
+    def bulk():
+        bulk_calls.append(1)
+        return {"data": [{"i": "CRO_USDT", "a": "0.08"}, {"i": "BTC_USDT", "a": "62000"}]}
+
+    cache = TickerCache(cache=ResponseCache(), fetch=exchange, ttl=10, stale_ttl=0, bulk_fetch=bulk)
+    tickers = cache.get_tickers(["CRO_USDT", "btc_usdt", "DOGE_USDT"])
+    assert tickers["CRO_USDT"]["data"]["lastPrice"] == "0.08"
+    assert tickers["BTC_USDT"]["freshness"]["source"] == "live"
+    assert tickers["DOGE_USDT"]["error"] == "not in ticker snapshot"
+    cache.get_tickers(["CRO_USDT", "BTC_USDT"])
+    assert bulk_calls == [1] and exchange.calls == []
+
+
+def test_empty_bulk_snapshot_falls_back_per_instrument_and_is_not_cached():
+    exchange = FakeExchange()
+    bulk_calls = []
+
+    def bulk():
+        bulk_calls.append(1)
+        return {"code": 40101, "message": "Authentication failure"}
+
+    cache = TickerCache(cache=ResponseCache(), fetch=exchange, ttl=10, stale_ttl=0, bulk_fetch=bulk)
+    for _ in range(2):
+        tickers = cache.get_tickers(["CRO_USDT", "BTC_USDT"])
+        assert all("error" not in t for t in tickers.values())
+    assert sorted(exchange.calls) == ["BTC_USDT", "CRO_USDT"]   # per-instrument results are cached
+    assert len(bulk_calls) == 2                                  # the empty snapshot was not
+
+
+def test_get_tickers_reports_unexpected_failures_per_pair(monkeypatch):
+    cache = make_cache(FakeExchange(), ttl=10)
+
+    def broken(instruments):
+        raise ValueError("unexpected")
+
+    monkeypatch.setattr(cache, "_fetch_many", broken)
+    tickers = cache.get_tickers(["CRO_USDT", "BTC_USDT"])
+    assert tickers == {
+        "CRO_USDT": {"instrument": "CRO_USDT", "error": "unexpected"},
+        "BTC_USDT": {"instrument": "BTC_USDT", "error": "unexpected"},
+    }